@@ -0,0 +1,471 @@
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+from datetime import date
+
+import pandas as pd
+from starlette.applications import Starlette
+from starlette.background import BackgroundTask
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
+from starlette.responses import FileResponse, JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from billing.billing import PURCHASE_COLUMNS, Billing
+from billing.bulk_invoice import generate_bulk_invoices
+from billing.purchase_export import EXPORT_FORMATS, PARTITION_KEYS, write_purchases
+from billing.purchase_import import import_purchases
+from billing.purchase_search import parse_purchase_filters
+from billing.reports import Reports, get_report_refresher, report_bytes
+from database_connection.change_listener import get_change_listener
+from database_connection.database_connection import get_connection_pool
+from database_connection.errors import ConflictError, DomainError, NotFoundError, ValidationError, database_errors
+from database_connection.instrumentation import query_stats
+from products.product import PRODUCT_COLUMNS, Product
+from suppliers.supplier import SUPPLIER_COLUMNS, Supplier
+from validation.validation import PRODUCT_RULES, PURCHASE_RULES, SUPPLIER_RULES, validate_record
+
+# Largest page a client may ask for (overridable through the .env file):
+api_max_page_size = int(os.getenv('API_MAX_PAGE_SIZE', '1000'))
+
+
+# A request body that is not valid JSON, or not the kind of JSON value the route expects:
+class BadRequestError(ValidationError):
+    pass
+
+
+ERROR_STATUS = {BadRequestError: 400, NotFoundError: 404, ValidationError: 422, ConflictError: 409}
+
+
+# JSON responses that also serialise dates and decimals:
+class ApiJSONResponse(JSONResponse):
+    def render(self, content):
+        return json.dumps(content, default=str, separators=(",", ":")).encode("utf-8")
+
+
+def _domain(domain_class):
+    pool = get_connection_pool()
+    if pool is None:
+        raise DomainError("Failed to connect to the database.")
+    return domain_class(pool)
+
+
+def _records(rows, columns):
+    return [dict(zip(columns, row)) for row in rows]
+
+
+def _page_size(request):
+    page_size = request.query_params.get("page_size", "50")
+    if not page_size.isdigit() or not 1 <= int(page_size) <= api_max_page_size:
+        raise ValidationError(f"page_size must be between 1 and {api_max_page_size}")
+    return int(page_size)
+
+
+# Keyset page of a table as {"rows", "next_cursor", "total_estimate"}; an empty table is an empty page:
+async def _list(request, domain_class, method, columns, id_column):
+    domain = _domain(domain_class)
+    try:
+        page = await run_in_threadpool(getattr(domain, method), page_size=_page_size(request),
+                                       sort_key=request.query_params.get("sort", id_column),
+                                       cursor=request.query_params.get("cursor"))
+    except NotFoundError:
+        return ApiJSONResponse({"rows": [], "next_cursor": None, "total_estimate": 0})
+    return ApiJSONResponse({"rows": _records(page.rows, columns), "next_cursor": page.next_cursor,
+                            "total_estimate": page.total_estimate})
+
+
+# Page of a ranked text search for ?q= as {"rows", "next_cursor", "total_estimate"}, each row with its "rank":
+async def _text_search(request, domain_class, method, columns):
+    domain = _domain(domain_class)
+    try:
+        page = await run_in_threadpool(getattr(domain, method), request.query_params.get("q", ""),
+                                       page_size=_page_size(request), cursor=request.query_params.get("cursor"))
+    except NotFoundError:
+        return ApiJSONResponse({"rows": [], "next_cursor": None, "total_estimate": 0, "truncated": False,
+                                "similar": False})
+    return ApiJSONResponse({"rows": _records(page.rows, columns + ["rank"]), "next_cursor": page.next_cursor,
+                            "total_estimate": page.total_estimate, "truncated": page.truncated,
+                            "similar": page.similar})
+
+
+# Parses a JSON request body, so a malformed one is answered with 400 rather than 500:
+def _parse_json(body, expected=dict):
+    try:
+        value = json.loads(body)
+    except ValueError as error:
+        raise BadRequestError("Request body is not valid JSON: " + str(error))
+    if not isinstance(value, expected):
+        raise BadRequestError("Request body must be a JSON object" if expected is dict
+                              else "Request body must be a JSON array or object")
+    return value
+
+
+async def _json_body(request, expected=dict):
+    return _parse_json(await request.body(), expected)
+
+
+async def _details(request, domain_class, method, columns):
+    record_id = request.path_params["record_id"]
+    details = await run_in_threadpool(getattr(_domain(domain_class), method), record_id)
+    return ApiJSONResponse(dict(zip(columns, [record_id] + list(details))))
+
+
+# Validates a JSON body against the table's rules and passes it to an insert/update method:
+async def _write(request, domain_class, method, columns, rules, status_code=200):
+    record = await _json_body(request)
+    if "record_id" in request.path_params:
+        record[columns[0]] = request.path_params["record_id"]
+    missing = [column for column in columns if column not in record]
+    if missing:
+        raise ValidationError("Missing field(s): " + ", ".join(missing))
+    record = {column: record[column] for column in columns}
+    errors = validate_record(rules, **record)
+    if errors:
+        raise ValidationError(errors[0])
+    count = await run_in_threadpool(getattr(_domain(domain_class), method), **record)
+    if count == 0:
+        raise NotFoundError("No records found with the given ID")
+    return ApiJSONResponse({"count": count}, status_code=status_code)
+
+
+async def _delete(request, domain_class, method):
+    count = await run_in_threadpool(getattr(_domain(domain_class), method), request.path_params["record_id"])
+    if count == 0:
+        raise NotFoundError("No records found with the given ID")
+    return ApiJSONResponse({"count": count})
+
+
+async def health(request):
+    return ApiJSONResponse({"status": "ok" if get_connection_pool() is not None else "unavailable"})
+
+
+async def list_suppliers(request):
+    return await _list(request, Supplier, "list_suppliers", SUPPLIER_COLUMNS, "supplier_id")
+
+
+async def get_supplier(request):
+    return await _details(request, Supplier, "supplier_details", SUPPLIER_COLUMNS)
+
+
+async def create_supplier(request):
+    return await _write(request, Supplier, "insert_supplier", SUPPLIER_COLUMNS, _supplier_rules(), status_code=201)
+
+
+async def update_supplier(request):
+    return await _write(request, Supplier, "update_supplier", SUPPLIER_COLUMNS, _supplier_rules())
+
+
+async def delete_supplier(request):
+    return await _delete(request, Supplier, "delete_supplier")
+
+
+# The UI checks country_code and email separately from the stored columns; only the stored columns apply here:
+def _supplier_rules():
+    return [rule for rule in SUPPLIER_RULES if rule.column in SUPPLIER_COLUMNS]
+
+
+async def list_products(request):
+    return await _list(request, Product, "list_products", PRODUCT_COLUMNS, "product_id")
+
+
+async def text_search_products(request):
+    return await _text_search(request, Product, "search_product_text", PRODUCT_COLUMNS)
+
+
+async def get_product(request):
+    return await _details(request, Product, "product_details", PRODUCT_COLUMNS)
+
+
+async def create_product(request):
+    return await _write(request, Product, "insert_product", PRODUCT_COLUMNS, PRODUCT_RULES, status_code=201)
+
+
+async def update_product(request):
+    return await _write(request, Product, "update_product", PRODUCT_COLUMNS, PRODUCT_RULES)
+
+
+async def delete_product(request):
+    return await _delete(request, Product, "delete_product")
+
+
+async def list_purchases(request):
+    return await _list(request, Billing, "list_purchase", PURCHASE_COLUMNS, "purchase_id")
+
+
+async def get_purchase(request):
+    return await _details(request, Billing, "purchase_details", PURCHASE_COLUMNS)
+
+
+async def create_purchase(request):
+    return await _write(request, Billing, "insert_purchase", PURCHASE_COLUMNS, PURCHASE_RULES, status_code=201)
+
+
+async def update_purchase(request):
+    return await _write(request, Billing, "update_purchase", PURCHASE_COLUMNS, PURCHASE_RULES)
+
+
+async def delete_purchase(request):
+    return await _delete(request, Billing, "delete_purchase")
+
+
+# Query-string filters such as ?supplier_id__in=1,2&purchase_date__gte=2024-04-01:
+def _purchase_filters(query_params):
+    try:
+        return parse_purchase_filters(query_params)
+    except ValueError as e:
+        raise ValidationError(str(e))
+
+
+# Keyset page of the purchases matching the filters, as {"rows", "next_cursor", "total_estimate"}; at least one
+# filter is required:
+async def search_purchases(request):
+    billing = _domain(Billing)
+    try:
+        page = await run_in_threadpool(billing.search_purchase, page_size=_page_size(request),
+                                       cursor=request.query_params.get("cursor"),
+                                       **_purchase_filters(request.query_params))
+    except NotFoundError:
+        return ApiJSONResponse({"rows": [], "next_cursor": None, "total_estimate": 0})
+    return ApiJSONResponse({"rows": _records(page.rows, PURCHASE_COLUMNS), "next_cursor": page.next_cursor,
+                            "total_estimate": page.total_estimate})
+
+
+async def text_search_purchases(request):
+    return await _text_search(request, Billing, "search_purchase_text", PURCHASE_COLUMNS)
+
+
+# Streams every purchase as newline-delimited JSON, one keyset page at a time; ?format=parquet|arrow instead
+# returns a file of the purchases matching the search filters (a ZIP of files with ?partition_by=month,supplier_id):
+async def export_purchases(request):
+    if request.query_params.get("format") in EXPORT_FORMATS:
+        return await _export_purchase_file(request)
+    billing = _domain(Billing)
+    page_size = _page_size(request)
+    sort_key = request.query_params.get("sort", "purchase_id")
+
+    def lines():
+        cursor = None
+        while True:
+            try:
+                page = billing.list_purchase(page_size=page_size, sort_key=sort_key, cursor=cursor)
+            except NotFoundError:
+                return
+            for record in _records(page.rows, PURCHASE_COLUMNS):
+                yield json.dumps(record, default=str) + "\n"
+            if page.next_cursor is None:
+                return
+            cursor = page.next_cursor
+
+    return StreamingResponse(iterate_in_threadpool(lines()), media_type="application/x-ndjson")
+
+
+async def _export_purchase_file(request):
+    pool = get_connection_pool()
+    if pool is None:
+        raise DomainError("Failed to connect to the database.")
+    file_format = request.query_params["format"]
+    partition_by = [key for key in request.query_params.get("partition_by", "").split(",") if key]
+    if any(key not in PARTITION_KEYS for key in partition_by):
+        raise ValidationError(f"partition_by must be one or more of {', '.join(PARTITION_KEYS)}")
+    filters = _purchase_filters(request.query_params)
+    tmp_dir = tempfile.mkdtemp()
+    filename = f"purchases.{file_format}"
+    try:
+        with database_errors("Failed to export records from Purchase table"):
+            if partition_by:
+                await run_in_threadpool(write_purchases, pool, os.path.join(tmp_dir, "purchases"),
+                                        file_format=file_format, partition_by=partition_by, filters=filters)
+                path = await run_in_threadpool(shutil.make_archive, os.path.join(tmp_dir, "purchases"), "zip",
+                                               os.path.join(tmp_dir, "purchases"))
+                filename += ".zip"
+            else:
+                path = os.path.join(tmp_dir, filename)
+                await run_in_threadpool(write_purchases, pool, path, file_format=file_format, filters=filters)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    return FileResponse(path, media_type="application/octet-stream", filename=filename,
+                        background=BackgroundTask(shutil.rmtree, tmp_dir, ignore_errors=True))
+
+
+# Loads many purchases at once from a JSON array, a CSV body or a Parquet body through the bulk import:
+async def import_purchase_batch(request):
+    body = await request.body()
+    content_type = request.headers.get("content-type", "application/json")
+    if content_type.startswith("application/json"):
+        source, file_format = pd.DataFrame(_parse_json(body, (list, dict))), None
+    elif content_type.startswith("text/csv"):
+        source, file_format = io.BytesIO(body), "csv"
+    else:
+        source, file_format = io.BytesIO(body), "parquet"
+    pool = get_connection_pool()
+    if pool is None:
+        raise DomainError("Failed to connect to the database.")
+    with database_errors("Failed to import records into Purchase table"):
+        result = await run_in_threadpool(import_purchases, pool, source, file_format=file_format)
+    rejected = json.loads(result.rejected.to_json(orient="records", date_format="iso")) if len(result.rejected) else []
+    return ApiJSONResponse({"rows_read": result.rows_read, "inserted": result.inserted, "rejected": rejected,
+                            "rows_per_second": round(result.rows_per_second)},
+                           status_code=201 if result.inserted else 200)
+
+
+async def create_purchase_order(request):
+    order = await _json_body(request)
+    billing = _domain(Billing)
+    try:
+        order_date = date.fromisoformat(order["order_date"]) if order.get("order_date") else None
+        count = await run_in_threadpool(billing.insert_purchase_order, order.get("order_id"), order.get("supplier_id"),
+                                        order.get("gstin_number"), order_date, pd.DataFrame(order.get("lines", [])))
+    except ValueError as e:
+        raise ValidationError(str(e))
+    return ApiJSONResponse({"order_id": order.get("order_id"), "lines": count}, status_code=201)
+
+
+# Optional YYYY-MM-DD date of a JSON body:
+def _date_field(body, name):
+    value = body.get(name)
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValidationError(f"{name} must be a date written as YYYY-MM-DD")
+
+
+# Optional list of integer IDs of a JSON body:
+def _id_list_field(body, name):
+    value = body.get(name)
+    if value is not None and not (isinstance(value, list) and
+                                  all(isinstance(item, int) and not isinstance(item, bool) for item in value)):
+        raise ValidationError(f"{name} must be a list of integer IDs")
+    return value
+
+
+# Renders the selected invoices in the PDF process pool and streams them back as one ZIP:
+async def invoice_batch(request):
+    criteria = await _json_body(request)
+    billing = _domain(Billing)
+    tax_invoices = await run_in_threadpool(
+        billing.find_tax_invoices, start_date=_date_field(criteria, "start_date"),
+        end_date=_date_field(criteria, "end_date"), supplier_ids=_id_list_field(criteria, "supplier_ids"),
+        purchase_ids=_id_list_field(criteria, "purchase_ids"))
+    if not tax_invoices:
+        raise NotFoundError("No records found in Purchase table")
+    tmp_dir = tempfile.mkdtemp()
+    zip_path = os.path.join(tmp_dir, "tax_invoices.zip")
+    result = await run_in_threadpool(generate_bulk_invoices, tax_invoices, zip_path)
+    headers = {"X-Invoices-Generated": str(len(result.generated)), "X-Invoices-Failed": str(len(result.failed))}
+    return FileResponse(zip_path, media_type="application/zip", filename="tax_invoices.zip", headers=headers,
+                        background=BackgroundTask(shutil.rmtree, tmp_dir, ignore_errors=True))
+
+
+# Queues one invoice on the background workers; poll the returned job for the PDF:
+async def queue_invoice(request):
+    billing = _domain(Billing)
+    job_id = await run_in_threadpool(billing.enqueue_tax_invoice, request.path_params["record_id"])
+    return ApiJSONResponse({"job_id": job_id}, status_code=202)
+
+
+async def get_invoice_job(request):
+    billing = _domain(Billing)
+    invoice_job = await run_in_threadpool(billing.get_invoice_job, request.path_params["job_id"])
+    if invoice_job is None:
+        raise NotFoundError("No records found in Invoice_Job table")
+    return ApiJSONResponse({"job_id": invoice_job.job_id, "purchase_id": invoice_job.purchase_id,
+                            "status": invoice_job.status, "attempts": invoice_job.attempts,
+                            "error": invoice_job.error})
+
+
+async def get_invoice_job_pdf(request):
+    billing = _domain(Billing)
+    invoice_job = await run_in_threadpool(billing.get_invoice_job_artifact, request.path_params["job_id"])
+    if invoice_job.status != "done":
+        raise ConflictError(f"Invoice job {invoice_job.job_id} is {invoice_job.status}")
+    return FileResponse(invoice_job.artifact_path, media_type="application/pdf", filename=invoice_job.pdf_filename)
+
+
+# Runs a precomputed report as JSON, or as a CSV or Parquet download with ?format=csv|parquet:
+async def run_report(request):
+    reports = _domain(Reports)
+    get_report_refresher(reports.pool)
+    params = request.query_params
+    try:
+        start_date = date.fromisoformat(params["start_date"]) if params.get("start_date") else None
+        end_date = date.fromisoformat(params["end_date"]) if params.get("end_date") else None
+        supplier_id = int(params["supplier_id"]) if params.get("supplier_id") else None
+    except ValueError as e:
+        raise ValidationError(str(e))
+    name = request.path_params["name"]
+    report = await run_in_threadpool(reports.run_report, name, start_date=start_date, end_date=end_date,
+                                     supplier_id=supplier_id)
+    file_format = params.get("format", "json")
+    if file_format in ("csv", "parquet"):
+        media_type = "text/csv" if file_format == "csv" else "application/octet-stream"
+        return Response(report_bytes(report, file_format), media_type=media_type,
+                        headers={"Content-Disposition": f'attachment; filename="{name}.{file_format}"'})
+    return ApiJSONResponse({"rows": report.astype(object).to_dict(orient="records")})
+
+
+async def refresh_reports(request):
+    reports = _domain(Reports)
+    await run_in_threadpool(reports.refresh)
+    return ApiJSONResponse({"refreshed_at": await run_in_threadpool(reports.last_refreshed)})
+
+
+# Database time per calling method since the process started, the most expensive first:
+async def query_metrics(request):
+    stats = sorted(query_stats.snapshot().items(), key=lambda item: item[1].seconds, reverse=True)
+    return ApiJSONResponse([{"caller": caller, "queries": entry.calls, "total_ms": round(entry.seconds * 1000, 3),
+                             "max_ms": round(entry.max_seconds * 1000, 3), "rows": entry.rows}
+                            for caller, entry in stats])
+
+
+async def domain_error(request, error):
+    status_code = next((status for error_class, status in ERROR_STATUS.items() if isinstance(error, error_class)), 500)
+    return ApiJSONResponse({"error": str(error)}, status_code=status_code)
+
+
+routes = [
+    Route("/health", health),
+    Route("/metrics/queries", query_metrics),
+    Route("/suppliers", list_suppliers),
+    Route("/suppliers", create_supplier, methods=["POST"]),
+    Route("/suppliers/{record_id:int}", get_supplier),
+    Route("/suppliers/{record_id:int}", update_supplier, methods=["PUT"]),
+    Route("/suppliers/{record_id:int}", delete_supplier, methods=["DELETE"]),
+    Route("/products", list_products),
+    Route("/products", create_product, methods=["POST"]),
+    Route("/products/text-search", text_search_products),
+    Route("/products/{record_id:int}", get_product),
+    Route("/products/{record_id:int}", update_product, methods=["PUT"]),
+    Route("/products/{record_id:int}", delete_product, methods=["DELETE"]),
+    Route("/purchases", list_purchases),
+    Route("/purchases", create_purchase, methods=["POST"]),
+    Route("/purchases/search", search_purchases),
+    Route("/purchases/text-search", text_search_purchases),
+    Route("/purchases/export", export_purchases),
+    Route("/purchases/batch", import_purchase_batch, methods=["POST"]),
+    Route("/purchases/{record_id:int}", get_purchase),
+    Route("/purchases/{record_id:int}", update_purchase, methods=["PUT"]),
+    Route("/purchases/{record_id:int}", delete_purchase, methods=["DELETE"]),
+    Route("/purchases/{record_id:int}/invoice", queue_invoice, methods=["POST"]),
+    Route("/purchase-orders", create_purchase_order, methods=["POST"]),
+    Route("/invoices/batch", invoice_batch, methods=["POST"]),
+    Route("/invoice-jobs/{job_id:int}", get_invoice_job),
+    Route("/invoice-jobs/{job_id:int}/pdf", get_invoice_job_pdf),
+    Route("/reports/refresh", refresh_reports, methods=["POST"]),
+    Route("/reports/{name}", run_report),
+]
+
+
+# Each worker process follows the changes made by the other workers and the Streamlit servers:
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    listener = get_change_listener()
+    yield
+    listener.stop()
+
+
+app = Starlette(routes=routes, exception_handlers={DomainError: domain_error}, lifespan=lifespan)
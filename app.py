@@ -1,24 +1,46 @@
 import streamlit as st
+import importlib
 import logging
+import sys
+import time
 
-from billing.billing_main import main_billing
-from products.product_main import main_product
-from suppliers.supplier_main import main_supplier
+from database_connection.change_listener import get_change_listener
+from database_connection.instrumentation import query_stats, show_query_stats
+
+# Menu entry -> module and function rendering the page. A page's module, and everything it imports, is only loaded
+# the first time the page is selected:
+PAGES = {
+    "Product": ("products.product_main", "main_product"),
+    "Supplier": ("suppliers.supplier_main", "main_supplier"),
+    "Billing": ("billing.billing_main", "main_billing"),
+}
+
+
+def load_page(menu):
+    module_name, function_name = PAGES[menu]
+    if module_name in sys.modules:
+        return getattr(sys.modules[module_name], function_name)
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    logging.info(f"Imported the {menu} page in {(time.perf_counter() - start) * 1000:.0f} ms")
+    return getattr(module, function_name)
 
 
 def main():
+    # Keeps this server process's caches in step with changes made by the other processes:
+    get_change_listener()
     st.title("Billing Management System")
     st.sidebar.header("Menu")
-    menu = st.sidebar.radio("Select Menu", ["Product", "Supplier", "Billing"])
+    menu = st.sidebar.radio("Select Menu", list(PAGES))
 
-    if menu == "Supplier":
-        main_supplier()
+    page = load_page(menu)
+    with query_stats.scope() as rerun_stats:
+        page()
 
-    elif menu == "Product":
-        main_product()
+    if show_query_stats:
+        from ui.query_stats_panel import show_query_stats_panel
 
-    elif menu == "Billing":
-        main_billing()
+        show_query_stats_panel(rerun_stats)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,212 @@
+import argparse
+import json
+import logging
+import platform
+import subprocess
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+
+import numpy as np
+
+from benchmarks.seed import remove_dataset, seed_dataset
+from billing.billing import Billing
+from billing.pdf_backend import render_pdf
+from billing.tax_invoice import load_tax_invoice_template, render_tax_invoice
+from database_connection.errors import NotFoundError
+from suppliers.country_codes import get_country_codes
+
+# Version of the results layout; bump it when fields change meaning so old baselines are not compared blindly:
+RESULTS_FORMAT = 1
+
+
+# One timed code path: run(iteration) is called for iterations 0 (the untimed warm-up) to iterations and may return
+# the number of rows it handled:
+@dataclass(frozen=True)
+class Case:
+    name: str
+    run: object
+    iterations: int
+
+
+# Runs a case after one untimed warm-up call and summarises its latencies and throughput:
+def time_case(case):
+    case.run(0)
+    latencies = []
+    rows = 0
+    for iteration in range(1, case.iterations + 1):
+        start = time.perf_counter()
+        handled = case.run(iteration)
+        latencies.append(time.perf_counter() - start)
+        rows += handled or 0
+    latencies = np.array(latencies) * 1000
+    total_seconds = latencies.sum() / 1000
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    summary = {"iterations": case.iterations, "mean_ms": round(float(latencies.mean()), 3),
+               "p50_ms": round(float(p50), 3), "p95_ms": round(float(p95), 3), "p99_ms": round(float(p99), 3),
+               "ops_per_second": round(case.iterations / total_seconds, 2)}
+    if rows:
+        summary["rows_per_second"] = round(rows / total_seconds, 2)
+    return summary
+
+
+# The application code paths timed against a seeded dataset:
+def build_cases(pool, dataset, iterations):
+    billing = Billing(pool)
+    rng = np.random.default_rng(0)
+    purchase_ids = rng.choice(np.array(dataset.purchase_ids), size=iterations + 1).tolist()
+    supplier_ids = rng.choice(np.array(dataset.supplier_ids), size=iterations + 1).tolist()
+    product_ids = rng.choice(np.array(dataset.product_ids), size=iterations + 1).tolist()
+    tax_invoice = billing.generate_tax_invoice_per_product(purchase_ids[0])
+    template = load_tax_invoice_template()
+    html = render_tax_invoice(tax_invoice, template)
+
+    # New purchases are priced from their product beforehand so only the insert itself is timed:
+    first_new_id = dataset.purchase_ids.stop
+    new_purchases = []
+    for iteration, product_id in enumerate(product_ids):
+        supplier_id, unit_price = _product_supplier_and_price(pool, product_id)
+        total_price = unit_price * 2
+        new_purchases.append((first_new_id + iteration, supplier_id, billing.get_gstin_number(supplier_id),
+                              product_id, 2, unit_price, total_price, 0.0, 9.0, 9.0, 0.0, total_price + 18.0,
+                              date(2024, 4, 1), billing.get_item(product_id)))
+
+    def search(iteration):
+        filters = [{"supplier_id": supplier_ids[iteration]},
+                   {"product_id__in": product_ids[iteration:iteration + 5]},
+                   {"supplier_id": supplier_ids[iteration], "purchase_date__gte": date(2024, 1, 1),
+                    "purchase_date__lte": date(2024, 1, 31)}][iteration % 3]
+        try:
+            return len(billing.search_purchase(**filters).rows)
+        except NotFoundError:
+            return 0
+
+    # Small seeds leave products without purchases, which find nothing rather than fail the run:
+    def search_text(iteration):
+        try:
+            return len(billing.search_purchase_text(f"benchmark {product_ids[iteration]}").rows)
+        except NotFoundError:
+            return 0
+
+    def get_country_codes_cold(iteration):
+        get_country_codes.cache_clear()
+        return len(get_country_codes())
+
+    return [
+        Case("insert_purchase", lambda iteration: billing.insert_purchase(*new_purchases[iteration]), iterations),
+        Case("search_purchase", search, iterations),
+        Case("search_purchase_text", search_text, iterations),
+        Case("show_all_purchase", lambda iteration: len(billing.show_all_purchase()), max(3, iterations // 20)),
+        Case("generate_tax_invoice_per_product",
+             lambda iteration: billing.generate_tax_invoice_per_product(purchase_ids[iteration]) and 1, iterations),
+        Case("render_tax_invoice", lambda iteration: render_tax_invoice(tax_invoice, template) and 1, iterations),
+        Case("render_pdf", lambda iteration: render_pdf(html) and 1, max(3, iterations // 10)),
+        Case("get_country_codes_cold", get_country_codes_cold, iterations),
+        Case("get_country_codes", lambda iteration: len(get_country_codes()), iterations),
+    ], range(first_new_id, first_new_id + len(new_purchases))
+
+
+def _product_supplier_and_price(pool, product_id):
+    with pool.connection() as connection:
+        cursor = connection.cursor()
+        cursor.execute("""SELECT supplier_id, unit_price FROM Product WHERE product_id = %s""", (product_id,))
+        return cursor.fetchone()
+
+
+def _git_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True,
+                                    text=True, check=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+def _server_version(pool):
+    with pool.connection() as connection:
+        cursor = connection.cursor()
+        cursor.execute("""SHOW server_version""")
+        return cursor.fetchone()[0]
+
+
+# Seeds a dataset, times every selected case and returns the results document:
+def run_benchmarks(pool, suppliers=100, products=2000, purchases=100000, iterations=100, only=None, keep=False,
+                   seed=0):
+    commit, dirty = _git_commit()
+    dataset = seed_dataset(pool, suppliers, products, purchases, seed)
+    logging.info(f"Seeded {suppliers} suppliers, {products} products and {purchases} purchases in "
+                 f"{dataset.seconds:.1f}s")
+    results = {}
+    inserted_ids = range(0)
+    try:
+        cases, inserted_ids = build_cases(pool, dataset, iterations)
+        for case in cases:
+            if only and case.name not in only:
+                continue
+            results[case.name] = time_case(case)
+            logging.info(f"{case.name}: p50 {results[case.name]['p50_ms']} ms, "
+                         f"p99 {results[case.name]['p99_ms']} ms")
+    finally:
+        if not keep:
+            Billing(pool).delete_purchases(list(inserted_ids))
+            remove_dataset(pool, dataset)
+    return {"format": RESULTS_FORMAT, "commit": commit, "dirty": dirty,
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(), "postgres": _server_version(pool),
+            "dataset": {"suppliers": suppliers, "products": products, "purchases": purchases, "seed": seed,
+                        "seed_seconds": round(dataset.seconds, 3)},
+            "results": results}
+
+
+# Prints the p50/p99 change of each case against an earlier results file:
+def compare(results, baseline):
+    if baseline.get("format") != results["format"]:
+        logging.warning("Baseline was written in a different results format; the comparison may be misleading")
+    for name, summary in results["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None:
+            continue
+        changes = [f"{key} {previous[key]} -> {summary[key]} ms ({(summary[key] / previous[key] - 1) * 100:+.1f}%)"
+                   for key in ("p50_ms", "p99_ms") if previous.get(key)]
+        print(f"{name}: " + ", ".join(changes))
+
+
+# Command Line Entry Point:
+def main(argv=None):
+    from database_connection.database_connection import get_connection_pool
+
+    parser = argparse.ArgumentParser(description="Benchmark the billing, product and supplier data paths against "
+                                                 "a seeded local database")
+    parser.add_argument("--suppliers", type=int, default=100, help="Suppliers to seed")
+    parser.add_argument("--products", type=int, default=2000, help="Products to seed")
+    parser.add_argument("--purchases", type=int, default=100000, help="Purchases to seed")
+    parser.add_argument("--iterations", type=int, default=100, help="Timed calls per case (fewer for slow cases)")
+    parser.add_argument("--only", action="append", help="Only run this case (repeatable)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of the generated data")
+    parser.add_argument("--keep", action="store_true", help="Keep the seeded data instead of deleting it")
+    parser.add_argument("--output", help="Write the JSON results to this file instead of stdout")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    args = parser.parse_args(argv)
+
+    pool = get_connection_pool()
+    if pool is None:
+        logging.error("Failed to connect to the database.")
+        return 1
+    results = run_benchmarks(pool, args.suppliers, args.products, args.purchases, args.iterations, args.only,
+                             args.keep, args.seed)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+            file.write("\n")
+    else:
+        print(json.dumps(results, indent=2))
+    if args.compare:
+        with open(args.compare) as file:
+            compare(results, json.load(file))
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    raise SystemExit(main())
@@ -0,0 +1,76 @@
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+from app import PAGES
+from benchmarks.benchmark import RESULTS_FORMAT, _git_commit
+
+project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# Parses `python -X importtime` output into (depth, module, self microseconds, cumulative microseconds):
+def parse_importtime(output):
+    entries = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append((depth, name.strip(), int(self_us), int(cumulative_us)))
+    return entries
+
+
+# Runs the import statement in a fresh interpreter and breaks its import time down by top-level package:
+def measure_imports(statement, top=10):
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], cwd=project_dir,
+                               capture_output=True, text=True, check=True)
+    wall_ms = (time.perf_counter() - start) * 1000
+    # Self times add up without double counting nested imports:
+    packages = {}
+    for depth, name, self_us, cumulative_us in parse_importtime(completed.stderr):
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0) + self_us
+    busiest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {"wall_ms": round(wall_ms, 1), "import_ms": round(sum(packages.values()) / 1000, 1),
+            "packages_ms": {package: round(microseconds / 1000, 1) for package, microseconds in busiest}}
+
+
+# Cold start of the app shell, and of each page on top of it as when it is first selected:
+def import_report(top=10):
+    commit, dirty = _git_commit()
+    report = {"app": measure_imports("import app", top)}
+    for menu, (module_name, _) in PAGES.items():
+        report[menu] = measure_imports(f"import app; import {module_name}", top)
+    return {"format": RESULTS_FORMAT, "commit": commit, "dirty": dirty,
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": sys.version.split()[0], "imports": report}
+
+
+# Command Line Entry Point:
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report the import time of the app shell and of each page")
+    parser.add_argument("--top", type=int, default=10, help="Packages listed per entry point")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    report = import_report(args.top)
+    for name, imports in report["imports"].items():
+        logging.info(f"{name}: {imports['import_ms']} ms of imports, {imports['wall_ms']} ms wall clock")
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+            file.write("\n")
+    else:
+        print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    raise SystemExit(main())
@@ -0,0 +1,126 @@
+import argparse
+import logging
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from billing.billing import Billing
+from billing.purchase_import import import_purchases
+from products.product import Product
+from suppliers.supplier import Supplier
+from validation.validation import GSTIN_CHARSET
+
+CATEGORIES = ["Electrical", "Plumbing", "Hardware", "Stationery", "Packaging", "Chemicals", "Tools", "Safety"]
+FIRST_PURCHASE_DATE = date(2023, 4, 1)
+
+
+# ID ranges of one seeded dataset, so a run can time lookups against it and remove it afterwards:
+@dataclass(frozen=True)
+class SeededDataset:
+    supplier_ids: range
+    product_ids: range
+    purchase_ids: range
+    seconds: float = 0.0
+
+
+# A well-formed GSTIN with a valid mod-36 checksum, unique per number below 26^5:
+def make_gstin(number):
+    letters = "".join(chr(ord("A") + number // 26 ** power % 26) for power in range(5))
+    body = f"{number % 37 + 1:02d}{letters}{number % 10000:04d}F1Z"
+    digits = [GSTIN_CHARSET.index(character) for character in body]
+    total = sum(digit * factor // 36 + digit * factor % 36 for digit, factor in zip(digits, [1, 2] * 7))
+    return body + GSTIN_CHARSET[(36 - total % 36) % 36]
+
+
+def _next_id(pool, table, column):
+    with pool.connection() as connection:
+        cursor = connection.cursor()
+        cursor.execute(f"""SELECT coalesce(max({column}), 0) + 1 FROM {table}""")
+        return cursor.fetchone()[0]
+
+
+# Seeds suppliers, products and purchases above the highest existing IDs through the application's own batch and
+# bulk import paths; the same seed always produces the same data:
+def seed_dataset(pool, suppliers=100, products=2000, purchases=100000, seed=0):
+    start = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    first_supplier = _next_id(pool, "Supplier", "supplier_id")
+    first_product = _next_id(pool, "Product", "product_id")
+    first_purchase = _next_id(pool, "Purchase", "purchase_id")
+    supplier_ids = range(first_supplier, first_supplier + suppliers)
+    product_ids = range(first_product, first_product + products)
+    purchase_ids = range(first_purchase, first_purchase + purchases)
+
+    Supplier(pool).insert_suppliers([
+        {"supplier_id": supplier_id, "supplier_name": f"Benchmark Supplier {supplier_id}",
+         "landline_no": "0124-4000000", "email": f"supplier{supplier_id}@example.com",
+         "mobile_no": f"+91 98{supplier_id % 100000000:08d}", "address": f"{supplier_id} Industrial Area",
+         "city": "Gurugram", "state_province": "Haryana", "country": "India", "postal_code": "122001",
+         "gstin_number": make_gstin(supplier_id)}
+        for supplier_id in supplier_ids])
+
+    product_suppliers = rng.choice(np.array(supplier_ids), size=products)
+    product_prices = np.round(rng.uniform(10, 5000, size=products), 2)
+    Product(pool).insert_products([
+        {"product_id": product_id, "product_name": f"Benchmark Product {product_id}",
+         "description": f"Benchmark item {product_id} for load testing",
+         "category": CATEGORIES[product_id % len(CATEGORIES)], "supplier_id": int(supplier_id),
+         "unit_price": float(unit_price)}
+        for product_id, supplier_id, unit_price in zip(product_ids, product_suppliers, product_prices)])
+
+    # Purchases go through the bulk import, which derives GSTIN, prices and amounts from the seeded products:
+    purchased = rng.integers(0, products, size=purchases)
+    frame = pd.DataFrame({
+        "purchase_id": np.array(purchase_ids),
+        "supplier_id": product_suppliers[purchased],
+        "product_id": np.array(product_ids)[purchased],
+        "quantity": rng.integers(1, 50, size=purchases),
+        "discount": 0.0,
+        "cgst": np.round(rng.uniform(0, 50, size=purchases), 2),
+        "sgst": np.round(rng.uniform(0, 50, size=purchases), 2),
+        "purchase_date": [FIRST_PURCHASE_DATE + timedelta(days=int(days))
+                          for days in rng.integers(0, 730, size=purchases)],
+    })
+    result = import_purchases(pool, frame)
+    if len(result.rejected) > 0:
+        raise RuntimeError(f"{len(result.rejected)} seeded purchase(s) were rejected: "
+                           f"{result.rejected['reason'].iloc[0]}")
+    return SeededDataset(supplier_ids, product_ids, purchase_ids, time.perf_counter() - start)
+
+
+# Deletes a seeded dataset, purchases first so the foreign keys allow it:
+def remove_dataset(pool, dataset):
+    Billing(pool).delete_purchases(list(dataset.purchase_ids))
+    Product(pool).delete_products(list(dataset.product_ids))
+    Supplier(pool).delete_suppliers(list(dataset.supplier_ids))
+
+
+# Command Line Entry Point:
+def main(argv=None):
+    from database_connection.database_connection import get_connection_pool
+
+    parser = argparse.ArgumentParser(description="Seed a local database with benchmark suppliers, products and "
+                                                 "purchases")
+    parser.add_argument("--suppliers", type=int, default=100, help="Suppliers to create")
+    parser.add_argument("--products", type=int, default=2000, help="Products to create")
+    parser.add_argument("--purchases", type=int, default=100000, help="Purchases to create")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = parser.parse_args(argv)
+
+    pool = get_connection_pool()
+    if pool is None:
+        logging.error("Failed to connect to the database.")
+        return 1
+    dataset = seed_dataset(pool, args.suppliers, args.products, args.purchases, args.seed)
+    logging.info(f"Seeded suppliers {dataset.supplier_ids.start}-{dataset.supplier_ids.stop - 1}, products "
+                 f"{dataset.product_ids.start}-{dataset.product_ids.stop - 1} and purchases "
+                 f"{dataset.purchase_ids.start}-{dataset.purchase_ids.stop - 1} in {dataset.seconds:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    raise SystemExit(main())
@@ -0,0 +1,102 @@
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+
+from billing.template_registry import template_registry
+
+# Content-addressed store of rendered invoices (overridable through the .env file):
+invoice_artifact_dir = os.getenv('INVOICE_ARTIFACT_DIR', os.path.join(tempfile.gettempdir(), "invoice_artifacts"))
+invoice_artifact_max_mb = float(os.getenv('INVOICE_ARTIFACT_MAX_MB', '512'))
+
+TAX_INVOICE_TEMPLATE = "tax_invoice_template.html"
+
+
+# Hash of everything that ends up in the rendered invoice: its data, the bill date and the template source:
+def invoice_cache_key(tax_invoice, billing_date, template_name=TAX_INVOICE_TEMPLATE):
+    inputs = {"invoice": dataclasses.asdict(tax_invoice), "billing_date": billing_date,
+              "template": template_registry.version(template_name)}
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+# Rendered HTML and PDF stored under <name>-<key>/, evicted least recently used first once over the size limit:
+class ArtifactCache:
+    def __init__(self, directory=invoice_artifact_dir, max_bytes=invoice_artifact_max_mb * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _entry_dir(self, name, key):
+        return os.path.join(self.directory, f"{name}-{key}")
+
+    # Returns the cached PDF path, or None; a hit marks the entry as recently used:
+    def lookup(self, name, key):
+        entry_dir = self._entry_dir(name, key)
+        try:
+            pdf_names = [file for file in os.listdir(entry_dir) if file.endswith(".pdf")]
+        except FileNotFoundError:
+            return None
+        if not pdf_names:
+            return None
+        os.utime(entry_dir)
+        return os.path.join(entry_dir, pdf_names[0])
+
+    # Stores an invoice as <filename>.pdf plus its .html and returns the PDF path:
+    def store(self, name, key, filename, html, pdf):
+        entry_dir = self._entry_dir(name, key)
+        partial_dir = tempfile.mkdtemp(prefix=".partial-", dir=self.directory)
+        with open(os.path.join(partial_dir, os.path.splitext(filename)[0] + ".html"), "w", encoding="utf-8") as file:
+            file.write(html)
+        with open(os.path.join(partial_dir, filename), "wb") as file:
+            file.write(pdf)
+        try:
+            os.rename(partial_dir, entry_dir)
+        except OSError:
+            # Another worker stored the same content first:
+            shutil.rmtree(partial_dir, ignore_errors=True)
+        self.evict()
+        return os.path.join(entry_dir, filename)
+
+    # Drops every cached artifact of the given names, whatever their key:
+    def invalidate(self, *names):
+        prefixes = tuple(f"{name}-" for name in names)
+        with self._lock:
+            for entry in os.listdir(self.directory):
+                if prefixes and entry.startswith(prefixes):
+                    shutil.rmtree(os.path.join(self.directory, entry), ignore_errors=True)
+
+    def evict(self):
+        with self._lock:
+            entries = []
+            total = 0
+            for entry in os.scandir(self.directory):
+                if not entry.is_dir() or entry.name.startswith(".partial-"):
+                    continue
+                size = sum(file.stat().st_size for file in os.scandir(entry.path))
+                entries.append((entry.stat().st_mtime, size, entry.path))
+                total += size
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                shutil.rmtree(path, ignore_errors=True)
+                total -= size
+                logging.info(f"Evicted invoice artifact {os.path.basename(path)}")
+
+
+_artifact_cache = None
+_artifact_cache_lock = threading.Lock()
+
+
+# Returns the process-wide artifact cache:
+def get_artifact_cache():
+    global _artifact_cache
+    if _artifact_cache is None:
+        with _artifact_cache_lock:
+            if _artifact_cache is None:
+                _artifact_cache = ArtifactCache()
+    return _artifact_cache
@@ -0,0 +1,377 @@
+from psycopg2 import sql
+from psycopg2.extras import execute_values
+
+from billing.artifact_cache import get_artifact_cache
+from billing.invoice_jobs import enqueue_invoice_job, fetch_invoice_job, get_invoice_worker_pool, invoice_artifact_name
+from billing.purchase_order import ORDER_LINE_COLUMNS, prepare_order_lines
+from billing.purchase_search import PURCHASE_FILTERS
+from billing.tax_invoice import PURCHASE_ORDER_INVOICE_QUERY, TAX_INVOICE_QUERY, TaxInvoice
+from database_connection.batch import delete_rows, insert_rows, row_keys, update_rows
+from database_connection.errors import NotFoundError, ValidationError, database_errors
+from database_connection.pagination import fetch_page, fetch_text_search_page
+from database_connection.query_builder import build_conditions, build_typeahead, build_where, prefix_tsquery
+from database_connection.reference_cache import reference_cache
+from validation.validation import PURCHASE_ORDER_RULES, validate_record
+
+PURCHASE_COLUMNS = ["purchase_id", "supplier_id", "gstin_number", "product_id", "quantity", "unit_price", "total_price",
+                    "discount", "cgst", "sgst", "igst", "amount", "purchase_date", "item_description"]
+PURCHASE_SORT_KEYS = ["purchase_id", "purchase_date", "supplier_id", "product_id", "amount"]
+# Text searched by search_purchase_text; migrations/0006 indexes this expression:
+PURCHASE_SEARCH_VECTOR = sql.SQL("to_tsvector('english', item_description)")
+
+
+# Creating Billing Class (raises the typed errors of database_connection.errors; the UI reports them):
+class Billing:
+    def __init__(self, pool):
+        self.pool = pool
+
+    def insert_purchase(self, purchase_id: int, supplier_id: int, gstin_number: str, product_id: int, quantity: int,
+                        unit_price: float, total_price: float, discount: float, cgst: float, sgst: float, igst: float,
+                        amount: float, purchase_date: str, item_description: str, unit_of_work=None):
+        with database_errors("Failed to insert record into Purchase table"):
+            with self.pool.transaction(unit_of_work) as unit_of_work:
+                cursor = unit_of_work.cursor()
+                postgres_insert_query = """INSERT INTO Purchase (purchase_id, supplier_id, gstin_number, product_id, quantity, unit_price, total_price, discount, cgst, sgst, igst, amount, purchase_date, item_description) VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)"""
+                record_to_insert = (
+                    purchase_id, supplier_id, gstin_number, product_id, quantity, unit_price, total_price, discount,
+                    cgst, sgst, igst, amount, purchase_date, item_description)
+                cursor.execute(postgres_insert_query, record_to_insert)
+                count = cursor.rowcount
+                return count
+
+    def update_purchase(self, purchase_id: int, supplier_id: int, gstin_number: str, product_id: int, quantity: int,
+                        unit_price: float, total_price: float, discount: float, cgst: float, sgst: float, igst: float,
+                        amount: float, purchase_date: str, item_description: str, unit_of_work=None):
+        with database_errors("Failed to update record in Purchase table"):
+            with self.pool.transaction(unit_of_work) as unit_of_work:
+                cursor = unit_of_work.cursor()
+                postgres_update_query = """UPDATE Purchase SET supplier_id = %s, gstin_number = %s, product_id = %s, quantity = %s, unit_price = %s, total_price = %s, discount = %s, cgst = %s, sgst = %s, igst = %s, amount = %s, purchase_date = %s, item_description = %s WHERE purchase_id = %s"""
+                record_to_update = (
+                    supplier_id, gstin_number, product_id, quantity, unit_price, total_price, discount, cgst, sgst,
+                    igst, amount, purchase_date, item_description, purchase_id)
+                cursor.execute(postgres_update_query, record_to_update)
+                unit_of_work.on_commit(lambda: get_artifact_cache().invalidate(invoice_artifact_name(purchase_id)))
+                count = cursor.rowcount
+                return count
+
+    def delete_purchase(self, purchase_id: int, unit_of_work=None):
+        with database_errors("Failed to delete record from Purchase table"):
+            with self.pool.transaction(unit_of_work) as unit_of_work:
+                cursor = unit_of_work.cursor()
+                postgres_delete_query = """DELETE FROM Purchase WHERE purchase_id = %s"""
+                cursor.execute(postgres_delete_query, (purchase_id,))
+                unit_of_work.on_commit(lambda: get_artifact_cache().invalidate(invoice_artifact_name(purchase_id)))
+                count = cursor.rowcount
+                return count
+
+    # Batch forms of the mutations above: records are dicts keyed by PURCHASE_COLUMNS (or tuples in that order),
+    # written with multi-row statements in one transaction:
+    def insert_purchases(self, records, unit_of_work=None):
+        with database_errors("Failed to insert records into Purchase table"):
+            with self.pool.transaction(unit_of_work) as unit_of_work:
+                return insert_rows(unit_of_work.cursor(), "Purchase", PURCHASE_COLUMNS, records, "purchase_id")
+
+    def update_purchases(self, records, unit_of_work=None):
+        records = list(records)
+        purchase_ids = row_keys(records, PURCHASE_COLUMNS, "purchase_id")
+        with database_errors("Failed to update records in Purchase table"):
+            with self.pool.transaction(unit_of_work) as unit_of_work:
+                count = update_rows(unit_of_work.cursor(), "Purchase", PURCHASE_COLUMNS, records, "purchase_id")
+                unit_of_work.on_commit(lambda: get_artifact_cache().invalidate(*map(invoice_artifact_name,
+                                                                                    purchase_ids)))
+                return count
+
+    def delete_purchases(self, purchase_ids, unit_of_work=None):
+        purchase_ids = list(purchase_ids)
+        with database_errors("Failed to delete records from Purchase table"):
+            with self.pool.transaction(unit_of_work) as unit_of_work:
+                count = delete_rows(unit_of_work.cursor(), "Purchase", "purchase_id", purchase_ids)
+                unit_of_work.on_commit(lambda: get_artifact_cache().invalidate(*map(invoice_artifact_name,
+                                                                                    purchase_ids)))
+                return count
+
+    def show_all_purchase(self):
+        with database_errors("Failed to fetch records from Purchase table"):
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                cursor.execute("""SELECT * FROM Purchase""")
+                purchase_records = cursor.fetchall()
+                if len(purchase_records) > 0:
+                    return purchase_records
+                else:
+                    raise NotFoundError("No records found in Purchase table")
+
+    def list_purchase(self, page_size: int = 50, sort_key: str = "purchase_id", cursor: str = None):
+        with database_errors("Failed to fetch records from Purchase table"):
+            if sort_key not in PURCHASE_SORT_KEYS:
+                raise ValidationError(f"Purchase records cannot be sorted by {sort_key}")
+            with self.pool.connection() as connection:
+                page = fetch_page(connection, "Purchase", PURCHASE_COLUMNS, "purchase_id", sort_key, page_size, cursor)
+                if len(page.rows) > 0:
+                    return page
+                else:
+                    raise NotFoundError("No records found in Purchase table")
+
+    # Purchases matching the filters, one keyset page at a time in purchase ID order; a search needs at least one
+    # filter, so it never reads the whole table:
+    def search_purchase(self, page_size: int = 50, cursor: str = None, **filters):
+        with database_errors("Failed to fetch records from Purchase table"):
+            conditions, values = build_conditions(filters, PURCHASE_FILTERS)
+            if not conditions:
+                raise ValidationError("Enter at least one search filter")
+            with self.pool.connection() as connection:
+                page = fetch_page(connection, "Purchase", PURCHASE_COLUMNS, "purchase_id", "purchase_id", page_size,
+                                  cursor, where=sql.SQL(" AND ").join(conditions), where_values=values)
+                if len(page.rows) > 0:
+                    return page
+                else:
+                    raise NotFoundError("No records found in Purchase table")
+
+    # Ranked text search over item descriptions, one page at a time; each row ends with its rank. Misspelled words
+    # fall back to descriptions that look alike:
+    def search_purchase_text(self, text: str, page_size: int = 50, cursor: str = None):
+        with database_errors("Failed to fetch records from Purchase table"):
+            tsquery = prefix_tsquery(text)
+            if not tsquery:
+                raise ValidationError("Enter one or more words to search for")
+            with self.pool.connection() as connection:
+                page = fetch_text_search_page(connection, "Purchase", PURCHASE_COLUMNS, "purchase_id",
+                                              PURCHASE_SEARCH_VECTOR, tsquery, "item_description", text.strip(),
+                                              page_size, cursor)
+                if len(page.rows) > 0:
+                    return page
+                else:
+                    raise NotFoundError("No records found in Purchase table")
+
+    @reference_cache.cached(lambda self, supplier_id: ("supplier", supplier_id, "gstin"))
+    def get_gstin_number(self, supplier_id: int):
+        with database_errors("Failed to fetch records from Supplier table"):
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                cursor.execute("""SELECT gstin_number FROM Supplier WHERE supplier_id = %s""", (supplier_id,))
+                gstin_number = cursor.fetchone()
+                if gstin_number:
+                    return gstin_number[0]
+                else:
+                    raise NotFoundError("No records found in Supplier table")
+
+    @reference_cache.cached(lambda self, product_id: ("product", product_id, "price"))
+    def get_product_price(self, product_id: int):
+        with database_errors("Failed to fetch records from Product table"):
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                cursor.execute("""SELECT unit_price FROM Product WHERE product_id = %s""", (product_id,))
+                unit_price = cursor.fetchone()
+                if unit_price:
+                    return unit_price[0]
+                else:
+                    raise NotFoundError("No records found in Product table")
+
+    @reference_cache.cached(lambda self, product_id: ("product", product_id, "item"))
+    def get_item(self, product_id: int):
+        with database_errors("Failed to fetch records from Product table"):
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                cursor.execute("""SELECT product_name, description, category FROM Product WHERE product_id = %s""",
+                               (product_id,))
+                item = cursor.fetchone()
+                if item:
+                    item_description = f"Product Name: {item[0]}\nDescription: {item[1]}\nCategory: {item[2]}"
+                    return item_description
+                else:
+                    raise NotFoundError("No records found in Product table")
+
+    def purchase_details(self, purchase_id: int):
+        with database_errors("Failed to fetch records from Purchase table"):
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                cursor.execute("""SELECT * FROM Purchase WHERE purchase_id = %s""", (purchase_id,))
+                purchase_record = cursor.fetchone()
+                if purchase_record is not None:
+                    supplier_id = purchase_record[1]
+                    gstin_number = purchase_record[2]
+                    product_id = purchase_record[3]
+                    quantity = purchase_record[4]
+                    unit_price = purchase_record[5]
+                    total_price = purchase_record[6]
+                    discount = purchase_record[7]
+                    cgst = purchase_record[8]
+                    sgst = purchase_record[9]
+                    igst = purchase_record[10]
+                    amount = purchase_record[11]
+                    purchase_date = purchase_record[12]
+                    item_description = purchase_record[13]
+                    return [supplier_id, gstin_number, product_id, quantity, unit_price, total_price, discount, cgst, sgst,
+                            igst, amount, purchase_date, item_description]
+                else:
+                    raise NotFoundError("No records found in Purchase table")
+
+    def get_purchase_ids(self):
+        with database_errors("Failed to fetch purchase IDs"):
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                cursor.execute("""SELECT purchase_id FROM Purchase""")
+                purchase_ids = cursor.fetchall()
+                if len(purchase_ids) > 0:
+                    list_purchase_ids = [purchase_id[0] for purchase_id in purchase_ids]
+                    return sorted(list_purchase_ids)
+                else:
+                    raise NotFoundError("No records found in Purchase table")
+
+    # Typeahead lookup for the purchase pickers: purchases whose ID starts with the text, as (purchase_id,
+    # purchase_date, supplier_name, gstin_number), lowest IDs first, read as primary key ranges:
+    def search_purchase_ids(self, text: str = "", limit: int = 20):
+        with database_errors("Failed to fetch purchase IDs"):
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                cursor.execute(*build_typeahead(
+                    """SELECT p.purchase_id, p.purchase_date, s.supplier_name, p.gstin_number
+                       FROM Purchase p JOIN Supplier s ON s.supplier_id = p.supplier_id""",
+                    "p.purchase_id", text.strip(), limit))
+                return cursor.fetchall()
+
+    @reference_cache.cached(lambda self: ("supplier", "ids", "sorted"))
+    def get_all_suppliers(self):
+        with database_errors("Failed to fetch supplier IDs"):
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                cursor.execute("""SELECT supplier_id FROM Supplier""")
+                supplier_ids = cursor.fetchall()
+                if len(supplier_ids) > 0:
+                    list_supplier_ids = [supplier_id[0] for supplier_id in supplier_ids]
+                    return sorted(list_supplier_ids)
+                else:
+                    raise NotFoundError("No records found in Supplier table")
+
+    @reference_cache.cached(lambda self, supplier_id: ("product", "by_supplier", supplier_id))
+    def get_products_for_supplier(self, supplier_id: int):
+        with database_errors("Failed to fetch product IDs for the supplier"):
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                cursor.execute("""SELECT product_id FROM Product WHERE supplier_id = %s""", (supplier_id,))
+                product_ids = cursor.fetchall()
+                if len(product_ids) > 0:
+                    list_product_ids = [product_id[0] for product_id in product_ids]
+                    return sorted(list_product_ids)
+                else:
+                    raise NotFoundError("No records found in Product table")
+
+    def generate_tax_invoice_per_product(self, purchase_id: int):
+        with database_errors("Failed to fetch records from Purchase table"):
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                cursor.execute(TAX_INVOICE_QUERY + """ WHERE p.purchase_id = %s""", (purchase_id,))
+                invoice_record = cursor.fetchone()
+                if invoice_record is not None:
+                    return TaxInvoice.from_row(invoice_record)
+                else:
+                    raise NotFoundError("No records found in Purchase table")
+
+    # Queues the invoice for the background workers and returns the job ID without waiting for the PDF:
+    def enqueue_tax_invoice(self, purchase_id: int):
+        with database_errors("Failed to queue tax invoice"):
+            worker_pool = get_invoice_worker_pool(self.pool)
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                job_id = enqueue_invoice_job(cursor, purchase_id, artifact_cache=worker_pool.artifact_cache)
+                connection.commit()
+            worker_pool.notify()
+            return job_id
+
+    def get_invoice_job(self, job_id: int):
+        with database_errors("Failed to fetch records from Invoice_Job table"):
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                return fetch_invoice_job(cursor, job_id)
+
+    # The finished job, with its PDF and HTML readable by this process (rendered again if they live on another host
+    # or were evicted):
+    def get_invoice_job_artifact(self, job_id: int):
+        invoice_job = self.get_invoice_job(job_id)
+        if invoice_job is None:
+            raise NotFoundError("No records found in Invoice_Job table")
+        if invoice_job.status != "done":
+            return invoice_job
+        with database_errors("Failed to generate tax invoice"):
+            try:
+                return get_invoice_worker_pool(self.pool).local_artifact(invoice_job)
+            except LookupError as e:
+                raise NotFoundError(str(e))
+
+    def generate_tax_invoices(self, purchase_ids: list):
+        with database_errors("Failed to fetch records from Purchase table"):
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                cursor.execute(TAX_INVOICE_QUERY + """ WHERE p.purchase_id = ANY(%s) ORDER BY p.purchase_id""",
+                               (list(purchase_ids),))
+                invoice_records = cursor.fetchall()
+                return [TaxInvoice.from_row(invoice_record) for invoice_record in invoice_records]
+
+    def find_tax_invoices(self, start_date=None, end_date=None, supplier_ids=None, purchase_ids=None):
+        with database_errors("Failed to fetch records from Purchase table"):
+            where, values = build_where({"purchase_date__gte": start_date, "purchase_date__lte": end_date,
+                                         "supplier_id__in": supplier_ids, "purchase_id__in": purchase_ids},
+                                        PURCHASE_FILTERS, alias="p")
+            search_query = sql.SQL(TAX_INVOICE_QUERY) + where + sql.SQL(" ORDER BY p.purchase_id")
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                cursor.execute(search_query, values)
+                invoice_records = cursor.fetchall()
+                return [TaxInvoice.from_row(invoice_record) for invoice_record in invoice_records]
+
+    # Inserts an order header and all of its lines in one transaction:
+    def insert_purchase_order(self, order_id: int, supplier_id: int, gstin_number: str, order_date: str, lines,
+                              unit_of_work=None):
+        errors = validate_record(PURCHASE_ORDER_RULES, order_id=order_id, supplier_id=supplier_id,
+                                 gstin_number=gstin_number, order_date=order_date)
+        if errors:
+            raise ValidationError(errors[0])
+        with database_errors("Failed to insert record into Purchase_Order table"):
+            with self.pool.transaction(unit_of_work) as unit_of_work:
+                cursor = unit_of_work.cursor()
+                order_lines, rejected = prepare_order_lines(cursor, order_id, supplier_id, order_date, lines)
+                if len(rejected) > 0:
+                    raise ValidationError(f"Line {rejected['line_no'].iloc[0]}: {rejected['reason'].iloc[0]}")
+                if len(order_lines) == 0:
+                    raise ValidationError("Please enter at least one line item")
+                cursor.execute("""INSERT INTO Purchase_Order (order_id, supplier_id, gstin_number, order_date) VALUES (%s,%s,%s,%s)""",
+                               (order_id, supplier_id, gstin_number, order_date))
+                execute_values(cursor,
+                               f"""INSERT INTO Purchase_Order_Line ({", ".join(ORDER_LINE_COLUMNS)}) VALUES %s""",
+                               order_lines.itertuples(index=False, name=None), page_size=len(order_lines))
+                return len(order_lines)
+
+    def get_purchase_order_ids(self):
+        with database_errors("Failed to fetch purchase order IDs"):
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                cursor.execute("""SELECT order_id FROM Purchase_Order ORDER BY order_id""")
+                order_ids = cursor.fetchall()
+                if len(order_ids) > 0:
+                    return [order_id[0] for order_id in order_ids]
+                else:
+                    raise NotFoundError("No records found in Purchase_Order table")
+
+    # Typeahead lookup for the purchase order picker, as (order_id, order_date, supplier_name):
+    def search_purchase_order_ids(self, text: str = "", limit: int = 20):
+        with database_errors("Failed to fetch purchase order IDs"):
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                cursor.execute(*build_typeahead(
+                    """SELECT o.order_id, o.order_date, s.supplier_name
+                       FROM Purchase_Order o JOIN Supplier s ON s.supplier_id = o.supplier_id""",
+                    "o.order_id", text.strip(), limit))
+                return cursor.fetchall()
+
+    # One invoice for a whole order, fetched in a single joined query:
+    def generate_purchase_order_invoice(self, order_id: int):
+        with database_errors("Failed to fetch records from Purchase_Order table"):
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                cursor.execute(PURCHASE_ORDER_INVOICE_QUERY + """ WHERE o.order_id = %s ORDER BY l.line_no""",
+                               (order_id,))
+                invoice_records = cursor.fetchall()
+                if len(invoice_records) > 0:
+                    return TaxInvoice.from_rows(invoice_records)
+                else:
+                    raise NotFoundError("No records found in Purchase_Order table")
@@ -1,14 +1,32 @@
 import pandas as pd
 import streamlit as st
-import psycopg2
-import pdfkit
-from datetime import datetime
-from jinja2 import Environment, FileSystemLoader, select_autoescape
-import requests
 import tempfile
-
-
-from database_connection.database_connection import DatabaseConnection
+import os
+import shutil
+
+
+from billing.billing import PURCHASE_SORT_KEYS, Billing
+from billing.bulk_invoice import generate_bulk_invoices
+from billing.invoice_jobs import invoice_job_poll_seconds
+from billing.pdf_backend import render_pdf
+from billing.purchase_export import EXPORT_FORMATS, PARTITION_KEYS, write_purchases
+from billing.purchase_import import import_purchases
+from billing.reports import REPORTS, Reports, get_report_refresher, report_bytes
+from billing.tax_invoice import render_tax_invoice, tax_invoice_pdf_filename
+from database_connection.database_connection import get_connection_pool
+from products.product import Product
+from suppliers.supplier import Supplier
+from ui.pickers import search_picker
+from ui.streamlit_adapter import StreamlitAdapter
+from validation.validation import PURCHASE_RULES, validate_record
+
+# Confirmations shown after a successful change:
+PURCHASE_SUCCESS_MESSAGES = {
+    "insert_purchase": "{} Record(s) inserted successfully into Purchase table",
+    "update_purchase": "{} Record(s) updated successfully in Purchase table",
+    "delete_purchase": "{} Record(s) deleted successfully from Purchase table",
+    "insert_purchase_order": "Purchase Order {1} inserted successfully with {0} line(s)",
+}
 
 
 # Validating User Inputs:
@@ -16,542 +34,476 @@ def validate_inputs(purchase_id: int, supplier_id: int, gstin_number: str, produ
                     unit_price: float, total_price: float,
                     discount: float, cgst: float, sgst: float, igst: float, amount: float, purchase_date: str,
                     item_description: str):
-    if not purchase_id or purchase_id <= 0:
-        st.warning("Please enter the Purchase ID")
-        return False
-    if not supplier_id or supplier_id <= 0:
-        st.warning("Please enter existing Supplier ID")
-        return False
-    if not gstin_number.strip():
-        st.warning("Please enter existing GSTIN Number")
-        return False
-    if not product_id or product_id <= 0:
-        st.warning("Please enter existing Product ID")
-        return False
-    if quantity <= 0:
-        st.warning("Please enter valid Quantity")
-        return False
-    if unit_price <= 0.0:
-        st.warning("Please enter valid Unit Price")
-        return False
-    if total_price <= 0.0:
-        st.warning("Please enter valid Total Price")
-        return False
-    if discount < 0.0:
-        st.warning("Please enter valid Discount")
-        return False
-    if cgst < 0.0:
-        st.warning("Please enter valid CGST")
-        return False
-    if sgst < 0.0:
-        st.warning("Please enter valid SGST")
-        return False
-    if igst < 0.0:
-        st.warning("Please enter valid IGST")
-        return False
-    if amount <= 0.0:
-        st.warning("Please enter valid Amount")
-        return False
-    if not purchase_date:
-        st.warning("Please enter the Purchase Date")
-        return False
-    if not item_description.strip():
-        st.warning("Please enter the Item")
+    errors = validate_record(PURCHASE_RULES, purchase_id=purchase_id, supplier_id=supplier_id,
+                             gstin_number=gstin_number, product_id=product_id, quantity=quantity,
+                             unit_price=unit_price, total_price=total_price, discount=discount, cgst=cgst, sgst=sgst,
+                             igst=igst, amount=amount, purchase_date=purchase_date,
+                             item_description=item_description)
+    if errors:
+        st.warning(errors[0])
         return False
     else:
         return True
 
 
-# Creating Billing Class:
-class Billing:
-    def __init__(self, connection):
-        self.connection = connection
-
-    def insert_purchase(self, purchase_id: int, supplier_id: int, gstin_number: str, product_id: int, quantity: int,
-                        unit_price: float, total_price: float, discount: float, cgst: float, sgst: float, igst: float,
-                        amount: float, purchase_date: str, item_description: str):
-        try:
-            cursor = self.connection.cursor()
-            postgres_insert_query = """INSERT INTO Purchase (purchase_id, supplier_id, gstin_number, product_id, quantity, unit_price, total_price, discount, cgst, sgst, igst, amount, purchase_date, item_description) VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)"""
-            record_to_insert = (
-                purchase_id, supplier_id, gstin_number, product_id, quantity, unit_price, total_price, discount,
-                cgst, sgst, igst, amount, purchase_date, item_description)
-            cursor.execute(postgres_insert_query, record_to_insert)
-            self.connection.commit()
-            count = cursor.rowcount
-            st.success(f"{count} Record(s) inserted successfully into Purchase table")
-        except (Exception, psycopg2.Error) as error:
-            st.error("Failed to insert record into Purchase table: " + str(error))
-
-    def update_purchase(self, purchase_id: int, supplier_id: int, gstin_number: str, product_id: int, quantity: int,
-                        unit_price: float, total_price: float, discount: float, cgst: float, sgst: float, igst: float,
-                        amount: float, purchase_date: str, item_description: str):
-        try:
-            cursor = self.connection.cursor()
-            postgres_update_query = """UPDATE Purchase SET supplier_id = %s, gstin_number = %s, product_id = %s, quantity = %s, unit_price = %s, total_price = %s, discount = %s, cgst = %s, sgst = %s, igst = %s, amount = %s, purchase_date = %s, item_description = %s WHERE purchase_id = %s"""
-            record_to_update = (
-                supplier_id, gstin_number, product_id, quantity, unit_price, total_price, discount, cgst, sgst,
-                igst, amount, purchase_date, item_description, purchase_id)
-            cursor.execute(postgres_update_query, record_to_update)
-            self.connection.commit()
-            count = cursor.rowcount
-            st.success(f"{count} Record(s) updated successfully in Purchase table")
-        except (Exception, psycopg2.Error) as error:
-            st.error("Failed to update record in Purchase table: " + str(error))
-
-    def delete_purchase(self, purchase_id: int):
-        try:
-            cursor = self.connection.cursor()
-            postgres_delete_query = """DELETE FROM Purchase WHERE purchase_id = %s"""
-            cursor.execute(postgres_delete_query, (purchase_id,))
-            self.connection.commit()
-            count = cursor.rowcount
-            st.success(f"{count} Record(s) deleted successfully from Purchase table")
-        except (Exception, psycopg2.Error) as error:
-            st.error("Failed to delete record from Purchase table: " + str(error))
-
-    def show_all_purchase(self):
-        try:
-            cursor = self.connection.cursor()
-            cursor.execute("""SELECT * FROM Purchase""")
-            purchase_records = cursor.fetchall()
-            if len(purchase_records) > 0:
-                return purchase_records
-            else:
-                st.info("No records found in Purchase table")
-                return None
-        except (Exception, psycopg2.Error) as error:
-            st.error("Failed to fetch records from Purchase table: " + str(error))
-            return None
-
-    def search_purchase(self, **kwargs):
-        try:
-            cursor = self.connection.cursor()
-            search_query = """SELECT * FROM Purchase WHERE """
-            conditions = []
-            values = []
-            for key, value in kwargs.items():
-                if value is not None and value != "":
-                    conditions.append(f"{key} = %s")
-                    values.append(value)
-            search_query += " AND ".join(conditions)
-            cursor.execute(search_query, values)
-            purchase_records = cursor.fetchall()
-            if len(purchase_records) > 0:
-                return purchase_records
-            else:
-                st.info("No records found in Purchase table")
-                return None
-        except (Exception, psycopg2.Error) as error:
-            st.error("Failed to fetch records from Purchase table: " + str(error))
-            return None
-
-    def get_gstin_number(self, supplier_id: int):
-        try:
-            cursor = self.connection.cursor()
-            cursor.execute("""SELECT gstin_number FROM Supplier WHERE supplier_id = %s""", (supplier_id,))
-            gstin_number = cursor.fetchone()
-            if gstin_number:
-                return gstin_number[0]
-            else:
-                st.info("No records found in Supplier table")
-                return None
-        except (Exception, psycopg2.Error) as error:
-            st.error("Failed to fetch records from Supplier table: " + str(error))
-            return None
-
-    def get_product_price(self, product_id: int):
-        try:
-            cursor = self.connection.cursor()
-            cursor.execute("""SELECT unit_price FROM Product WHERE product_id = %s""", (product_id,))
-            unit_price = cursor.fetchone()
-            if unit_price:
-                return unit_price[0]
-            else:
-                st.info("No records found in Product table")
-                return None
-        except (Exception, psycopg2.Error) as error:
-            st.error("Failed to fetch records from Product table: " + str(error))
-            return None
-
-    def get_item(self, product_id: int):
-        try:
-            cursor = self.connection.cursor()
-            cursor.execute("""SELECT product_name, description, category FROM Product WHERE product_id = %s""",
-                           (product_id,))
-            item = cursor.fetchone()
-            if item:
-                item_description = f"Product Name: {item[0]}\nDescription: {item[1]}\nCategory: {item[2]}"
-                return item_description
-            else:
-                st.info("No records found in Product table")
-                return None
-        except (Exception, psycopg2.Error) as error:
-            st.error("Failed to fetch records from Product table: " + str(error))
-            return None
-
-    def purchase_details(self, purchase_id: int):
-        try:
-            cursor = self.connection.cursor()
-            cursor.execute("""SELECT * FROM Purchase WHERE purchase_id = %s""", (purchase_id,))
-            purchase_record = cursor.fetchone()
-            if purchase_record is not None:
-                supplier_id = purchase_record[1]
-                gstin_number = purchase_record[2]
-                product_id = purchase_record[3]
-                quantity = purchase_record[4]
-                unit_price = purchase_record[5]
-                total_price = purchase_record[6]
-                discount = purchase_record[7]
-                cgst = purchase_record[8]
-                sgst = purchase_record[9]
-                igst = purchase_record[10]
-                amount = purchase_record[11]
-                purchase_date = purchase_record[12]
-                item_description = purchase_record[13]
-                return [supplier_id, gstin_number, product_id, quantity, unit_price, total_price, discount, cgst, sgst,
-                        igst, amount, purchase_date, item_description]
-            else:
-                st.info("No records found in Purchase table")
-                return None
-        except (Exception, psycopg2.Error) as error:
-            st.error("Failed to fetch records from Purchase table: " + str(error))
-            return None
-
-    def get_purchase_ids(self):
-        try:
-            cursor = self.connection.cursor()
-            cursor.execute("""SELECT purchase_id FROM Purchase""")
-            purchase_ids = cursor.fetchall()
-            if len(purchase_ids) > 0:
-                list_purchase_ids = [purchase_id[0] for purchase_id in purchase_ids]
-                return sorted(list_purchase_ids)
-            else:
-                st.info("No records found in Purchase table")
-                return None
-        except (Exception, psycopg2.Error) as error:
-            st.error("Failed to fetch purchase IDs: " + str(error))
-            return None
-
-    def get_all_suppliers(self):
-        try:
-            cursor = self.connection.cursor()
-            cursor.execute("""SELECT supplier_id FROM Supplier""")
-            supplier_ids = cursor.fetchall()
-            if len(supplier_ids) > 0:
-                list_supplier_ids = [supplier_id[0] for supplier_id in supplier_ids]
-                return sorted(list_supplier_ids)
-            else:
-                st.info("No records found in Supplier table")
-                return None
-        except (Exception, psycopg2.Error) as error:
-            st.error("Failed to fetch supplier IDs: " + str(error))
-            return None
-
-    def get_products_for_supplier(self, supplier_id: int):
-        try:
-            cursor = self.connection.cursor()
-            cursor.execute("""SELECT product_id FROM Product WHERE supplier_id = %s""", (supplier_id,))
-            product_ids = cursor.fetchall()
-            if len(product_ids) > 0:
-                list_product_ids = [product_id[0] for product_id in product_ids]
-                return sorted(list_product_ids)
-            else:
-                st.info("No records found in Product table")
-                return None
-        except (Exception, psycopg2.Error) as error:
-            st.error("Failed to fetch product IDs for the supplier: " + str(error))
-            return None
-
-    def generate_tax_invoice_per_product(self, purchase_id: int):
+# Insert/Update form for one purchase. Editing a field reruns only this fragment: the pickers issue one LIMITed
+# lookup each, and the GSTIN, product, price and item lookups are served from the reference cache for the selected
+# supplier/product, so typing a discount or tax amount costs no more than that:
+@st.experimental_fragment
+def purchase_form(billing, suppliers, products, updating=False):
+    updated = "updated " if updating else ""
+    if updating:
+        purchase_id = search_picker("Purchase ID", billing.search_purchase_ids, key="purchase_id",
+                                    help="Search the unique numeric ID of the purchase record you want to update",
+                                    placeholder="Type a purchase ID...")
+    else:
+        purchase_id = st.number_input("Purchase ID", value=None, placeholder="Type a number...", step=1,
+                                      key="purchase_id", help="Enter the unique numeric ID for the new purchase record")
+    supplier_id = search_picker("Supplier ID", suppliers.search_suppliers, key="supplier_id",
+                                help=f"Search the {updated}supplier by ID, name or GSTIN Number")
+    get_gstin_number = billing.get_gstin_number(supplier_id) if supplier_id else None
+    gstin_number = st.text_input("GSTIN Number", value=get_gstin_number, key="gstin_number",
+                                 help=f"Enter the {updated or 'existing '}GSTIN Number of the supplier",
+                                 disabled=not updating)
+    product_id = search_picker("Product ID", lambda text, limit: products.search_products(text, supplier_id, limit)
+                               if supplier_id else [], key="product_id", scope=supplier_id,
+                               help=f"Search the {updated}product of the selected supplier by ID or name")
+    quantity = st.number_input("Quantity", value=1, placeholder="Type a number...", step=1, key="quantity",
+                               help=f"Enter the {updated}quantity of the product purchased")
+    product_price = billing.get_product_price(product_id) if product_id else None
+    unit_price = st.number_input("Unit Price", value=product_price, key="unit_price",
+                                 help=f"Enter the {updated}unit price of the product", disabled=not updating)
+    tot_price = (quantity * unit_price) if quantity and unit_price else 0.0
+    total_price = st.number_input("Total Price", value=tot_price, key="total_price",
+                                  help=f"Calculate the {updated}total price of the purchase", disabled=True)
+    discount = st.number_input("Discount", value=0.0, key="discount", help=f"Enter the {updated}discount amount")
+    cgst = st.number_input("CGST", value=0.0, key="cgst", help=f"Enter the {updated}CGST amount")
+    sgst = st.number_input("SGST", value=0.0, key="sgst", help=f"Enter the {updated}SGST amount")
+    igst = st.number_input("IGST", value=0.0, key="igst", help=f"Enter the {updated}IGST amount")
+    final_amount = (total_price - discount + cgst + sgst + igst)
+    amount = st.number_input("Amount", value=final_amount, key="amount",
+                             help=f"Calculate the {updated}total amount of the purchase", disabled=True)
+    purchase_date = st.date_input("Purchase Date", key="purchase_date",
+                                  help=f"Select the {updated}date of the purchase")
+    item = billing.get_item(product_id) if product_id else None
+    item_description = st.text_area("Item", value=item, key="item", help=f"Enter the {updated}item description")
+    if st.button("Update Purchase" if updating else "Insert Purchase"):
         try:
-            cursor = self.connection.cursor()
-            cursor.execute("""SELECT * FROM Purchase WHERE purchase_id = %s""", (purchase_id,))
-            purchase_record = cursor.fetchone()
-            if purchase_record is not None:
-                supplier_id = purchase_record[1]
-                gstin_number = purchase_record[2]
-                product_id = purchase_record[3]
-                quantity = purchase_record[4]
-                unit_price = purchase_record[5]
-                gross_amount = purchase_record[6]
-                discount = purchase_record[7]
-                cgst = purchase_record[8]
-                sgst = purchase_record[9]
-                igst = purchase_record[10]
-                amount = purchase_record[11]
-                purchase_date = purchase_record[12]
-                cursor.execute("""SELECT * FROM Supplier WHERE supplier_id = %s""", (supplier_id,))
-                supplier_record = cursor.fetchone()
-                if supplier_record is not None:
-                    supplier_name = supplier_record[1]
-                    supplier_mobile = supplier_record[4]
-                    supplier_address = supplier_record[5]
-                    supplier_city = supplier_record[6]
-                    supplier_state = supplier_record[7]
-                    supplier_country = supplier_record[8]
-                    supplier_pincode = supplier_record[9]
-                cursor.execute("""SELECT * FROM Product WHERE product_id = %s""", (product_id,))
-                product_record = cursor.fetchone()
-                if product_record is not None:
-                    product_name = product_record[1]
-            # Saving in a dictionary:
-            address = supplier_address + ", " + supplier_city + "\n" + supplier_state + ", " + supplier_country + " - " + supplier_pincode
-            tax_invoice = {"invoice_no": purchase_id, "supplier_name": supplier_name,
-                           "supplier_phone": supplier_mobile,
-                           "supplier_address": address, "supplier_gstin": gstin_number,
-                           "product_name": product_name,
-                           "quantity": quantity, "gross_amount": gross_amount, "discount": discount, "cgst": cgst,
-                           "sgst": sgst,
-                           "igst": igst, "total": amount, "invoice_date": purchase_date}
-            return tax_invoice
-        except (Exception, psycopg2.Error) as error:
-            st.error("Failed to fetch records from Purchase table: " + str(error))
-            return None
+            if validate_inputs(purchase_id, supplier_id, gstin_number, product_id, quantity, unit_price,
+                               total_price,
+                               discount, cgst, sgst, igst, amount, purchase_date, item_description):
+                save = billing.update_purchase if updating else billing.insert_purchase
+                save(purchase_id, supplier_id, gstin_number,
+                     product_id, quantity, unit_price,
+                     total_price, discount, cgst, sgst,
+                     igst, amount, purchase_date, item_description)
+        except Exception as e:
+            st.error(f"Failed to {'update' if updating else 'insert'} record "
+                     f"{'in' if updating else 'into'} Purchase table: " + str(e))
 
 
 # Streamlit UI for Billing Management:
 def main_billing():
-    # Initialize session state
-    if 'db_connection' not in st.session_state:
-        st.session_state.db_connection = DatabaseConnection().connect()
+    # Borrow connections from the shared pool per operation:
+    pool = get_connection_pool()
     st.header("Purchase Billing Management")
     try:
-        billing = Billing(st.session_state.db_connection)
-        if billing.connection is not None:
+        billing = StreamlitAdapter(Billing(pool), PURCHASE_SUCCESS_MESSAGES)
+        suppliers = StreamlitAdapter(Supplier(pool))
+        products = StreamlitAdapter(Product(pool))
+        if billing.pool is not None:
             billing_menu = st.selectbox("Billing Menu",
-                                        ["Insert", "Show All", "Search", "Update", "Delete", "Generate Tax Invoice"],
+                                        ["Insert", "Bulk Import", "Purchase Order", "Show All", "Search",
+                                         "Text Search", "Update", "Delete", "Generate Tax Invoice",
+                                         "Purchase Order Invoice", "Bulk Tax Invoices", "Reports", "Export"],
                                         key="billing_menu",
                                         help="Select the operation you want to perform on the Purchase table")
 
             # Insert New Purchase Record:
             if billing_menu == "Insert":
                 st.subheader("Insert New Purchase Record")
-                purchase_id = st.number_input("Purchase ID", value=None, placeholder="Type a number...", step=1,
-                                              key="purchase_id",
-                                              help="Enter the unique numeric ID for the new purchase record")
-                supplier_ids = billing.get_all_suppliers()
-                supplier_id = st.selectbox("Supplier ID", options=supplier_ids, key="supplier_id",
-                                           help="Select the numeric ID of the supplier")
-                get_gstin_number = billing.get_gstin_number(supplier_id) if supplier_id else None
-                gstin_number = st.text_input("GSTIN Number", value=get_gstin_number, key="gstin_number",
-                                             help="Enter the existing GSTIN Number of the supplier", disabled=True)
-                products_for_supplier = billing.get_products_for_supplier(supplier_id)
-                product_id = st.selectbox("Product ID", options=products_for_supplier, key="product_id",
-                                          help="Select the product ID related to the selected supplier")
-                quantity = st.number_input("Quantity", value=1, step=1, key="quantity",
-                                           help="Enter the quantity of the product purchased")
-                product_price = billing.get_product_price(product_id) if product_id else None
-                unit_price = st.number_input("Unit Price", value=product_price, key="unit_price",
-                                             help="Enter the unit price of the product", disabled=True)
-                tot_price = (quantity * unit_price) if quantity and unit_price else 0.0
-                total_price = st.number_input("Total Price", value=tot_price, key="total_price",
-                                              help="Calculate the total price of the purchase", disabled=True)
-                discount = st.number_input("Discount", value=0.0, key="discount", help="Enter the discount amount")
-                cgst = st.number_input("CGST", value=0.0, key="cgst", help="Enter the CGST amount")
-                sgst = st.number_input("SGST", value=0.0, key="sgst", help="Enter the SGST amount")
-                igst = st.number_input("IGST", value=0.0, key="igst", help="Enter the IGST amount")
-                final_amount = (total_price - discount + cgst + sgst + igst)
-                amount = st.number_input("Amount", value=final_amount, key="amount",
-                                         help="Calculate the total amount of the purchase", disabled=True)
-                purchase_date = st.date_input("Purchase Date", key="purchase_date",
-                                              help="Select the date of the purchase")
-                item = billing.get_item(product_id) if product_id else None
-                item_description = st.text_area("Item", value=item, key="item", help="Enter the item description")
-                if st.button("Insert Purchase"):
+                purchase_form(billing, suppliers, products)
+
+            # Bulk Import Purchase Records:
+            elif billing_menu == "Bulk Import":
+                st.subheader("Bulk Import Purchase Records")
+                uploaded_file = st.file_uploader("Purchase File", type=["csv", "parquet"], key="purchase_file",
+                                                 help="Upload a CSV or Parquet file with purchase_id, supplier_id, "
+                                                      "product_id, quantity, purchase_date and optional discount, "
+                                                      "cgst, sgst, igst and item_description columns")
+                if uploaded_file is not None and st.button("Import Purchases"):
                     try:
-                        if validate_inputs(purchase_id, supplier_id, gstin_number, product_id, quantity, unit_price,
-                                           total_price,
-                                           discount, cgst, sgst, igst, amount, purchase_date, item_description):
-                            billing.insert_purchase(purchase_id, supplier_id, gstin_number,
-                                                    product_id, quantity, unit_price,
-                                                    total_price, discount, cgst, sgst,
-                                                    igst, amount, purchase_date, item_description)
+                        progress_text = st.empty()
+                        result = import_purchases(billing.pool, uploaded_file,
+                                                  progress=lambda rows_read: progress_text.text(
+                                                      f"Read {rows_read} rows..."))
+                        st.success(f"{result.inserted} Record(s) inserted successfully into Purchase table "
+                                   f"({result.rows_per_second:.0f} rows/s)")
+                        if len(result.rejected) > 0:
+                            st.warning(f"{len(result.rejected)} row(s) were rejected")
+                            st.dataframe(result.rejected.head(100), hide_index=True)
+                            st.download_button("⬇️ Rejected Rows", result.rejected.to_csv(index=False),
+                                               "rejected_purchases.csv", "text/csv")
                     except Exception as e:
-                        st.error("Failed to insert record into Purchase table: " + str(e))
+                        st.error("Failed to import records into Purchase table: " + str(e))
+
+            # Insert New Purchase Order:
+            elif billing_menu == "Purchase Order":
+                st.subheader("Insert New Purchase Order")
+                order_id = st.number_input("Order ID", value=None, placeholder="Type a number...", step=1,
+                                           key="order_id", help="Enter the numeric ID of the purchase order")
+                supplier_id = search_picker("Supplier ID", suppliers.search_suppliers, key="order_supplier_id",
+                                            index=None, help="Search the supplier who issued the bill by ID, name or "
+                                                             "GSTIN Number")
+                gstin_number = billing.get_gstin_number(supplier_id) if supplier_id else None
+                st.text_input("GSTIN Number", value=gstin_number or "", disabled=True, key="order_gstin_number")
+                order_date = st.date_input("Order Date", value=None, key="order_date",
+                                           help="Enter the date of the supplier bill")
+                product_ids = billing.get_products_for_supplier(supplier_id) if supplier_id else None
+                lines = st.data_editor(
+                    pd.DataFrame({"product_id": pd.Series(dtype="Int64"), "quantity": pd.Series(dtype="Int64"),
+                                  "discount": pd.Series(dtype=float), "cgst": pd.Series(dtype=float),
+                                  "sgst": pd.Series(dtype=float), "igst": pd.Series(dtype=float)}),
+                    num_rows="dynamic", hide_index=True, key="order_lines",
+                    column_config={"product_id": st.column_config.SelectboxColumn("Product ID",
+                                                                                  options=product_ids or []),
+                                   "quantity": st.column_config.NumberColumn("Quantity", min_value=1, step=1),
+                                   "discount": st.column_config.NumberColumn("Discount", min_value=0.0),
+                                   "cgst": st.column_config.NumberColumn("CGST", min_value=0.0),
+                                   "sgst": st.column_config.NumberColumn("SGST", min_value=0.0),
+                                   "igst": st.column_config.NumberColumn("IGST", min_value=0.0)})
+                if st.button("Insert Purchase Order"):
+                    try:
+                        billing.insert_purchase_order(order_id, supplier_id, gstin_number, order_date, lines)
+                    except Exception as e:
+                        st.error("Failed to insert record into Purchase_Order table: " + str(e))
 
             # Show All Purchase Records:
             elif billing_menu == "Show All":
                 st.subheader("Show All Purchase Records")
                 try:
-                    purchase_records = billing.show_all_purchase()
-                    if purchase_records is not None:
+                    sort_key = st.selectbox("Sort By", PURCHASE_SORT_KEYS, key="purchase_sort_key",
+                                            help="Select the column the purchase records are ordered by")
+                    page_size = st.selectbox("Records per Page", [25, 50, 100, 500], index=1,
+                                             key="purchase_page_size", help="Select how many records to show per page")
+                    # Keep a stack of cursor tokens so the user can page back; reset it when the ordering changes:
+                    if st.session_state.get("purchase_page_state") != (sort_key, page_size):
+                        st.session_state.purchase_page_state = (sort_key, page_size)
+                        st.session_state.purchase_page_cursors = [None]
+                    page_cursors = st.session_state.purchase_page_cursors
+                    page = billing.list_purchase(page_size=page_size, sort_key=sort_key, cursor=page_cursors[-1])
+                    if page is not None:
                         columns = ["Purchase ID", "Supplier ID", "GSTIN Number", "Product ID", "Quantity", "Unit Price",
                                    "Total Price", "Discount", "CGST", "SGST", "IGST", "Amount", "Purchase Date",
                                    "Item Description"]
-                        df = pd.DataFrame(purchase_records, columns=columns)
+                        df = pd.DataFrame(page.rows, columns=columns)
                         st.dataframe(df, hide_index=True)
+                        total_pages = max(1, -(-page.total_estimate // page_size))
+                        st.caption(f"Page {len(page_cursors)} of about {total_pages} "
+                                   f"(~{page.total_estimate} records)")
+                        previous_column, next_column = st.columns(2)
+                        if previous_column.button("Previous Page", key="purchase_previous_page",
+                                                  disabled=len(page_cursors) == 1):
+                            page_cursors.pop()
+                            st.rerun()
+                        if next_column.button("Next Page", key="purchase_next_page",
+                                              disabled=page.next_cursor is None):
+                            page_cursors.append(page.next_cursor)
+                            st.rerun()
                 except Exception as e:
                     st.error("Failed to fetch records from Purchase table: " + str(e))
 
             # Update Existing Purchase Record:
             elif billing_menu == "Update":
                 st.subheader("Update Existing Purchase Record")
-                list_purchase_ids = billing.get_purchase_ids()
-                purchase_id = st.selectbox("Purchase ID", options=list_purchase_ids, key="purchase_id",
-                                           help="Select the unique numeric ID of the purchase record you want to update")
-                supplier_ids = billing.get_all_suppliers()
-                supplier_id = st.selectbox("Supplier ID", options=supplier_ids, key="supplier_id",
-                                           help="Select the updated numeric ID of the supplier")
-                gstin_number = billing.get_gstin_number(supplier_id) if supplier_id else None
-                gstin_number = st.text_input("GSTIN Number", value=gstin_number, key="gstin_number",
-                                             help="Enter the updated GSTIN Number of the supplier")
-                products_for_supplier = billing.get_products_for_supplier(supplier_id)
-                product_id = st.selectbox("Product ID", options=products_for_supplier, key="product_id",
-                                          help="Select the updated product ID related to the selected supplier")
-                quantity = st.number_input("Quantity", value=1, placeholder="Type a number...", step=1, key="quantity",
-                                           help="Enter the updated quantity of the product purchased")
-                product_price = billing.get_product_price(product_id) if product_id else None
-                unit_price = st.number_input("Unit Price", value=product_price, key="unit_price",
-                                             help="Enter the updated unit price of the product")
-                tot_price = (quantity * unit_price) if quantity and unit_price else 0.0
-                total_price = st.number_input("Total Price", value=tot_price, key="total_price",
-                                              help="Calculate the updated total price of the purchase", disabled=True)
-                discount = st.number_input("Discount", value=0.0, key="discount",
-                                           help="Enter the updated discount amount")
-                cgst = st.number_input("CGST", value=0.0, key="cgst", help="Enter the updated CGST amount")
-                sgst = st.number_input("SGST", value=0.0, key="sgst", help="Enter the updated SGST amount")
-                igst = st.number_input("IGST", value=0.0, key="igst", help="Enter the updated IGST amount")
-                final_amount = (total_price - discount + cgst + sgst + igst)
-                amount = st.number_input("Amount", value=final_amount, key="amount",
-                                         help="Calculate the updated total amount of the purchase", disabled=True)
-                purchase_date = st.date_input("Purchase Date", key="purchase_date",
-                                              help="Select the updated date of the purchase")
-                item = billing.get_item(product_id) if product_id else None
-                item_description = st.text_area("Item", value=item, key="item",
-                                                help="Enter the updated item description")
-                if st.button("Update Purchase"):
-                    try:
-                        if validate_inputs(purchase_id, supplier_id, gstin_number, product_id, quantity, unit_price,
-                                           total_price,
-                                           discount, cgst, sgst, igst, amount, purchase_date, item_description):
-                            billing.update_purchase(purchase_id, supplier_id, gstin_number,
-                                                    product_id, quantity, unit_price,
-                                                    total_price, discount, cgst, sgst,
-                                                    igst, amount, purchase_date, item_description)
-                    except Exception as e:
-                        st.error("Failed to update record in Purchase table: " + str(e))
+                purchase_form(billing, suppliers, products, updating=True)
 
             # Search Purchase Record:
             elif billing_menu == "Search":
                 st.subheader("Search Purchase Record")
-                list_purchase_ids = billing.get_purchase_ids()
-                purchase_id = st.selectbox("Purchase ID", options=list_purchase_ids, key="purchase_id",
-                                           help="Select the numeric ID of the purchase record you want to search")
-                supplier_ids = billing.get_all_suppliers()
-                supplier_id = st.selectbox("Supplier ID", options=supplier_ids, key="supplier_id",
-                                           help="Select the numeric ID of the supplier")
-                products_for_supplier = billing.get_products_for_supplier(supplier_id)
-                product_id = st.selectbox("Product ID", options=products_for_supplier, key="product_id",
-                                          help="Select the product ID related to the selected supplier")
-                purchase_date = st.date_input("Purchase Date", key="purchase_date",
-                                              help="Select the date of the purchase")
+                purchase_id = search_picker("Purchase ID", billing.search_purchase_ids, key="purchase_id", index=None,
+                                            help="Search the numeric ID of the purchase record you want to search",
+                                            placeholder="Type a purchase ID...")
+                supplier_ids = search_picker("Supplier ID", suppliers.search_suppliers, key="supplier_ids",
+                                             multiple=True, help="Search one or more suppliers by ID, name or "
+                                                                 "GSTIN Number")
+                product_id = st.number_input("Product ID", value=None, placeholder="Type a number...", step=1,
+                                             min_value=1, key="product_id", help="Enter the numeric ID of the product")
+                gstin_prefix = st.text_input("GSTIN Number Starts With", key="gstin_prefix",
+                                             help="Enter the leading characters of the supplier GSTIN Number")
+                date_range = st.date_input("Purchase Date Range", value=(), key="purchase_date_range",
+                                           help="Select the first and last date of the purchases")
+                min_amount_column, max_amount_column = st.columns(2)
+                min_amount = min_amount_column.number_input("Minimum Amount", value=None, min_value=0.0,
+                                                            key="min_amount", help="Enter the lowest purchase amount")
+                max_amount = max_amount_column.number_input("Maximum Amount", value=None, min_value=0.0,
+                                                            key="max_amount", help="Enter the highest purchase amount")
+                # The filters of the last search stay in the session with a stack of cursor tokens, so the user can
+                # page through the matches; a new search starts again from the first page:
                 if st.button("Search", key="search"):
+                    start_date = date_range[0] if len(date_range) > 0 else None
+                    end_date = date_range[1] if len(date_range) > 1 else start_date
+                    st.session_state.purchase_search_filters = dict(purchase_id=purchase_id,
+                                                                    supplier_id__in=supplier_ids,
+                                                                    product_id=product_id,
+                                                                    gstin_number__prefix=gstin_prefix.strip(),
+                                                                    purchase_date__gte=start_date,
+                                                                    purchase_date__lte=end_date,
+                                                                    amount__gte=min_amount,
+                                                                    amount__lte=max_amount)
+                    st.session_state.purchase_search_cursors = [None]
+                if "purchase_search_filters" in st.session_state:
                     try:
-                        purchase_records = billing.search_purchase(purchase_id=purchase_id if purchase_id else None,
-                                                                   supplier_id=supplier_id if supplier_id else None,
-                                                                   product_id=product_id if product_id else None,
-                                                                   purchase_date=purchase_date if purchase_date else None)
-                        if purchase_records is not None:
+                        page_cursors = st.session_state.purchase_search_cursors
+                        page = billing.search_purchase(cursor=page_cursors[-1],
+                                                       **st.session_state.purchase_search_filters)
+                        if page is not None:
                             columns = ["Purchase ID", "Supplier ID", "GSTIN Number", "Product ID", "Quantity",
                                        "Unit Price",
                                        "Total Price", "Discount", "CGST", "SGST", "IGST", "Amount", "Purchase Date",
                                        "Item Description"]
-                            df = pd.DataFrame(purchase_records, columns=columns)
+                            df = pd.DataFrame(page.rows, columns=columns)
                             st.dataframe(df, hide_index=True)
+                            st.caption(f"Page {len(page_cursors)} (~{page.total_estimate} matching records)")
+                            previous_column, next_column = st.columns(2)
+                            if previous_column.button("Previous Page", key="purchase_search_previous_page",
+                                                      disabled=len(page_cursors) == 1):
+                                page_cursors.pop()
+                                st.rerun()
+                            if next_column.button("Next Page", key="purchase_search_next_page",
+                                                  disabled=page.next_cursor is None):
+                                page_cursors.append(page.next_cursor)
+                                st.rerun()
+                    except Exception as e:
+                        st.error("Failed to fetch records from Purchase table: " + str(e))
+
+            # Ranked Text Search over Item Descriptions:
+            elif billing_menu == "Text Search":
+                st.subheader("Text Search Purchase Records")
+                search_text = st.text_input("Search Text", key="purchase_search_text",
+                                            help="Enter words (or the start of words) from the item description, "
+                                                 "e.g. copper wire")
+                if search_text.strip():
+                    try:
+                        # Keep a stack of cursor tokens so the user can page back; reset it when the search changes:
+                        if st.session_state.get("purchase_text_search_state") != search_text:
+                            st.session_state.purchase_text_search_state = search_text
+                            st.session_state.purchase_text_search_cursors = [None]
+                        page_cursors = st.session_state.purchase_text_search_cursors
+                        page = billing.search_purchase_text(search_text, cursor=page_cursors[-1])
+                        if page is not None:
+                            columns = ["Purchase ID", "Supplier ID", "GSTIN Number", "Product ID", "Quantity",
+                                       "Unit Price", "Total Price", "Discount", "CGST", "SGST", "IGST", "Amount",
+                                       "Purchase Date", "Item Description", "Rank"]
+                            df = pd.DataFrame(page.rows, columns=columns)
+                            st.dataframe(df, hide_index=True)
+                            st.caption(f"Page {len(page_cursors)}, best matches first among the "
+                                       f"{page.total_estimate} most recent matches")
+                            if page.similar:
+                                st.info("No word starts with the text typed, so the closest spellings are shown instead.")
+                            if page.truncated:
+                                st.warning(f"Only the {page.total_estimate} most recent matches are ranked; add words to the search "
+                                           f"to reach older records.")
+                            previous_column, next_column = st.columns(2)
+                            if previous_column.button("Previous Page", key="purchase_text_search_previous_page",
+                                                      disabled=len(page_cursors) == 1):
+                                page_cursors.pop()
+                                st.rerun()
+                            if next_column.button("Next Page", key="purchase_text_search_next_page",
+                                                  disabled=page.next_cursor is None):
+                                page_cursors.append(page.next_cursor)
+                                st.rerun()
                     except Exception as e:
                         st.error("Failed to fetch records from Purchase table: " + str(e))
 
             # Delete Existing Purchase Record:
             elif billing_menu == "Delete":
                 st.subheader("Delete Existing Purchase Record")
-                list_purchase_ids = billing.get_purchase_ids()
-                purchase_id = st.selectbox("Purchase ID", options=list_purchase_ids, key="purchase_id",
-                                           help="Select the numeric ID of the purchase record you want to delete")
+                purchase_id = search_picker("Purchase ID", billing.search_purchase_ids, key="purchase_id",
+                                            help="Search the numeric ID of the purchase record you want to delete",
+                                            placeholder="Type a purchase ID...")
                 purchase_details = billing.purchase_details(purchase_id) if purchase_id else None
                 if purchase_details is not None:
-                    supplier_id = st.text_input("Supplier ID", value=purchase_details[0], key="supplier_id",
-                                                disabled=True)
-                    gstin_number = st.text_input("GSTIN Number", value=purchase_details[1], key="gstin_number",
-                                                 disabled=True)
-                    product_id = st.text_input("Product ID", value=purchase_details[2], key="product_id", disabled=True)
-                    quantity = st.text_input("Quantity", value=purchase_details[3], key="quantity", disabled=True)
-                    unit_price = st.text_input("Unit Price", value=purchase_details[4], key="unit_price", disabled=True)
-                    total_price = st.text_input("Total Price", value=purchase_details[5], key="total_price",
-                                                disabled=True)
-                    discount = st.text_input("Discount", value=purchase_details[6], key="discount", disabled=True)
-                    cgst = st.text_input("CGST", value=purchase_details[7], key="cgst", disabled=True)
-                    sgst = st.text_input("SGST", value=purchase_details[8], key="sgst", disabled=True)
-                    igst = st.text_input("IGST", value=purchase_details[9], key="igst", disabled=True)
-                    amount = st.text_input("Amount", value=purchase_details[10], key="amount", disabled=True)
-                    purchase_date = st.text_input("Purchase Date", value=purchase_details[11], key="purchase_date",
-                                                  disabled=True)
-                    item_description = st.text_area("Item", value=purchase_details[12], key="item", disabled=True)
-                if st.button("Delete Purchase"):
-                    try:
-                        billing.delete_purchase(purchase_id)
-                    except Exception as e:
-                        st.error("Failed to delete record from Purchase table: " + str(e))
+                    st.text_input("Supplier ID", value=purchase_details[0], key="supplier_id", disabled=True)
+                    st.text_input("GSTIN Number", value=purchase_details[1], key="gstin_number", disabled=True)
+                    st.text_input("Product ID", value=purchase_details[2], key="product_id", disabled=True)
+                    st.text_input("Quantity", value=purchase_details[3], key="quantity", disabled=True)
+                    st.text_input("Unit Price", value=purchase_details[4], key="unit_price", disabled=True)
+                    st.text_input("Total Price", value=purchase_details[5], key="total_price", disabled=True)
+                    st.text_input("Discount", value=purchase_details[6], key="discount", disabled=True)
+                    st.text_input("CGST", value=purchase_details[7], key="cgst", disabled=True)
+                    st.text_input("SGST", value=purchase_details[8], key="sgst", disabled=True)
+                    st.text_input("IGST", value=purchase_details[9], key="igst", disabled=True)
+                    st.text_input("Amount", value=purchase_details[10], key="amount", disabled=True)
+                    st.text_input("Purchase Date", value=purchase_details[11], key="purchase_date", disabled=True)
+                    st.text_area("Item", value=purchase_details[12], key="item", disabled=True)
+                    if st.button("Delete Purchase"):
+                        try:
+                            billing.delete_purchase(purchase_id)
+                        except Exception as e:
+                            st.error("Failed to delete record from Purchase table: " + str(e))
 
             # Generate Tax Invoice:
             elif billing_menu == "Generate Tax Invoice":
                 st.subheader("Generate Tax Invoice")
-                list_purchase_ids = billing.get_purchase_ids()
-                purchase_id = st.selectbox("Purchase ID", options=list_purchase_ids, key="purchase_id",
-                                           help="Select the numeric ID of the purchase record you want to generate tax invoice")
-                tax_invoice = billing.generate_tax_invoice_per_product(purchase_id) if purchase_id else None
-                if tax_invoice is not None:
-                    if st.button("Generate Tax Invoice"):
+                purchase_id = search_picker("Purchase ID", billing.search_purchase_ids, key="purchase_id",
+                                            help="Search the numeric ID of the purchase record you want to generate "
+                                                 "tax invoice", placeholder="Type a purchase ID...")
+                if purchase_id and st.button("Generate Tax Invoice"):
+                    st.session_state["invoice_job_id"] = billing.enqueue_tax_invoice(purchase_id)
+
+                job_id = st.session_state.get("invoice_job_id")
+                invoice_job = billing.get_invoice_job(job_id) if job_id else None
+                if invoice_job is not None and not invoice_job.finished:
+                    # Poll the queued job without rerunning the whole page, then rerun once it has finished:
+                    @st.experimental_fragment(run_every=invoice_job_poll_seconds)
+                    def poll_invoice_job():
+                        current_job = billing.get_invoice_job(job_id)
+                        if current_job is None or current_job.finished:
+                            st.rerun()
+                        st.info(f"Tax Invoice for Purchase ID {current_job.purchase_id} is {current_job.status}...")
+
+                    poll_invoice_job()
+                elif invoice_job is not None and invoice_job.status == "failed":
+                    st.error(f"Failed to generate tax invoice after {invoice_job.attempts} attempt(s): "
+                             + str(invoice_job.error))
+                elif invoice_job is not None:
+                    # Rendered again here if the worker that finished it ran on another host:
+                    invoice_job = billing.get_invoice_job_artifact(job_id)
+                    if invoice_job is not None:
                         try:
-                            env = Environment(loader=FileSystemLoader('.'),
-                                              autoescape=select_autoescape(['html', 'xml']))
-                            template = env.get_template("tax_invoice_template.html")
-
-                            total_tax = tax_invoice["cgst"] + tax_invoice["sgst"] + tax_invoice["igst"]
-                            total_amount = tax_invoice["total"]
-
-                            tax_invoice_template = template.render(supplier_name=tax_invoice["supplier_name"],
-                                                                   supplier_address=tax_invoice["supplier_address"],
-                                                                   supplier_phone=tax_invoice["supplier_phone"],
-                                                                   supplier_gstin=tax_invoice["supplier_gstin"],
-                                                                   invoice_no=tax_invoice["invoice_no"],
-                                                                   invoice_date=tax_invoice["invoice_date"],
-                                                                   index=1,
-                                                                   item_product_name=tax_invoice["product_name"],
-                                                                   item_quantity=tax_invoice["quantity"],
-                                                                   item_gross_amount=tax_invoice["gross_amount"],
-                                                                   item_discount=tax_invoice["discount"],
-                                                                   item_cgst=tax_invoice["cgst"], item_sgst=tax_invoice["sgst"],
-                                                                   item_igst=tax_invoice["igst"],
-                                                                   item_total=tax_invoice["total"],
-                                                                   total_tax=total_tax,
-                                                                   total_amount=total_amount,
-                                                                   billing_date=datetime.now().strftime("%d-%m-%Y"))
-                            # with open("tax_invoice.html", "w") as file:
-                            #     file.write(tax_invoice_template)
+                            with open(invoice_job.html_path, encoding="utf-8") as file:
+                                tax_invoice_template = file.read()
+                            with open(invoice_job.artifact_path, "rb") as file:
+                                tax_invoice_pdf = file.read()
                             st.success("Tax Invoice generated successfully.")
                             st.markdown(tax_invoice_template, unsafe_allow_html=True)
-
-                            # Convert the HTML to PDF and download the file:
-                            # URL of the wkhtmltopdf executable
-                            executable_url = "https://github.com/sparky-abhik06/Purchase_Bill_Generation_Framework/raw/main/wkhtmltopdf.exe"
-
-                            # Download the executable
-                            with tempfile.NamedTemporaryFile(delete=False) as tmp_file:
-                                response = requests.get(executable_url)
-                                tmp_file.write(response.content)
-                                executable_path = tmp_file.name
-                            tax_invoice_pdf = pdfkit.from_string(tax_invoice_template, False, configuration=pdfkit.configuration(wkhtmltopdf=executable_path))
-
-                            pdf_filename = f"{tax_invoice['invoice_no']}_tax_invoice_{tax_invoice['invoice_date']}.pdf"
-                            st.download_button("⬇️ Tax Invoice", tax_invoice_pdf, pdf_filename,
+                            st.download_button("⬇️ Tax Invoice", tax_invoice_pdf, invoice_job.pdf_filename,
                                                "application/pdf")
-                        except Exception as e:
-                            st.error("Failed to generate tax invoice: " + str(e))
-
-            # Close the database connection:
-            # supplier.connection.close()
-            # st.info("Database connection closed successfully.")
+                        except OSError as e:
+                            st.error("Failed to read generated tax invoice: " + str(e))
+
+            # Generate Tax Invoice for a Purchase Order:
+            elif billing_menu == "Purchase Order Invoice":
+                st.subheader("Generate Purchase Order Tax Invoice")
+                order_id = search_picker("Order ID", billing.search_purchase_order_ids, key="invoice_order_id",
+                                         help="Search the numeric ID of the purchase order you want to generate tax "
+                                              "invoice", placeholder="Type an order ID...")
+                if order_id and st.button("Generate Tax Invoice"):
+                    try:
+                        tax_invoice = billing.generate_purchase_order_invoice(order_id)
+                        if tax_invoice is not None:
+                            tax_invoice_template = render_tax_invoice(tax_invoice)
+                            st.success(f"Tax Invoice generated successfully with {len(tax_invoice.items)} item(s).")
+                            st.markdown(tax_invoice_template, unsafe_allow_html=True)
+                            st.download_button("⬇️ Tax Invoice", render_pdf(tax_invoice_template),
+                                               tax_invoice_pdf_filename(tax_invoice), "application/pdf")
+                    except Exception as e:
+                        st.error("Failed to generate tax invoice: " + str(e))
+
+            # Generate Tax Invoices in Bulk:
+            elif billing_menu == "Bulk Tax Invoices":
+                st.subheader("Generate Tax Invoices in Bulk")
+                date_range = st.date_input("Purchase Date Range", value=(), key="invoice_date_range",
+                                           help="Optionally restrict the invoices to a range of purchase dates")
+                supplier_ids = search_picker("Supplier ID", suppliers.search_suppliers, key="invoice_supplier_ids",
+                                             multiple=True,
+                                             help="Optionally restrict the invoices to these suppliers")
+                purchase_ids = search_picker("Purchase ID", billing.search_purchase_ids, key="invoice_purchase_ids",
+                                             multiple=True, placeholder="Type a purchase ID...",
+                                             help="Optionally restrict the invoices to these purchase records")
+                if st.button("Generate Tax Invoices"):
+                    try:
+                        start_date = date_range[0] if len(date_range) > 0 else None
+                        end_date = date_range[1] if len(date_range) > 1 else start_date
+                        tax_invoices = billing.find_tax_invoices(start_date=start_date, end_date=end_date,
+                                                                 supplier_ids=supplier_ids, purchase_ids=purchase_ids)
+                        if tax_invoices:
+                            progress_bar = st.progress(0.0, text="Generating tax invoices...")
+
+                            def report(done, total):
+                                progress_bar.progress(done / total, text=f"Generated {done}/{total} tax invoices")
+
+                            with tempfile.TemporaryDirectory() as tmp_dir:
+                                zip_path = os.path.join(tmp_dir, "tax_invoices.zip")
+                                result = generate_bulk_invoices(tax_invoices, zip_path, progress=report)
+                                with open(zip_path, "rb") as file:
+                                    tax_invoices_zip = file.read()
+                            st.success(f"{len(result.generated)} Tax Invoice(s) generated successfully.")
+                            for invoice_no, error in sorted(result.failed.items()):
+                                st.warning(f"Tax Invoice {invoice_no}: {error}")
+                            st.download_button("⬇️ Tax Invoices", tax_invoices_zip, "tax_invoices.zip",
+                                               "application/zip")
+                        elif tax_invoices is not None:
+                            st.info("No records found in Purchase table")
+                    except Exception as e:
+                        st.error("Failed to generate tax invoices: " + str(e))
+
+            # Purchase Reports:
+            elif billing_menu == "Reports":
+                st.subheader("Purchase Reports")
+                reports = StreamlitAdapter(Reports(billing.pool))
+                get_report_refresher(billing.pool)
+                report_name = st.selectbox("Report", list(REPORTS), format_func=lambda name: REPORTS[name].title,
+                                           key="report_name", help="Select the summary you want to see")
+                date_range = st.date_input("Month Range", value=(), key="report_date_range",
+                                           help="Optionally restrict the report to a range of months")
+                supplier_id = search_picker("Supplier ID", suppliers.search_suppliers, key="report_supplier_id",
+                                            index=None, help="Optionally restrict the report to one supplier")
+                start_date = date_range[0] if len(date_range) > 0 else None
+                end_date = date_range[1] if len(date_range) > 1 else start_date
+                report = reports.run_report(report_name, start_date=start_date, end_date=end_date,
+                                            supplier_id=supplier_id)
+                if report is not None and report.empty:
+                    st.info("No records found in Purchase table")
+                elif report is not None:
+                    st.dataframe(report, hide_index=True)
+                    download_csv, download_parquet = st.columns(2)
+                    download_csv.download_button("⬇️ CSV", report_bytes(report, "csv"), f"{report_name}.csv",
+                                                 "text/csv")
+                    download_parquet.download_button("⬇️ Parquet", report_bytes(report, "parquet"),
+                                                     f"{report_name}.parquet", "application/octet-stream")
+                last_refreshed = reports.last_refreshed()
+                if last_refreshed is not None:
+                    st.caption(f"Totals as of {last_refreshed:%Y-%m-%d %H:%M}")
+                if st.button("Refresh Now"):
+                    if reports.refresh():
+                        st.rerun()
+
+            # Export Purchase Records:
+            elif billing_menu == "Export":
+                st.subheader("Export Purchase Records")
+                file_format = st.selectbox("File Format", list(EXPORT_FORMATS), key="export_format",
+                                           help="Parquet for analytics tools, Arrow IPC for pandas/pyarrow")
+                partition_by = st.multiselect("Partition By", list(PARTITION_KEYS), key="export_partition_by",
+                                              help="Optionally split the export into one file per month/supplier")
+                date_range = st.date_input("Purchase Date Range", value=(), key="export_date_range",
+                                           help="Optionally restrict the export to a range of purchase dates")
+                supplier_ids = search_picker("Supplier ID", suppliers.search_suppliers, key="export_supplier_ids",
+                                             multiple=True, help="Optionally restrict the export to these suppliers")
+                if st.button("Export"):
+                    filters = {"supplier_id__in": supplier_ids}
+                    if len(date_range) > 0:
+                        filters["purchase_date__gte"] = date_range[0]
+                        filters["purchase_date__lte"] = date_range[-1]
+                    try:
+                        with tempfile.TemporaryDirectory() as tmp_dir:
+                            destination = os.path.join(tmp_dir, "purchases")
+                            filename = f"purchases.{file_format}"
+                            if partition_by:
+                                result = write_purchases(billing.pool, destination, file_format=file_format,
+                                                         partition_by=partition_by, filters=filters)
+                                destination = shutil.make_archive(destination, "zip", destination)
+                                filename += ".zip"
+                            else:
+                                result = write_purchases(billing.pool, destination, file_format=file_format,
+                                                         filters=filters)
+                            with open(destination, "rb") as file:
+                                export_file = file.read()
+                        st.success(f"{result.rows} Record(s) exported in {result.seconds:.1f}s.")
+                        st.download_button("⬇️ Export", export_file, filename, "application/octet-stream")
+                    except Exception as e:
+                        st.error("Failed to export records from Purchase table: " + str(e))
 
         else:
             st.error("Failed to connect to the database.")
@@ -0,0 +1,130 @@
+import argparse
+import logging
+import multiprocessing
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import date, datetime
+
+from billing.pdf_backend import get_pdf_backend, render_pdf
+from billing.tax_invoice import load_tax_invoice_template, render_tax_invoice, tax_invoice_pdf_filename
+from database_connection.errors import DomainError
+
+# Number of PDF renderer processes (overridable through the .env file):
+pdf_workers = int(os.getenv('INVOICE_PDF_WORKERS', str(os.cpu_count() or 1)))
+
+
+# Outcome of a bulk invoice run:
+@dataclass
+class BulkInvoiceResult:
+    output_path: str
+    generated: list = field(default_factory=list)
+    failed: dict = field(default_factory=dict)
+
+
+# Runs in a worker process, so it only receives plain strings:
+def _render_pdf(invoice_no, html):
+    return invoice_no, render_pdf(html)
+
+
+# Renders every invoice to HTML, converts them to PDF across a process pool and writes a ZIP or a directory:
+def generate_bulk_invoices(tax_invoices, output_path, workers=pdf_workers, as_zip=True, progress=None):
+    result = BulkInvoiceResult(output_path=output_path)
+    # Resolve the renderer up front so a missing one fails before any work is queued:
+    get_pdf_backend()
+    template = load_tax_invoice_template()
+    billing_date = datetime.now().strftime("%d-%m-%Y")
+    filenames = {}
+    pending = []
+    for tax_invoice in tax_invoices:
+        try:
+            html = render_tax_invoice(tax_invoice, template=template, billing_date=billing_date)
+            filenames[tax_invoice.invoice_no] = tax_invoice_pdf_filename(tax_invoice)
+            pending.append((tax_invoice.invoice_no, html))
+        except Exception as e:
+            result.failed[tax_invoice.invoice_no] = "Failed to render template: " + str(e)
+    total = len(pending) + len(result.failed)
+
+    if as_zip:
+        archive = zipfile.ZipFile(output_path, "w", compression=zipfile.ZIP_STORED)
+    else:
+        os.makedirs(output_path, exist_ok=True)
+        archive = None
+    try:
+        # Workers are spawned, not forked: this also runs on threads of the Streamlit app and the API server, and a
+        # fork would copy locks (pool, logging, change listener) held by those other threads into the children:
+        with ProcessPoolExecutor(max_workers=max(1, workers), mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=get_pdf_backend) as executor:
+            futures = {executor.submit(_render_pdf, invoice_no, html): invoice_no for invoice_no, html in pending}
+            for future in as_completed(futures):
+                invoice_no = futures[future]
+                try:
+                    _, pdf = future.result()
+                    if archive is not None:
+                        archive.writestr(filenames[invoice_no], pdf)
+                    else:
+                        with open(os.path.join(output_path, filenames[invoice_no]), "wb") as file:
+                            file.write(pdf)
+                    result.generated.append(invoice_no)
+                except Exception as e:
+                    # One broken invoice must not abort the rest of the batch:
+                    result.failed[invoice_no] = "Failed to generate PDF: " + str(e)
+                if progress is not None:
+                    progress(len(result.generated) + len(result.failed), total)
+    finally:
+        if archive is not None:
+            archive.close()
+    return result
+
+
+def _parse_date(value):
+    return date.fromisoformat(value)
+
+
+# Command Line Entry Point:
+def main(argv=None):
+    from billing.billing import Billing
+    from database_connection.database_connection import get_connection_pool
+
+    parser = argparse.ArgumentParser(description="Generate tax invoices in bulk")
+    parser.add_argument("--start-date", type=_parse_date, help="First purchase date to include (YYYY-MM-DD)")
+    parser.add_argument("--end-date", type=_parse_date, help="Last purchase date to include (YYYY-MM-DD)")
+    parser.add_argument("--supplier-id", type=int, action="append", dest="supplier_ids",
+                        help="Only include purchases from this supplier (repeatable)")
+    parser.add_argument("--purchase-id", type=int, action="append", dest="purchase_ids",
+                        help="Only include this purchase (repeatable)")
+    parser.add_argument("--output", required=True, help="Output ZIP file, or directory with --directory")
+    parser.add_argument("--directory", action="store_true", help="Write PDFs into a directory instead of a ZIP")
+    parser.add_argument("--workers", type=int, default=pdf_workers, help="Number of PDF renderer processes")
+    args = parser.parse_args(argv)
+
+    pool = get_connection_pool()
+    if pool is None:
+        logging.error("Failed to connect to the database.")
+        return 1
+    try:
+        tax_invoices = Billing(pool).find_tax_invoices(start_date=args.start_date, end_date=args.end_date,
+                                                       supplier_ids=args.supplier_ids, purchase_ids=args.purchase_ids)
+    except DomainError as e:
+        logging.error("Failed to fetch invoice data: " + str(e))
+        return 1
+    if not tax_invoices:
+        logging.error("No purchases match the given criteria.")
+        return 1
+
+    def report(done, total):
+        logging.info(f"Generated {done}/{total} tax invoices")
+
+    result = generate_bulk_invoices(tax_invoices, args.output, workers=args.workers, as_zip=not args.directory,
+                                    progress=report)
+    for invoice_no, error in sorted(result.failed.items()):
+        logging.error(f"Invoice {invoice_no}: {error}")
+    logging.info(f"{len(result.generated)} tax invoice(s) written to {result.output_path}, "
+                 f"{len(result.failed)} failed")
+    return 0 if not result.failed else 2
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    raise SystemExit(main())
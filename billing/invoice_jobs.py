@@ -0,0 +1,260 @@
+import dataclasses
+import logging
+import os
+import socket
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+
+from billing.artifact_cache import get_artifact_cache, invoice_cache_key
+from billing.pdf_backend import render_pdf
+from billing.tax_invoice import TAX_INVOICE_QUERY, TaxInvoice, render_tax_invoice, tax_invoice_pdf_filename
+from database_connection.change_listener import change_listener
+
+# Worker pool settings (overridable through the .env file):
+invoice_job_workers = int(os.getenv('INVOICE_JOB_WORKERS', '2'))
+invoice_job_max_attempts = int(os.getenv('INVOICE_JOB_MAX_ATTEMPTS', '3'))
+invoice_job_poll_seconds = float(os.getenv('INVOICE_JOB_POLL_SECONDS', '2'))
+invoice_job_retry_seconds = float(os.getenv('INVOICE_JOB_RETRY_SECONDS', '5'))
+invoice_job_lease_seconds = float(os.getenv('INVOICE_JOB_LEASE_SECONDS', '120'))
+# Hosts sharing one INVOICE_ARTIFACT_DIR (e.g. a mounted volume) can set the same name to share artifacts:
+invoice_artifact_host = os.getenv('INVOICE_ARTIFACT_HOST', socket.gethostname())
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+# One row of the Invoice_Job table:
+@dataclass(frozen=True)
+class InvoiceJob:
+    job_id: int
+    purchase_id: int
+    status: str
+    attempts: int
+    artifact_path: str
+    error: str
+    artifact_host: str = None
+
+    @property
+    def finished(self):
+        return self.status not in ACTIVE_STATUSES
+
+    @property
+    def html_path(self):
+        return os.path.splitext(self.artifact_path)[0] + ".html" if self.artifact_path else None
+
+    @property
+    def pdf_filename(self):
+        return os.path.basename(self.artifact_path) if self.artifact_path else None
+
+
+# Cache entries of a purchase's invoices share this name, so they can be dropped together:
+def invoice_artifact_name(purchase_id):
+    return f"purchase-{purchase_id}"
+
+
+# Drops the cached invoices of purchases updated or deleted by any process. Artifacts are keyed by their content, so
+# this reclaims space rather than preventing stale invoices, and a resync after a reconnect is ignored:
+def invalidate_invoice_artifacts(change):
+    if change.rows is not None:
+        get_artifact_cache().invalidate(*map(invoice_artifact_name, change.keys("purchase_id")))
+    elif change.operation != "RESYNC":
+        get_artifact_cache().invalidate("purchase")
+
+
+change_listener.subscribe("purchase", invalidate_invoice_artifacts)
+
+
+def fetch_tax_invoice(cursor, purchase_id):
+    cursor.execute(TAX_INVOICE_QUERY + """ WHERE p.purchase_id = %s""", (purchase_id,))
+    invoice_record = cursor.fetchone()
+    return TaxInvoice.from_row(invoice_record) if invoice_record is not None else None
+
+
+# Queues an invoice for a purchase, or returns the job already queued or running for it; an invoice whose
+# inputs are unchanged is recorded as done straight away with the cached artifact:
+def enqueue_invoice_job(cursor, purchase_id, artifact_cache=None):
+    if artifact_cache is not None:
+        tax_invoice = fetch_tax_invoice(cursor, purchase_id)
+        if tax_invoice is not None:
+            key = invoice_cache_key(tax_invoice, datetime.now().strftime("%d-%m-%Y"))
+            artifact_path = artifact_cache.lookup(invoice_artifact_name(purchase_id), key)
+            if artifact_path is not None:
+                cursor.execute("""INSERT INTO Invoice_Job (purchase_id, status, artifact_path, artifact_host) VALUES (%s, 'done', %s, %s) RETURNING job_id""",
+                               (purchase_id, artifact_path, invoice_artifact_host))
+                return cursor.fetchone()[0]
+    # The conflicting job can finish between the two statements, in which case the insert is simply tried again:
+    while True:
+        cursor.execute("""INSERT INTO Invoice_Job (purchase_id) VALUES (%s) ON CONFLICT (purchase_id) WHERE status IN ('queued', 'running') DO NOTHING RETURNING job_id""",
+                       (purchase_id,))
+        row = cursor.fetchone()
+        if row is None:
+            cursor.execute("""SELECT job_id FROM Invoice_Job WHERE purchase_id = %s AND status IN ('queued', 'running')""",
+                           (purchase_id,))
+            row = cursor.fetchone()
+        if row is not None:
+            return row[0]
+
+
+def fetch_invoice_job(cursor, job_id):
+    cursor.execute("""SELECT job_id, purchase_id, status, attempts, artifact_path, error, artifact_host FROM Invoice_Job WHERE job_id = %s""",
+                   (job_id,))
+    row = cursor.fetchone()
+    return InvoiceJob(*row) if row is not None else None
+
+
+# Claims the oldest queued job; SKIP LOCKED lets any number of workers poll the table concurrently:
+def claim_invoice_job(cursor):
+    cursor.execute("""UPDATE Invoice_Job SET status = 'running', attempts = attempts + 1, updated_at = now() WHERE job_id = (SELECT job_id FROM Invoice_Job WHERE status = 'queued' AND run_after <= now() ORDER BY run_after, job_id LIMIT 1 FOR UPDATE SKIP LOCKED) RETURNING job_id, purchase_id, attempts""")
+    return cursor.fetchone()
+
+
+# Hands the running jobs whose worker stopped refreshing their lease (its process died) back to the queue:
+def requeue_expired_invoice_jobs(cursor, lease_seconds):
+    cursor.execute("""UPDATE Invoice_Job SET status = 'queued', run_after = now(), updated_at = now() WHERE status = 'running' AND updated_at < now() - %s * interval '1 second'""",
+                   (lease_seconds,))
+    return cursor.rowcount
+
+
+# Background threads that render queued invoices into the artifact cache, retrying failed attempts:
+class InvoiceWorkerPool:
+    def __init__(self, pool, workers=invoice_job_workers, artifact_cache=None,
+                 max_attempts=invoice_job_max_attempts, poll_seconds=invoice_job_poll_seconds,
+                 retry_seconds=invoice_job_retry_seconds, lease_seconds=invoice_job_lease_seconds):
+        self.pool = pool
+        self.workers = max(1, workers)
+        self.artifact_cache = artifact_cache or get_artifact_cache()
+        self.max_attempts = max_attempts
+        self.poll_seconds = poll_seconds
+        self.retry_seconds = retry_seconds
+        self.lease_seconds = lease_seconds
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._threads = []
+        self._running_jobs = set()
+        self._running_jobs_lock = threading.Lock()
+
+    def start(self):
+        for number in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"invoice-worker-{number}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        thread = threading.Thread(target=self._renew_leases, name="invoice-leases", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def stop(self):
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    # Called after a job is queued so an idle worker picks it up without waiting for the next poll:
+    def notify(self):
+        self._wakeup.set()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                processed = self.process_next()
+            except Exception as e:
+                logging.error("Invoice worker failed to poll the job queue: " + str(e))
+                processed = False
+            if not processed:
+                self._wakeup.wait(self.poll_seconds)
+                self._wakeup.clear()
+
+    # Refreshes the lease of the jobs this process is rendering, and requeues the jobs of processes that died:
+    def _renew_leases(self):
+        while not self._stopping.is_set():
+            try:
+                with self._running_jobs_lock:
+                    job_ids = list(self._running_jobs)
+                with self.pool.connection() as connection:
+                    cursor = connection.cursor()
+                    if job_ids:
+                        cursor.execute("""UPDATE Invoice_Job SET updated_at = now() WHERE job_id = ANY(%s) AND status = 'running'""",
+                                       (job_ids,))
+                    requeued = requeue_expired_invoice_jobs(cursor, self.lease_seconds)
+                    connection.commit()
+                if requeued:
+                    logging.warning(f"Requeued {requeued} invoice job(s) whose lease expired")
+                    self.notify()
+            except Exception as e:
+                logging.error("Failed to renew invoice job leases: " + str(e))
+            self._stopping.wait(self.lease_seconds / 3)
+
+    # Claims and runs one job; returns False when the queue is empty:
+    def process_next(self):
+        with self.pool.connection() as connection:
+            cursor = connection.cursor()
+            claimed = claim_invoice_job(cursor)
+            connection.commit()
+        if claimed is None:
+            return False
+        job_id, purchase_id, attempts = claimed
+        with self._running_jobs_lock:
+            self._running_jobs.add(job_id)
+        try:
+            artifact_path = self.render(job_id, purchase_id)
+        except Exception as e:
+            status = "queued" if attempts < self.max_attempts else "failed"
+            logging.warning(f"Invoice job {job_id} attempt {attempts} failed: {e}")
+            # Back off linearly so a briefly unavailable renderer is not hammered:
+            # The attempt check leaves a job alone once its lease expired and another worker claimed it again:
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                cursor.execute("""UPDATE Invoice_Job SET status = %s, error = %s, run_after = now() + %s * interval '1 second', updated_at = now() WHERE job_id = %s AND status = 'running' AND attempts = %s""",
+                               (status, str(e), attempts * self.retry_seconds, job_id, attempts))
+                connection.commit()
+            return True
+        finally:
+            with self._running_jobs_lock:
+                self._running_jobs.discard(job_id)
+        with self.pool.connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute("""UPDATE Invoice_Job SET status = 'done', artifact_path = %s, artifact_host = %s, error = NULL, updated_at = now() WHERE job_id = %s AND status = 'running' AND attempts = %s""",
+                           (artifact_path, invoice_artifact_host, job_id, attempts))
+            connection.commit()
+        return True
+
+    # Renders the invoice into the artifact cache, unless identical inputs were rendered before; returns the PDF path:
+    def render(self, job_id, purchase_id):
+        with self.pool.connection() as connection:
+            tax_invoice = fetch_tax_invoice(connection.cursor(), purchase_id)
+        if tax_invoice is None:
+            raise LookupError(f"Purchase {purchase_id} no longer exists")
+        billing_date = datetime.now().strftime("%d-%m-%Y")
+        name = invoice_artifact_name(purchase_id)
+        key = invoice_cache_key(tax_invoice, billing_date)
+        artifact_path = self.artifact_cache.lookup(name, key)
+        if artifact_path is None:
+            html = render_tax_invoice(tax_invoice, billing_date=billing_date)
+            artifact_path = self.artifact_cache.store(name, key, tax_invoice_pdf_filename(tax_invoice), html,
+                                                      render_pdf(html))
+        return artifact_path
+
+    # The finished job with an artifact this process can read: one rendered on another host, or evicted from the
+    # cache since, is rendered again into the local cache:
+    def local_artifact(self, invoice_job):
+        if (invoice_job.artifact_host == invoice_artifact_host and invoice_job.artifact_path
+                and os.path.exists(invoice_job.artifact_path)):
+            return invoice_job
+        return dataclasses.replace(invoice_job, artifact_path=self.render(invoice_job.job_id, invoice_job.purchase_id),
+                                   artifact_host=invoice_artifact_host)
+
+
+_invoice_worker_pool = None
+_invoice_worker_pool_lock = threading.Lock()
+
+
+# Returns the process-wide invoice worker pool, starting it on first use:
+def get_invoice_worker_pool(pool):
+    global _invoice_worker_pool
+    if _invoice_worker_pool is None:
+        with _invoice_worker_pool_lock:
+            if _invoice_worker_pool is None:
+                worker_pool = InvoiceWorkerPool(pool)
+                worker_pool.start()
+                _invoice_worker_pool = worker_pool
+    return _invoice_worker_pool
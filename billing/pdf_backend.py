@@ -0,0 +1,89 @@
+import functools
+import io
+import logging
+import os
+import shutil
+import subprocess
+import time
+
+# Renderer selection (overridable through the .env file):
+#   PDF_BACKEND=auto | wkhtmltopdf | xhtml2pdf
+#   WKHTMLTOPDF_PATH=/usr/bin/wkhtmltopdf
+pdf_backend_name = os.getenv('PDF_BACKEND', 'auto')
+wkhtmltopdf_path = os.getenv('WKHTMLTOPDF_PATH')
+pdf_render_timeout = float(os.getenv('PDF_RENDER_TIMEOUT', '60'))
+
+
+# Renders HTML with a locally installed wkhtmltopdf binary:
+class WkhtmltopdfBackend:
+    name = "wkhtmltopdf"
+
+    def __init__(self, executable, timeout=pdf_render_timeout):
+        import pdfkit
+
+        self.pdfkit = pdfkit
+        self.configuration = pdfkit.configuration(wkhtmltopdf=executable)
+        self.timeout = timeout
+
+    def render(self, html):
+        kit = self.pdfkit.PDFKit(html, "string", configuration=self.configuration,
+                                 options={"encoding": "UTF-8"})
+        # Run the binary ourselves so a hung conversion is bounded by the timeout:
+        completed = subprocess.run(kit.command(), input=html.encode("utf-8"), capture_output=True,
+                                   timeout=self.timeout)
+        # wkhtmltopdf exits non-zero for recoverable page warnings, so judge by the output instead:
+        if not completed.stdout.startswith(b"%PDF"):
+            raise OSError("wkhtmltopdf failed: " + completed.stderr.decode("utf-8", errors="replace"))
+        return completed.stdout
+
+
+# Pure-Python fallback for hosts without wkhtmltopdf:
+class XhtmlToPdfBackend:
+    name = "xhtml2pdf"
+
+    def __init__(self):
+        from xhtml2pdf import pisa
+
+        self.pisa = pisa
+
+    def render(self, html):
+        output = io.BytesIO()
+        status = self.pisa.CreatePDF(html, dest=output, encoding="utf-8")
+        if status.err:
+            raise ValueError(f"xhtml2pdf failed with {status.err} error(s)")
+        return output.getvalue()
+
+
+def _find_wkhtmltopdf():
+    if wkhtmltopdf_path:
+        return wkhtmltopdf_path if os.access(wkhtmltopdf_path, os.X_OK) else None
+    return shutil.which("wkhtmltopdf")
+
+
+# Resolves the local renderer once per process and reuses its configuration:
+@functools.lru_cache(maxsize=None)
+def get_pdf_backend():
+    if pdf_backend_name in ("auto", "wkhtmltopdf"):
+        executable = _find_wkhtmltopdf()
+        if executable is not None:
+            logging.info(f"Rendering PDFs with wkhtmltopdf at {executable}")
+            return WkhtmltopdfBackend(executable)
+        if pdf_backend_name == "wkhtmltopdf":
+            raise RuntimeError("wkhtmltopdf was not found; install it or set WKHTMLTOPDF_PATH")
+    if pdf_backend_name in ("auto", "xhtml2pdf"):
+        try:
+            backend = XhtmlToPdfBackend()
+            logging.info("Rendering PDFs with the xhtml2pdf fallback")
+            return backend
+        except ImportError:
+            pass
+    raise RuntimeError("No PDF renderer available; install wkhtmltopdf or the xhtml2pdf package")
+
+
+# Converts rendered invoice HTML to PDF bytes:
+def render_pdf(html):
+    backend = get_pdf_backend()
+    start = time.perf_counter()
+    pdf = backend.render(html)
+    logging.info(f"Rendered PDF with {backend.name} in {time.perf_counter() - start:.3f}s")
+    return pdf
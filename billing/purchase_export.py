@@ -0,0 +1,153 @@
+import argparse
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from psycopg2 import sql
+
+from billing.purchase_search import build_purchase_search, parse_purchase_filters
+
+# Rows fetched from the server-side cursor and written per record batch (overridable through the .env file):
+export_batch_size = int(os.getenv('PURCHASE_EXPORT_BATCH_SIZE', '50000'))
+
+PURCHASE_ARROW_SCHEMA = pa.schema([
+    ("purchase_id", pa.int32()),
+    ("supplier_id", pa.int32()),
+    ("gstin_number", pa.string()),
+    ("product_id", pa.int32()),
+    ("quantity", pa.int32()),
+    ("unit_price", pa.float64()),
+    ("total_price", pa.float64()),
+    ("discount", pa.float64()),
+    ("cgst", pa.float64()),
+    ("sgst", pa.float64()),
+    ("igst", pa.float64()),
+    ("amount", pa.float64()),
+    ("purchase_date", pa.date32()),
+    ("item_description", pa.string()),
+])
+
+# Partition keys, each with the Arrow field and SQL expression that produce its directory level:
+PARTITION_KEYS = {
+    "month": (pa.field("purchase_month", pa.string()), "to_char(purchase_date, 'YYYY-MM') AS purchase_month"),
+    "supplier_id": (pa.field("supplier_id", pa.int32()), None),
+}
+
+EXPORT_FORMATS = {"parquet": "parquet", "arrow": "ipc"}
+
+
+# Outcome of an export:
+@dataclass
+class ExportResult:
+    rows: int = 0
+    files: list = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def _export_schema(partition_by):
+    schema = PURCHASE_ARROW_SCHEMA
+    for key in partition_by:
+        partition_field, expression = PARTITION_KEYS[key]
+        if expression is not None:
+            schema = schema.append(partition_field)
+    return schema
+
+
+# Streams the purchases matching the search filters as Arrow record batches from a server-side cursor, so only
+# one batch is held in memory at a time:
+def iter_purchase_batches(pool, filters=None, partition_by=(), batch_size=export_batch_size):
+    schema = _export_schema(partition_by)
+    columns = [sql.Identifier(name) for name in PURCHASE_ARROW_SCHEMA.names]
+    columns += [sql.SQL(PARTITION_KEYS[key][1]) for key in partition_by if PARTITION_KEYS[key][1] is not None]
+    query, values = build_purchase_search(filters or {}, sql.SQL(", ").join(columns))
+    with pool.connection() as connection:
+        cursor = connection.cursor(name="purchase_export")
+        cursor.itersize = batch_size
+        cursor.execute(query, values)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            arrays = [pa.array(column_values, type=column.type) for column_values, column in zip(zip(*rows), schema)]
+            yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+        cursor.close()
+
+
+# Writes the matching purchases to one Parquet or Arrow IPC file (a path or a writable file object) or, when
+# partitioned, to a directory of purchase_month=YYYY-MM/supplier_id=N files:
+def write_purchases(pool, destination, file_format="parquet", partition_by=(), filters=None,
+                    batch_size=export_batch_size):
+    if file_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {file_format}")
+    for key in partition_by:
+        if key not in PARTITION_KEYS:
+            raise ValueError(f"Unsupported partition key: {key}")
+    result = ExportResult()
+    start = time.perf_counter()
+
+    def counted(batches):
+        for batch in batches:
+            result.rows += batch.num_rows
+            yield batch
+
+    batches = counted(iter_purchase_batches(pool, filters, partition_by, batch_size))
+    schema = _export_schema(partition_by)
+    if partition_by:
+        partitioning = ds.partitioning(pa.schema([PARTITION_KEYS[key][0] for key in partition_by]), flavor="hive")
+        ds.write_dataset(batches, destination, schema=schema, format=EXPORT_FORMATS[file_format],
+                         partitioning=partitioning, basename_template=f"part-{{i}}.{file_format}",
+                         existing_data_behavior="overwrite_or_ignore",
+                         file_visitor=lambda written_file: result.files.append(written_file.path))
+    else:
+        if file_format == "parquet":
+            writer = pq.ParquetWriter(destination, schema)
+        else:
+            writer = pa.ipc.new_file(destination, schema)
+        with writer:
+            for batch in batches:
+                writer.write_batch(batch)
+        result.files.append(destination if isinstance(destination, str) else getattr(destination, "name", None))
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+# Command Line Entry Point:
+def main(argv=None):
+    from database_connection.database_connection import get_connection_pool
+
+    parser = argparse.ArgumentParser(description="Export purchases to Parquet or Arrow IPC files")
+    parser.add_argument("destination", help="Output file, or output directory when partitioning")
+    parser.add_argument("--format", choices=list(EXPORT_FORMATS), default="parquet", help="File format")
+    parser.add_argument("--partition-by", choices=list(PARTITION_KEYS), action="append", default=[],
+                        help="Split the output into one directory level per key (repeatable)")
+    parser.add_argument("--filter", action="append", default=[], metavar="NAME=VALUE",
+                        help="Search filter such as supplier_id__in=1,2 or purchase_date__gte=2024-04-01 (repeatable)")
+    parser.add_argument("--batch-size", type=int, default=export_batch_size, help="Rows per record batch")
+    args = parser.parse_args(argv)
+
+    try:
+        filters = parse_purchase_filters(dict(text.split("=", 1) for text in args.filter))
+    except ValueError as e:
+        parser.error(str(e))
+    pool = get_connection_pool()
+    if pool is None:
+        logging.error("Failed to connect to the database.")
+        return 1
+    result = write_purchases(pool, args.destination, file_format=args.format, partition_by=args.partition_by,
+                             filters=filters, batch_size=args.batch_size)
+    logging.info(f"Exported {result.rows} rows to {len(result.files)} file(s) in {result.seconds:.1f}s "
+                 f"({result.rows_per_second:.0f} rows/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    raise SystemExit(main())
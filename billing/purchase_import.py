@@ -0,0 +1,181 @@
+import argparse
+import io
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from validation.validation import PURCHASE_RULES, Rule, summarize_errors, validate_frame
+
+# Rows read, validated and copied per chunk (overridable through the .env file):
+import_chunk_size = int(os.getenv('PURCHASE_IMPORT_CHUNK_SIZE', '50000'))
+
+# Column order of the COPY into the staging table:
+STAGING_COLUMNS = ["purchase_id", "supplier_id", "gstin_number", "product_id", "quantity", "unit_price", "total_price",
+                   "discount", "cgst", "sgst", "igst", "amount", "purchase_date", "item_description"]
+REQUIRED_COLUMNS = ["purchase_id", "supplier_id", "product_id", "quantity", "purchase_date"]
+OPTIONAL_AMOUNT_COLUMNS = ["discount", "cgst", "sgst", "igst"]
+
+
+# Outcome of a bulk import:
+@dataclass
+class ImportResult:
+    rows_read: int = 0
+    inserted: int = 0
+    rejected: pd.DataFrame = field(default_factory=pd.DataFrame)
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.rows_read / self.seconds if self.seconds else 0.0
+
+
+# Streams a CSV or Parquet file (path or file object), or an in-memory DataFrame, as DataFrame chunks:
+def iter_purchase_chunks(source, file_format=None, chunk_size=import_chunk_size):
+    if isinstance(source, pd.DataFrame):
+        for start in range(0, len(source), chunk_size):
+            yield source.iloc[start:start + chunk_size]
+        return
+    if file_format is None:
+        name = source if isinstance(source, str) else getattr(source, "name", "")
+        file_format = "parquet" if name.lower().endswith(".parquet") else "csv"
+    if file_format == "parquet":
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(source, chunksize=chunk_size, dtype={"gstin_number": str, "item_description": str})
+
+
+# Set-based lookups of the reference data a chunk needs, one query per table:
+def lookup_reference_data(cursor, chunk):
+    supplier_ids = pd.to_numeric(chunk["supplier_id"], errors="coerce").dropna().astype(int).unique().tolist()
+    product_ids = pd.to_numeric(chunk["product_id"], errors="coerce").dropna().astype(int).unique().tolist()
+    cursor.execute("""SELECT supplier_id, gstin_number FROM Supplier WHERE supplier_id = ANY(%s)""", (supplier_ids,))
+    suppliers = pd.DataFrame(cursor.fetchall(), columns=["supplier_id", "supplier_gstin"])
+    cursor.execute("""SELECT product_id, supplier_id, unit_price, product_name, description, category FROM Product WHERE product_id = ANY(%s)""",
+                   (product_ids,))
+    products = pd.DataFrame(cursor.fetchall(), columns=["product_id", "product_supplier_id", "product_unit_price",
+                                                        "product_name", "product_description", "product_category"])
+    return suppliers, products
+
+
+# Checks that only apply to imported rows, evaluated by the shared validation engine:
+def import_rules(seen_purchase_ids):
+    return [
+        Rule("purchase_id", "Duplicate purchase_id in import file",
+             lambda frame: frame["purchase_id"].duplicated(keep="first") | frame["purchase_id"].isin(seen_purchase_ids)),
+        Rule("supplier_id", "Unknown supplier_id", lambda frame: frame["supplier_gstin"].isna()),
+        Rule("product_id", "Unknown product_id", lambda frame: frame["product_unit_price"].isna()),
+        Rule("product_id", "Product does not belong to supplier",
+             lambda frame: frame["product_unit_price"].notna() & (frame["product_supplier_id"] != frame["supplier_id"])),
+    ]
+
+
+# Derives GSTIN, prices and amounts for a chunk and validates it in one pass; returns (valid rows, rejected rows):
+def prepare_purchase_chunk(chunk, suppliers, products, seen_purchase_ids):
+    chunk = chunk.reset_index(drop=True)
+    for column in REQUIRED_COLUMNS:
+        if column not in chunk.columns:
+            raise ValueError(f"Import file is missing the {column} column")
+
+    rows = pd.DataFrame(index=chunk.index)
+    for column in ["purchase_id", "supplier_id", "product_id", "quantity"]:
+        rows[column] = pd.to_numeric(chunk[column], errors="coerce")
+    for column in OPTIONAL_AMOUNT_COLUMNS:
+        rows[column] = pd.to_numeric(chunk[column], errors="coerce").fillna(0.0) if column in chunk.columns else 0.0
+    rows["purchase_date"] = pd.to_datetime(chunk["purchase_date"], errors="coerce").dt.date
+
+    rows = rows.merge(suppliers, on="supplier_id", how="left").merge(products, on="product_id", how="left")
+    rows.index = chunk.index
+    rows["gstin_number"] = rows["supplier_gstin"]
+    rows["unit_price"] = rows["product_unit_price"]
+    rows["total_price"] = rows["quantity"] * rows["unit_price"]
+    rows["amount"] = rows["total_price"] - rows["discount"] + rows["cgst"] + rows["sgst"] + rows["igst"]
+    default_items = ("Product Name: " + rows["product_name"].astype(str) + "\nDescription: "
+                     + rows["product_description"].astype(str) + "\nCategory: " + rows["product_category"].astype(str))
+    if "item_description" in chunk.columns:
+        rows["item_description"] = chunk["item_description"].where(
+            chunk["item_description"].fillna("").astype(str).str.strip() != "", default_items)
+    else:
+        rows["item_description"] = default_items
+
+    reasons = summarize_errors(validate_frame(rows, import_rules(seen_purchase_ids) + PURCHASE_RULES))
+    valid = ~rows.index.isin(reasons.index)
+    rejected = chunk[~valid].copy()
+    rejected["reason"] = reasons.reindex(rejected.index)
+    prepared = rows.loc[valid, STAGING_COLUMNS].astype({"purchase_id": int, "supplier_id": int, "product_id": int,
+                                                         "quantity": int})
+    return prepared, rejected
+
+
+# Streams a file into Purchase through COPY into a staging table and one merge:
+def import_purchases(pool, source, file_format=None, chunk_size=import_chunk_size, progress=None):
+    result = ImportResult()
+    start = time.perf_counter()
+    rejected_chunks = []
+    seen_purchase_ids = set()
+    with pool.connection() as connection:
+        cursor = connection.cursor()
+        cursor.execute("""CREATE TEMP TABLE purchase_staging (LIKE Purchase INCLUDING DEFAULTS) ON COMMIT DROP""")
+        for chunk in iter_purchase_chunks(source, file_format=file_format, chunk_size=chunk_size):
+            result.rows_read += len(chunk)
+            suppliers, products = lookup_reference_data(cursor, chunk)
+            prepared, rejected = prepare_purchase_chunk(chunk, suppliers, products, seen_purchase_ids)
+            seen_purchase_ids.update(prepared["purchase_id"].tolist())
+            rejected_chunks.append(rejected)
+            buffer = io.StringIO()
+            prepared.to_csv(buffer, index=False, header=False)
+            buffer.seek(0)
+            cursor.copy_expert(f"""COPY purchase_staging ({", ".join(STAGING_COLUMNS)}) FROM STDIN WITH (FORMAT csv)""",
+                               buffer)
+            if progress is not None:
+                progress(result.rows_read)
+
+        # Rows whose purchase_id already exists are reported rather than silently skipped:
+        cursor.execute("""SELECT s.purchase_id FROM purchase_staging s JOIN Purchase p ON p.purchase_id = s.purchase_id""")
+        existing_ids = [row[0] for row in cursor.fetchall()]
+        cursor.execute(f"""INSERT INTO Purchase ({", ".join(STAGING_COLUMNS)}) SELECT {", ".join(STAGING_COLUMNS)} FROM purchase_staging ON CONFLICT (purchase_id) DO NOTHING""")
+        result.inserted = cursor.rowcount
+        connection.commit()
+
+    if existing_ids:
+        rejected_chunks.append(pd.DataFrame({"purchase_id": existing_ids, "reason": "Purchase ID already exists"}))
+    rejected_chunks = [rejected for rejected in rejected_chunks if len(rejected) > 0]
+    if rejected_chunks:
+        result.rejected = pd.concat(rejected_chunks, ignore_index=True).convert_dtypes()
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+# Command Line Entry Point:
+def main(argv=None):
+    from database_connection.database_connection import get_connection_pool
+
+    parser = argparse.ArgumentParser(description="Bulk import purchases from a CSV or Parquet file")
+    parser.add_argument("source", help="CSV or Parquet file with one purchase per row")
+    parser.add_argument("--format", choices=["csv", "parquet"], help="File format (default: from the extension)")
+    parser.add_argument("--chunk-size", type=int, default=import_chunk_size, help="Rows per chunk")
+    parser.add_argument("--rejected", default="rejected_purchases.csv", help="Where to write the rejected-rows report")
+    args = parser.parse_args(argv)
+
+    pool = get_connection_pool()
+    if pool is None:
+        logging.error("Failed to connect to the database.")
+        return 1
+    result = import_purchases(pool, args.source, file_format=args.format, chunk_size=args.chunk_size,
+                              progress=lambda rows_read: logging.info(f"Read {rows_read} rows"))
+    logging.info(f"Inserted {result.inserted} of {result.rows_read} rows in {result.seconds:.1f}s "
+                 f"({result.rows_per_second:.0f} rows/s)")
+    if len(result.rejected) > 0:
+        result.rejected.to_csv(args.rejected, index=False)
+        logging.warning(f"{len(result.rejected)} row(s) rejected, see {args.rejected}")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    raise SystemExit(main())
@@ -0,0 +1,23 @@
+import pandas as pd
+
+from billing.purchase_import import lookup_reference_data, prepare_purchase_chunk
+
+# Column order of a Purchase_Order_Line insert:
+ORDER_LINE_COLUMNS = ["order_id", "line_no", "product_id", "quantity", "unit_price", "total_price", "discount", "cgst",
+                      "sgst", "igst", "amount", "item_description"]
+
+
+# Derives prices, amounts and descriptions for every line of an order in one vectorized pass, reusing the bulk
+# import rules (each line is checked as a purchase numbered by its line number); returns (line rows, rejected lines):
+def prepare_order_lines(cursor, order_id, supplier_id, order_date, lines):
+    lines = pd.DataFrame(lines).reset_index(drop=True)
+    lines = lines.dropna(how="all").reset_index(drop=True)
+    lines["purchase_id"] = lines.index + 1
+    lines["supplier_id"] = supplier_id
+    lines["purchase_date"] = order_date
+    suppliers, products = lookup_reference_data(cursor, lines)
+    prepared, rejected = prepare_purchase_chunk(lines, suppliers, products, set())
+    prepared = prepared.rename(columns={"purchase_id": "line_no"})
+    prepared["order_id"] = order_id
+    rejected = rejected.rename(columns={"purchase_id": "line_no"}).drop(columns=["supplier_id", "purchase_date"])
+    return prepared[ORDER_LINE_COLUMNS], rejected
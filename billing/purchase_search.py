@@ -0,0 +1,86 @@
+import logging
+from datetime import date
+
+from psycopg2 import sql
+
+from database_connection.query_builder import build_where, explain_uses_index
+
+# Columns Purchase records may be filtered on, with the operators each one supports:
+PURCHASE_FILTERS = {
+    "purchase_id": ("eq", "in"),
+    "supplier_id": ("eq", "in"),
+    "product_id": ("eq", "in"),
+    "gstin_number": ("eq", "prefix"),
+    "purchase_date": ("eq", "gte", "lte"),
+    "amount": ("eq", "gte", "lte"),
+}
+
+# Parsers for the text values of each filter column (query strings, command-line arguments):
+PURCHASE_FILTER_TYPES = {"purchase_id": int, "supplier_id": int, "product_id": int, "gstin_number": str,
+                         "purchase_date": date.fromisoformat, "amount": float}
+
+# One representative value per supported filter, used by the index check:
+SAMPLE_FILTERS = {
+    "purchase_id": 1,
+    "purchase_id__in": [1, 2],
+    "supplier_id": 1,
+    "supplier_id__in": [1, 2],
+    "product_id": 1,
+    "product_id__in": [1, 2],
+    "gstin_number": "06BZAHM6385P6Z2",
+    "gstin_number__prefix": "06",
+    "purchase_date": date(2024, 4, 1),
+    "purchase_date__gte": date(2024, 4, 1),
+    "purchase_date__lte": date(2024, 4, 1),
+    "amount": 100.0,
+    "amount__gte": 100.0,
+    "amount__lte": 100.0,
+}
+
+
+def build_purchase_search(filters, columns=sql.SQL("*")):
+    where, values = build_where(filters, PURCHASE_FILTERS)
+    query = sql.SQL("SELECT {} FROM Purchase").format(columns) + where + sql.SQL(" ORDER BY purchase_id")
+    return query, values
+
+
+# Parses text filters such as supplier_id__in=1,2 or purchase_date__gte=2024-04-01, skipping unknown names:
+def parse_purchase_filters(params):
+    filters = {}
+    for name, value in params.items():
+        column, _, operator = name.partition("__")
+        if column not in PURCHASE_FILTERS:
+            continue
+        parse = PURCHASE_FILTER_TYPES[column]
+        try:
+            filters[name] = [parse(item) for item in value.split(",")] if operator == "in" else parse(value)
+        except ValueError:
+            raise ValueError(f"Invalid value for {name}: {value}")
+    return filters
+
+
+# EXPLAINs every supported filter and reports whether it is served by an index:
+def check_purchase_search_indexes(pool):
+    results = {}
+    with pool.connection() as connection:
+        cursor = connection.cursor()
+        # Small tables are always cheaper to scan sequentially, so ask the planner what it would use otherwise:
+        cursor.execute("""SET LOCAL enable_seqscan = off""")
+        for name, value in SAMPLE_FILTERS.items():
+            where, values = build_where({name: value}, PURCHASE_FILTERS)
+            results[name] = explain_uses_index(cursor, sql.SQL("SELECT * FROM Purchase") + where, values)
+        connection.rollback()
+    return results
+
+
+if __name__ == "__main__":
+    from database_connection.database_connection import get_connection_pool
+
+    logging.basicConfig(level=logging.INFO)
+    connection_pool = get_connection_pool()
+    if connection_pool is None:
+        raise SystemExit("Failed to connect to the database.")
+    index_report = check_purchase_search_indexes(connection_pool)
+    for filter_name, uses_index in index_report.items():
+        logging.info(f"{filter_name}: {'index' if uses_index else 'SEQUENTIAL SCAN'}")
+    raise SystemExit(0 if all(index_report.values()) else 1)
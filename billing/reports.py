@@ -0,0 +1,237 @@
+import argparse
+import io
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date
+
+import pandas as pd
+from psycopg2 import sql
+
+from database_connection.errors import ValidationError, database_errors
+
+# Seconds between checks for new writes to refresh the summary views after; 0 disables it (overridable through
+# the .env file):
+report_refresh_seconds = float(os.getenv('REPORT_REFRESH_SECONDS', '300'))
+
+SUMMARY_VIEW = "purchase_monthly_summary"
+# Advisory lock taken while refreshing, so only one process refreshes at a time:
+REPORT_REFRESH_LOCK = 7_301_017
+# Tables whose writes make the summary views stale:
+SUMMARY_SOURCE_TABLES = ("purchase", "purchase_order", "purchase_order_line", "product", "supplier")
+
+# Columns and joins each report dimension adds to the summary view:
+REPORT_DIMENSIONS = {
+    "month": (["m.month"], None),
+    "supplier": (["m.supplier_id", "s.supplier_name", "s.gstin_number"],
+                 "JOIN Supplier s ON s.supplier_id = m.supplier_id"),
+    "product": (["m.product_id", "p.product_name", "p.category"], "JOIN Product p ON p.product_id = m.product_id"),
+    "category": (["p.category"], "JOIN Product p ON p.product_id = m.product_id"),
+}
+
+# Aggregates over the summary view, by output column:
+REPORT_MEASURES = {
+    "purchase_count": "sum(m.purchase_count)::bigint",
+    "quantity": "sum(m.quantity)::bigint",
+    "total_price": "sum(m.total_price)",
+    "discount": "sum(m.discount)",
+    "cgst": "sum(m.cgst)",
+    "sgst": "sum(m.sgst)",
+    "igst": "sum(m.igst)",
+    "total_tax": "sum(m.cgst + m.sgst + m.igst)",
+    "amount": "sum(m.amount)",
+}
+
+SPEND_MEASURES = ["purchase_count", "quantity", "total_price", "discount", "total_tax", "amount"]
+
+
+# A report groups the summary view by some dimensions and totals some measures:
+@dataclass(frozen=True)
+class Report:
+    title: str
+    dimensions: tuple
+    measures: tuple
+    order_by: str
+
+
+REPORTS = {
+    "supplier_spend": Report("Supplier Spend", ("supplier",), tuple(SPEND_MEASURES), "amount DESC"),
+    "supplier_monthly_spend": Report("Supplier Spend by Month", ("month", "supplier"), tuple(SPEND_MEASURES),
+                                     "month, amount DESC"),
+    "product_spend": Report("Product Spend", ("product",), tuple(SPEND_MEASURES), "amount DESC"),
+    "category_spend": Report("Category Spend", ("category",), tuple(SPEND_MEASURES), "amount DESC"),
+    "gst_liability": Report("GST Liability by Month", ("month",), ("cgst", "sgst", "igst", "total_tax"), "month"),
+    "period_summary": Report("Monthly Summary", ("month",), tuple(REPORT_MEASURES), "month"),
+}
+
+
+def build_report_query(report, start_date=None, end_date=None, supplier_id=None):
+    columns, joins = [], []
+    for dimension in report.dimensions:
+        dimension_columns, join = REPORT_DIMENSIONS[dimension]
+        columns += dimension_columns
+        if join is not None and join not in joins:
+            joins.append(join)
+    conditions, values = [], []
+    if start_date is not None:
+        conditions.append("m.month >= date_trunc('month', %s::date)")
+        values.append(start_date)
+    if end_date is not None:
+        conditions.append("m.month <= %s")
+        values.append(end_date)
+    if supplier_id is not None:
+        conditions.append("m.supplier_id = %s")
+        values.append(supplier_id)
+    # Every fragment is one of the constants above, so the query is assembled from trusted text only:
+    query = sql.SQL("SELECT {} FROM {} m {} {} GROUP BY {} ORDER BY {}").format(
+        sql.SQL(", ").join([sql.SQL(column) for column in columns]
+                           + [sql.SQL(f"{REPORT_MEASURES[measure]} AS {measure}") for measure in report.measures]),
+        sql.Identifier(SUMMARY_VIEW),
+        sql.SQL(" ".join(joins)),
+        sql.SQL("WHERE " + " AND ".join(conditions) if conditions else ""),
+        sql.SQL(", ".join(columns)),
+        sql.SQL(report.order_by))
+    return query, values
+
+
+# Report frames as downloadable CSV or Parquet bytes:
+def report_bytes(frame, file_format="csv"):
+    if file_format == "parquet":
+        buffer = io.BytesIO()
+        frame.to_parquet(buffer, index=False)
+        return buffer.getvalue()
+    return frame.to_csv(index=False).encode("utf-8")
+
+
+# Creating Reports Class:
+class Reports:
+    def __init__(self, pool):
+        self.pool = pool
+
+    def run_report(self, name: str, start_date: date = None, end_date: date = None, supplier_id: int = None):
+        if name not in REPORTS:
+            raise ValidationError(f"Unknown report {name}")
+        query, values = build_report_query(REPORTS[name], start_date, end_date, supplier_id)
+        with database_errors(f"Failed to run the {REPORTS[name].title} report"):
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                cursor.execute(query, values)
+                columns = [column[0] for column in cursor.description]
+                return pd.DataFrame(cursor.fetchall(), columns=columns)
+
+    # Recomputes the summary view without blocking readers; with stale_after_seconds, only when the base tables
+    # changed since the last refresh and that refresh is at least that old. Returns whether it refreshed:
+    def refresh(self, stale_after_seconds: float = None):
+        with database_errors("Failed to refresh the report views"):
+            with self.pool.transaction() as unit_of_work:
+                cursor = unit_of_work.cursor()
+                cursor.execute("""SELECT pg_try_advisory_xact_lock(%s)""", (REPORT_REFRESH_LOCK,))
+                if not cursor.fetchone()[0]:
+                    return False
+                cursor.execute("""SELECT coalesce(sum(n_tup_ins + n_tup_upd + n_tup_del), 0) FROM pg_stat_user_tables WHERE relname = ANY(%s)""",
+                               (list(SUMMARY_SOURCE_TABLES),))
+                changes = cursor.fetchone()[0]
+                if stale_after_seconds is not None:
+                    cursor.execute("""SELECT changes, extract(epoch FROM now() - refreshed_at) FROM Report_Refresh WHERE view_name = %s""",
+                                   (SUMMARY_VIEW,))
+                    last_refresh = cursor.fetchone()
+                    if last_refresh is not None and (last_refresh[0] == changes
+                                                     or last_refresh[1] < stale_after_seconds):
+                        return False
+                start = time.perf_counter()
+                cursor.execute(sql.SQL("REFRESH MATERIALIZED VIEW CONCURRENTLY {}").format(sql.Identifier(SUMMARY_VIEW)))
+                seconds = time.perf_counter() - start
+                cursor.execute("""INSERT INTO Report_Refresh (view_name, refreshed_at, seconds, changes) VALUES (%s, now(), %s, %s) ON CONFLICT (view_name) DO UPDATE SET refreshed_at = EXCLUDED.refreshed_at, seconds = EXCLUDED.seconds, changes = EXCLUDED.changes""",
+                               (SUMMARY_VIEW, seconds, changes))
+        logging.info(f"Refreshed {SUMMARY_VIEW} in {seconds:.2f}s")
+        return True
+
+    def last_refreshed(self):
+        with database_errors("Failed to fetch records from Report_Refresh table"):
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                cursor.execute("""SELECT refreshed_at FROM Report_Refresh WHERE view_name = %s""", (SUMMARY_VIEW,))
+                row = cursor.fetchone()
+                return row[0] if row else None
+
+
+# Refreshes the summary views in the background once writes have made them stale:
+class ReportRefresher:
+    def __init__(self, pool, interval_seconds=report_refresh_seconds):
+        self.reports = Reports(pool)
+        self.interval_seconds = interval_seconds
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="report-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stopping.wait(self.interval_seconds):
+            try:
+                self.reports.refresh(stale_after_seconds=self.interval_seconds)
+            except Exception as e:
+                logging.error("Failed to refresh the report views: " + str(e))
+
+
+_report_refresher = None
+_report_refresher_lock = threading.Lock()
+
+
+# Returns the process-wide refresher, starting it on first use; None when scheduled refreshes are disabled:
+def get_report_refresher(pool):
+    global _report_refresher
+    if _report_refresher is None and report_refresh_seconds > 0:
+        with _report_refresher_lock:
+            if _report_refresher is None:
+                refresher = ReportRefresher(pool)
+                refresher.start()
+                _report_refresher = refresher
+    return _report_refresher
+
+
+# Command Line Entry Point:
+def main(argv=None):
+    from database_connection.database_connection import get_connection_pool
+
+    parser = argparse.ArgumentParser(description="Run purchase reports from the precomputed monthly summary")
+    parser.add_argument("report", choices=["refresh"] + list(REPORTS),
+                        help="Report to run, or 'refresh' to recompute the summary (e.g. from cron)")
+    parser.add_argument("--start-date", type=date.fromisoformat, help="First month to include (YYYY-MM-DD)")
+    parser.add_argument("--end-date", type=date.fromisoformat, help="Last month to include (YYYY-MM-DD)")
+    parser.add_argument("--supplier-id", type=int, help="Only include purchases from this supplier")
+    parser.add_argument("--output", help="Write the report to this .csv or .parquet file instead of printing it")
+    args = parser.parse_args(argv)
+
+    pool = get_connection_pool()
+    if pool is None:
+        logging.error("Failed to connect to the database.")
+        return 1
+    reports = Reports(pool)
+    if args.report == "refresh":
+        reports.refresh()
+        return 0
+    frame = reports.run_report(args.report, start_date=args.start_date, end_date=args.end_date,
+                               supplier_id=args.supplier_id)
+    if args.output:
+        file_format = "parquet" if args.output.lower().endswith(".parquet") else "csv"
+        with open(args.output, "wb") as file:
+            file.write(report_bytes(frame, file_format))
+        logging.info(f"Wrote {len(frame)} row(s) to {args.output}")
+    else:
+        print(frame.to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    raise SystemExit(main())
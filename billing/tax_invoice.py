@@ -0,0 +1,87 @@
+from dataclasses import dataclass
+from datetime import date, datetime
+
+import pandas as pd
+
+from billing.template_registry import template_registry
+
+# Only the columns an invoice needs, assembled from Purchase, Supplier and Product in one round trip:
+TAX_INVOICE_QUERY = """SELECT p.purchase_id, s.supplier_name, s.mobile_no, s.address, s.city, s.state_province, s.country, s.postal_code, p.gstin_number, pr.product_name, p.quantity, p.total_price, p.discount, p.cgst, p.sgst, p.igst, p.amount, p.purchase_date FROM Purchase p JOIN Supplier s ON s.supplier_id = p.supplier_id JOIN Product pr ON pr.product_id = p.product_id"""
+
+
+# Header columns plus one row per line item of a purchase order, in line order:
+PURCHASE_ORDER_INVOICE_QUERY = """SELECT o.order_id, s.supplier_name, s.mobile_no, s.address, s.city, s.state_province, s.country, s.postal_code, o.gstin_number, pr.product_name, l.quantity, l.total_price, l.discount, l.cgst, l.sgst, l.igst, l.amount, o.order_date FROM Purchase_Order o JOIN Supplier s ON s.supplier_id = o.supplier_id JOIN Purchase_Order_Line l ON l.order_id = o.order_id JOIN Product pr ON pr.product_id = l.product_id"""
+
+
+# One billed line of a Tax Invoice:
+@dataclass(frozen=True)
+class InvoiceItem:
+    product_name: str
+    quantity: int
+    gross_amount: float
+    discount: float
+    cgst: float
+    sgst: float
+    igst: float
+    total: float
+
+
+def _supplier_address(address, city, state, country, pincode):
+    return address + ", " + city + "\n" + state + ", " + country + " - " + pincode
+
+
+# Typed Tax Invoice Record; a single purchase is an invoice with one item:
+@dataclass(frozen=True)
+class TaxInvoice:
+    invoice_no: object
+    supplier_name: str
+    supplier_phone: str
+    supplier_address: str
+    supplier_gstin: str
+    invoice_date: date
+    items: tuple
+    total_tax: float
+    total_amount: float
+
+    @classmethod
+    def from_row(cls, row):
+        return cls.from_rows([row])
+
+    # Builds one invoice from the joined rows of a header and its lines, totalling them in one vectorized pass:
+    @classmethod
+    def from_rows(cls, rows, invoice_no=None):
+        (header_id, supplier_name, supplier_mobile, supplier_address, supplier_city, supplier_state,
+         supplier_country, supplier_pincode, gstin_number) = rows[0][:9]
+        items = tuple(InvoiceItem(*row[9:17]) for row in rows)
+        totals = pd.DataFrame(items)[["cgst", "sgst", "igst", "total"]].to_numpy(dtype=float).sum(axis=0)
+        return cls(invoice_no=header_id if invoice_no is None else invoice_no, supplier_name=supplier_name,
+                   supplier_phone=supplier_mobile,
+                   supplier_address=_supplier_address(supplier_address, supplier_city, supplier_state,
+                                                      supplier_country, supplier_pincode),
+                   supplier_gstin=gstin_number, invoice_date=rows[0][17], items=items,
+                   total_tax=round(float(totals[:3].sum()), 2), total_amount=round(float(totals[3]), 2))
+
+
+# Returns the compiled tax invoice template from the shared registry:
+def load_tax_invoice_template():
+    return template_registry.get_template("tax_invoice_template.html")
+
+
+# Renders one invoice to HTML; pass a preloaded template when rendering many invoices:
+def render_tax_invoice(tax_invoice, template=None, billing_date=None):
+    template = template or load_tax_invoice_template()
+    return template.render(supplier_name=tax_invoice.supplier_name,
+                           supplier_address=tax_invoice.supplier_address,
+                           supplier_phone=tax_invoice.supplier_phone,
+                           supplier_gstin=tax_invoice.supplier_gstin,
+                           invoice_no=tax_invoice.invoice_no,
+                           invoice_date=tax_invoice.invoice_date,
+                           items=tax_invoice.items,
+                           total_tax=tax_invoice.total_tax,
+                           total_amount=tax_invoice.total_amount,
+                           billing_date=billing_date or datetime.now().strftime("%d-%m-%Y"))
+
+
+# Download file name for a rendered invoice:
+def tax_invoice_pdf_filename(tax_invoice):
+    return f"{tax_invoice.invoice_no}_tax_invoice_{tax_invoice.invoice_date}.pdf"
@@ -0,0 +1,38 @@
+import hashlib
+import os
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
+
+template_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Compiled-template cache settings (overridable through the .env file); an unset directory
+# lets Jinja pick a private folder under the system temp directory:
+bytecode_cache_dir = os.getenv('TEMPLATE_BYTECODE_CACHE_DIR')
+template_cache_size = int(os.getenv('TEMPLATE_CACHE_SIZE', '50'))
+
+
+# Process-wide registry of compiled Jinja templates:
+class TemplateRegistry:
+    def __init__(self, search_path=template_dir, cache_dir=bytecode_cache_dir, cache_size=template_cache_size):
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        # auto_reload only recompiles a template when its file's mtime changes; otherwise the
+        # compiled template is served from memory, and fresh processes load bytecode from disk:
+        self.env = Environment(loader=FileSystemLoader(search_path),
+                               autoescape=select_autoescape(['html', 'xml']),
+                               auto_reload=True,
+                               cache_size=cache_size,
+                               bytecode_cache=FileSystemBytecodeCache(cache_dir))
+
+    def get_template(self, name):
+        return self.env.get_template(name)
+
+    # Short digest of a template's source; it changes whenever the file is edited:
+    def version(self, name):
+        source, _, _ = self.env.loader.get_source(self.env, name)
+        return hashlib.sha256(source.encode("utf-8")).hexdigest()[:16]
+
+    def render(self, name, **context):
+        return self.get_template(name).render(**context)
+
+
+template_registry = TemplateRegistry()
@@ -0,0 +1,47 @@
+from psycopg2 import sql
+from psycopg2.extras import execute_values
+
+# Rows sent per multi-row statement:
+batch_page_size = 1000
+
+
+# Key of every row, for rows given as dicts or as tuples in column order:
+def row_keys(rows, columns, key_column):
+    index = columns.index(key_column)
+    return [row[key_column] if isinstance(row, dict) else row[index] for row in rows]
+
+
+def _values(rows, columns):
+    return [tuple(row[column] for column in columns) if isinstance(row, dict) else tuple(row) for row in rows]
+
+
+# Multi-row INSERT of dicts (or tuples in column order); returns the number of rows inserted:
+def insert_rows(cursor, table, columns, rows, key_column):
+    query = sql.SQL("INSERT INTO {} ({}) VALUES %s RETURNING {}").format(
+        sql.Identifier(table.lower()), sql.SQL(", ").join(map(sql.Identifier, columns)), sql.Identifier(key_column))
+    return len(execute_values(cursor, query.as_string(cursor), _values(rows, columns), page_size=batch_page_size,
+                              fetch=True))
+
+
+# Multi-row UPDATE ... FROM (VALUES ...) matched on the key column; returns the number of rows updated:
+def update_rows(cursor, table, columns, rows, key_column):
+    # VALUES lists are typed as text unless cast, so cast every value to its column's type:
+    cursor.execute("""SELECT column_name, data_type FROM information_schema.columns WHERE table_schema = current_schema() AND table_name = %s""",
+                   (table.lower(),))
+    column_types = dict(cursor.fetchall())
+    template = "(" + ", ".join(f"%s::{column_types[column]}" for column in columns) + ")"
+    query = sql.SQL("UPDATE {table} AS t SET {assignments} FROM (VALUES %s) AS v ({columns}) WHERE t.{key} = v.{key} RETURNING t.{key}").format(
+        table=sql.Identifier(table.lower()),
+        assignments=sql.SQL(", ").join(sql.SQL("{0} = v.{0}").format(sql.Identifier(column))
+                                       for column in columns if column != key_column),
+        columns=sql.SQL(", ").join(map(sql.Identifier, columns)),
+        key=sql.Identifier(key_column))
+    return len(execute_values(cursor, query.as_string(cursor), _values(rows, columns), template=template,
+                              page_size=batch_page_size, fetch=True))
+
+
+# DELETE of every row whose key is in keys; returns the number of rows deleted:
+def delete_rows(cursor, table, key_column, keys):
+    cursor.execute(sql.SQL("DELETE FROM {} WHERE {} = ANY(%s)").format(sql.Identifier(table.lower()),
+                                                                       sql.Identifier(key_column)), (list(keys),))
+    return cursor.rowcount
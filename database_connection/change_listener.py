@@ -0,0 +1,144 @@
+import json
+import logging
+import os
+import select
+import threading
+from dataclasses import dataclass
+
+import psycopg2
+
+from database_connection.database_connection import database_url
+from database_connection.reference_cache import reference_cache
+
+# Whether app and API processes follow the change notifications of migrations/0007, and how long the listener
+# waits before reconnecting after losing its connection (overridable through the .env file):
+change_listener_enabled = os.getenv('CHANGE_LISTENER', 'true').lower() == 'true'
+change_listener_reconnect_seconds = float(os.getenv('CHANGE_LISTENER_RECONNECT_SECONDS', '5'))
+
+CHANGE_CHANNEL = "billing_changes"
+CHANGE_TABLES = ("supplier", "product", "purchase")
+
+
+# One committed statement on a watched table: rows holds the key columns of each row it touched, or is None when any
+# row may have changed (a bulk statement, or notifications missed while the listener was disconnected):
+@dataclass(frozen=True)
+class Change:
+    table: str
+    operation: str
+    rows: list = None
+
+    def keys(self, column):
+        return {row[column] for row in self.rows if row.get(column) is not None}
+
+
+# Reference cache keys start with (table, id), plus the ("supplier" | "product", "ids", ...) lists and the
+# ("product", "by_supplier", supplier_id) lists:
+def invalidate_reference_data(change):
+    if change.rows is None:
+        reference_cache.invalidate(change.table)
+        return
+    for record_id in change.keys(f"{change.table}_id"):
+        reference_cache.invalidate(change.table, record_id)
+    if change.operation != "UPDATE":
+        reference_cache.invalidate(change.table, "ids")
+    if change.table == "product":
+        for supplier_id in change.keys("supplier_id"):
+            reference_cache.invalidate("product", "by_supplier", supplier_id)
+
+
+# Background thread holding one dedicated connection that LISTENs for changes made by any process, and passes each
+# one to the handlers subscribed to its table:
+class ChangeListener:
+    def __init__(self, db_url=None, reconnect_seconds=change_listener_reconnect_seconds):
+        self.db_url = db_url
+        self.reconnect_seconds = reconnect_seconds
+        self._handlers = {}
+        self._stopping = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def subscribe(self, table, handler):
+        self._handlers.setdefault(table, []).append(handler)
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name="change-listener", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        with self._lock:
+            if self._thread is not None:
+                self._thread.join()
+                self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def dispatch(self, change):
+        for handler in self._handlers.get(change.table, []):
+            try:
+                handler(change)
+            except Exception as e:
+                logging.error(f"Failed to apply a {change.table} change: " + str(e))
+
+    # Applies one notification payload; anything that is not a change written by migrations/0007 (a stray NOTIFY
+    # on the channel, a truncated payload) is logged and skipped, so it cannot stop the listener:
+    def handle_notification(self, payload):
+        try:
+            fields = json.loads(payload)
+            if not isinstance(fields["table"], str) or not isinstance(fields["rows"], (list, type(None))):
+                raise ValueError("unexpected field types")
+            change = Change(fields["table"], fields["operation"], fields["rows"])
+        except (ValueError, TypeError, KeyError) as e:
+            logging.error(f"Ignoring malformed change notification {payload[:200]!r}: " + str(e))
+            return
+        self.dispatch(change)
+
+    def _connect(self):
+        connection = psycopg2.connect(self.db_url or database_url, keepalives=1, keepalives_idle=30)
+        connection.autocommit = True
+        connection.cursor().execute(f"LISTEN {CHANGE_CHANNEL}")
+        return connection
+
+    def _run(self):
+        while not self._stopping.is_set():
+            connection = None
+            try:
+                connection = self._connect()
+                # Changes committed before LISTEN (or while reconnecting) were never delivered, so forget everything
+                # cached so far once:
+                for table in CHANGE_TABLES:
+                    self.dispatch(Change(table, "RESYNC"))
+                logging.info(f"Listening for changes on {CHANGE_CHANNEL}")
+                while not self._stopping.is_set():
+                    if select.select([connection], [], [], 1.0) == ([], [], []):
+                        continue
+                    connection.poll()
+                    while connection.notifies:
+                        self.handle_notification(connection.notifies.pop(0).payload)
+            except (psycopg2.Error, OSError) as e:
+                logging.error("Change listener lost its database connection: " + str(e))
+                self._stopping.wait(self.reconnect_seconds)
+            except Exception as e:
+                # Anything else would end the thread and leave the caches unwatched for the rest of the process:
+                logging.exception("Change listener failed, reconnecting: " + str(e))
+                self._stopping.wait(self.reconnect_seconds)
+            finally:
+                if connection is not None:
+                    connection.close()
+
+
+change_listener = ChangeListener()
+change_listener.subscribe("supplier", invalidate_reference_data)
+change_listener.subscribe("product", invalidate_reference_data)
+
+
+# Starts the process-wide listener once (unless disabled through CHANGE_LISTENER) and returns it:
+def get_change_listener():
+    if change_listener_enabled and not change_listener.running:
+        change_listener.start()
+    return change_listener
@@ -1,12 +1,24 @@
 import psycopg2
+import psycopg2.pool
 import logging
+import threading
+import time
+from contextlib import contextmanager
 from dotenv import load_dotenv
 import os
 
+from database_connection.instrumentation import InstrumentedCursor
+
 load_dotenv()
 
 database_url = os.getenv('DATABASE_URL')
 
+# Pool sizing and health-check settings (overridable through the .env file):
+pool_min_size = int(os.getenv('DB_POOL_MIN_SIZE', '1'))
+pool_max_size = int(os.getenv('DB_POOL_MAX_SIZE', '10'))
+pool_checkout_timeout = float(os.getenv('DB_POOL_CHECKOUT_TIMEOUT', '30'))
+pool_idle_check_seconds = float(os.getenv('DB_POOL_IDLE_CHECK_SECONDS', '60'))
+
 
 # Function to connect to the PostgreSQL database
 class DatabaseConnection:
@@ -21,3 +33,152 @@ class DatabaseConnection:
         except psycopg2.Error as e:
             logging.info("Unable to connect to the database: " + str(e))
             return None
+
+
+# Groups many mutations on one pooled connection into a single commit:
+class UnitOfWork:
+    def __init__(self, connection):
+        self.connection = connection
+        self._savepoint_count = 0
+        self._commit_callbacks = []
+
+    def cursor(self):
+        return self.connection.cursor()
+
+    # Rolls back only this block's changes when it raises, then re-raises so the caller can decide what to do:
+    @contextmanager
+    def savepoint(self):
+        self._savepoint_count += 1
+        name = f"unit_of_work_{self._savepoint_count}"
+        callback_count = len(self._commit_callbacks)
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"SAVEPOINT {name}")
+        try:
+            yield self
+        except Exception:
+            with self.connection.cursor() as cursor:
+                cursor.execute(f"ROLLBACK TO SAVEPOINT {name}")
+            del self._commit_callbacks[callback_count:]
+            raise
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"RELEASE SAVEPOINT {name}")
+
+    # Defers work (such as cache invalidation) until the changes are committed; dropped on rollback:
+    def on_commit(self, callback):
+        self._commit_callbacks.append(callback)
+
+    def _committed(self):
+        for callback in self._commit_callbacks:
+            callback()
+        self._commit_callbacks = []
+
+
+# Process-wide, thread-safe pool of PostgreSQL connections:
+class ConnectionPool:
+    def __init__(self, db_url=None, min_size=pool_min_size, max_size=pool_max_size,
+                 checkout_timeout=pool_checkout_timeout, idle_check_seconds=pool_idle_check_seconds):
+        self.db_url = db_url or database_url
+        self.checkout_timeout = checkout_timeout
+        self.idle_check_seconds = idle_check_seconds
+        # Every statement on a pooled connection is timed into query_stats:
+        self._pool = psycopg2.pool.ThreadedConnectionPool(min_size, max_size, self.db_url,
+                                                          cursor_factory=InstrumentedCursor)
+        # ThreadedConnectionPool raises as soon as it is exhausted, so callers wait on a semaphore instead:
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._last_used = {}
+        self._lock = threading.Lock()
+
+    def _is_healthy(self, conn):
+        if conn.closed:
+            return False
+        with self._lock:
+            last_used = self._last_used.get(id(conn), 0.0)
+        if time.monotonic() - last_used < self.idle_check_seconds:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error as e:
+            logging.info("Discarding stale database connection: " + str(e))
+            return False
+
+    def getconn(self):
+        if not self._slots.acquire(timeout=self.checkout_timeout):
+            raise psycopg2.pool.PoolError("Timed out waiting for a free database connection")
+        try:
+            conn = self._pool.getconn()
+            if not self._is_healthy(conn):
+                # Reconnect transparently when the server dropped an idle connection:
+                self._pool.putconn(conn, close=True)
+                conn = self._pool.getconn()
+            return conn
+        except Exception:
+            self._slots.release()
+            raise
+
+    def putconn(self, conn):
+        try:
+            try:
+                if not conn.closed and conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except psycopg2.Error as e:
+                # A connection that cannot roll back (dropped socket, terminated session) is closed, not reused:
+                logging.info("Discarding database connection that failed to roll back: " + str(e))
+                conn.close()
+            with self._lock:
+                if conn.closed:
+                    self._last_used.pop(id(conn), None)
+                else:
+                    self._last_used[id(conn)] = time.monotonic()
+            self._pool.putconn(conn, close=bool(conn.closed))
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        conn = self.getconn()
+        try:
+            yield conn
+        except Exception:
+            if not conn.closed:
+                conn.rollback()
+            raise
+        finally:
+            self.putconn(conn)
+
+    # Commits everything done through the unit of work at the end of the block, or rolls it all back on error.
+    # Passing an open unit of work joins it instead, inside a savepoint of its own:
+    @contextmanager
+    def transaction(self, unit_of_work=None):
+        if unit_of_work is not None:
+            with unit_of_work.savepoint():
+                yield unit_of_work
+            return
+        with self.connection() as conn:
+            unit_of_work = UnitOfWork(conn)
+            yield unit_of_work
+            conn.commit()
+        unit_of_work._committed()
+
+    def close(self):
+        self._pool.closeall()
+
+
+_connection_pool = None
+_connection_pool_lock = threading.Lock()
+
+
+# Returns the shared connection pool, creating it on first use:
+def get_connection_pool():
+    global _connection_pool
+    if _connection_pool is None:
+        with _connection_pool_lock:
+            if _connection_pool is None:
+                try:
+                    _connection_pool = ConnectionPool()
+                except psycopg2.Error as e:
+                    logging.info("Unable to connect to the database: " + str(e))
+                    return None
+    return _connection_pool
@@ -0,0 +1,42 @@
+from contextlib import contextmanager
+
+import psycopg2
+
+
+# Base class of the errors raised by the Billing, Product and Supplier operations:
+class DomainError(Exception):
+    pass
+
+
+# The requested records do not exist (or a listing came back empty):
+class NotFoundError(DomainError):
+    pass
+
+
+# The input was rejected before reaching the database:
+class ValidationError(DomainError):
+    pass
+
+
+# The change clashes with an existing record (duplicate key, missing reference, ...):
+class ConflictError(DomainError):
+    pass
+
+
+class DatabaseError(DomainError):
+    pass
+
+
+# Turns any database failure inside the block into a typed error prefixed with what was being attempted:
+@contextmanager
+def database_errors(message):
+    try:
+        yield
+    except DomainError:
+        raise
+    except ValueError as error:
+        raise ValidationError(str(error)) from error
+    except psycopg2.IntegrityError as error:
+        raise ConflictError(message + ": " + str(error)) from error
+    except (Exception, psycopg2.Error) as error:
+        raise DatabaseError(message + ": " + str(error)) from error
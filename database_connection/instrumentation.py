@@ -0,0 +1,123 @@
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+import psycopg2.extensions
+
+# Statements slower than this are written to the slow-query log, and whether the app shows the Database Time
+# sidebar panel (overridable through the .env file):
+slow_query_ms = float(os.getenv('SLOW_QUERY_MS', '200'))
+show_query_stats = os.getenv('SHOW_QUERY_STATS', 'false').lower() == 'true'
+
+slow_query_log = logging.getLogger("slow_query")
+
+# Frames from these modules are plumbing, so the caller reported is the first frame outside them:
+PLUMBING_MODULES = ("database_connection.", "psycopg2", "contextlib", "ui.streamlit_adapter")
+
+
+# Running totals of the statements issued by one caller:
+@dataclass
+class StatementStats:
+    calls: int = 0
+    seconds: float = 0.0
+    rows: int = 0
+    max_seconds: float = 0.0
+
+    def add(self, seconds, rows):
+        self.calls += 1
+        self.seconds += seconds
+        self.rows += rows
+        self.max_seconds = max(self.max_seconds, seconds)
+
+
+# The calling Class.method (or function) of a statement, skipping the database plumbing:
+def calling_method():
+    frame = sys._getframe(2)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if not module.startswith(PLUMBING_MODULES):
+            return getattr(frame.f_code, "co_qualname", frame.f_code.co_name)
+        frame = frame.f_back
+    return "<unknown>"
+
+
+# The text of a statement as psycopg2 accepts it: a str, the bytes built by execute_values, or a sql.Composable:
+def statement_text(cursor, query):
+    if isinstance(query, str):
+        return query
+    if isinstance(query, bytes):
+        return query.decode(psycopg2.extensions.encodings.get(cursor.connection.encoding, "utf-8"), "replace")
+    return query.as_string(cursor)
+
+
+# Process-wide statement statistics per caller, plus the statements of the current scope (a Streamlit rerun or
+# an API request) on this thread:
+class QueryStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._callers = {}
+        self._local = threading.local()
+
+    # Called from the cursor's finally blocks, so it must never raise and change what the statement returned or raised:
+    def record(self, cursor, query, seconds, rows):
+        try:
+            caller = calling_method()
+            with self._lock:
+                self._callers.setdefault(caller, StatementStats()).add(seconds, rows)
+            scope = getattr(self._local, "scope", None)
+            if scope is not None:
+                scope.setdefault(caller, StatementStats()).add(seconds, rows)
+            if seconds * 1000 >= slow_query_ms:
+                slow_query_log.warning(f"{seconds * 1000:.0f} ms in {caller}: "
+                                       f"{' '.join(statement_text(cursor, query).split())[:1000]}")
+        except Exception as e:
+            logging.error("Failed to record statement timing: " + str(e))
+
+    # Collects the statements issued on this thread inside the block into the yielded caller -> stats dict:
+    @contextmanager
+    def scope(self):
+        previous = getattr(self._local, "scope", None)
+        self._local.scope = {}
+        try:
+            yield self._local.scope
+        finally:
+            self._local.scope = previous
+
+    def snapshot(self):
+        with self._lock:
+            return {caller: StatementStats(**vars(stats)) for caller, stats in self._callers.items()}
+
+    def reset(self):
+        with self._lock:
+            self._callers.clear()
+
+
+query_stats = QueryStats()
+
+
+# Cursor that times every statement into query_stats; installed on every pooled connection as its cursor_factory:
+class InstrumentedCursor(psycopg2.extensions.cursor):
+    def execute(self, query, vars=None):
+        start = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            query_stats.record(self, query, time.perf_counter() - start, max(self.rowcount, 0))
+
+    def executemany(self, query, vars_list):
+        start = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            query_stats.record(self, query, time.perf_counter() - start, max(self.rowcount, 0))
+
+    def copy_expert(self, sql, file, size=8192):
+        start = time.perf_counter()
+        try:
+            return super().copy_expert(sql, file, size)
+        finally:
+            query_stats.record(self, sql, time.perf_counter() - start, max(self.rowcount, 0))
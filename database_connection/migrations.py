@@ -0,0 +1,38 @@
+import glob
+import logging
+import os
+
+from database_connection.database_connection import get_connection_pool
+
+migrations_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+
+
+# Applies every migrations/*.sql file that has not been recorded yet, each in its own transaction:
+def apply_migrations(pool, directory=migrations_dir):
+    applied = []
+    with pool.connection() as connection:
+        cursor = connection.cursor()
+        cursor.execute("""CREATE TABLE IF NOT EXISTS schema_migrations (version VARCHAR(255) PRIMARY KEY, applied_at TIMESTAMPTZ NOT NULL DEFAULT now())""")
+        connection.commit()
+        cursor.execute("""SELECT version FROM schema_migrations""")
+        done = {row[0] for row in cursor.fetchall()}
+        for path in sorted(glob.glob(os.path.join(directory, "*.sql"))):
+            version = os.path.basename(path)
+            if version in done:
+                continue
+            with open(path) as file:
+                cursor.execute(file.read())
+            cursor.execute("""INSERT INTO schema_migrations (version) VALUES (%s)""", (version,))
+            connection.commit()
+            logging.info(f"Applied migration {version}")
+            applied.append(version)
+    return applied
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    connection_pool = get_connection_pool()
+    if connection_pool is None:
+        raise SystemExit("Failed to connect to the database.")
+    applied_migrations = apply_migrations(connection_pool)
+    logging.info(f"{len(applied_migrations)} migration(s) applied")
@@ -0,0 +1,189 @@
+import base64
+import json
+import os
+from dataclasses import dataclass
+from datetime import date
+
+from psycopg2 import sql
+
+# Rows fetched from the server-side cursor per network round trip, and the newest matches a text search ranks
+# (overridable through the .env file):
+cursor_itersize = 500
+text_search_candidates = int(os.getenv('TEXT_SEARCH_CANDIDATES', '1000'))
+
+
+# One page of a keyset-paginated listing:
+@dataclass
+class Page:
+    rows: list
+    next_cursor: str
+    total_estimate: int
+    # Text searches only: older matches were left unranked, and the rows are fuzzy rather than word matches:
+    truncated: bool = False
+    similar: bool = False
+
+
+def _encode_value(value):
+    if isinstance(value, date):
+        return {"date": value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict) and "date" in value:
+        return date.fromisoformat(value["date"])
+    return value
+
+
+# Opaque cursor token holding the sort key of the last row on a page:
+def encode_cursor(sort_key, sort_value, id_value):
+    payload = json.dumps([sort_key, _encode_value(sort_value), id_value])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def cursor_sort_key(token):
+    return json.loads(base64.urlsafe_b64decode(token.encode()))[0]
+
+
+def decode_cursor(token, sort_key):
+    stored_key, sort_value, id_value = json.loads(base64.urlsafe_b64decode(token.encode()))
+    if stored_key != sort_key:
+        raise ValueError("Cursor token was issued for a different sort key")
+    return _decode_value(sort_value), id_value
+
+
+# Planner row estimate from pg_class, so no COUNT(*) scan is needed:
+def estimate_row_count(cursor, table):
+    cursor.execute("""SELECT reltuples::BIGINT FROM pg_class WHERE oid = to_regclass(%s)""", (table.lower(),))
+    row = cursor.fetchone()
+    return max(int(row[0]), 0) if row else 0
+
+
+# Planner estimate of the rows a filtered query returns, read from EXPLAIN instead of running it:
+def estimate_matching_rows(cursor, query, values):
+    cursor.execute(sql.SQL("EXPLAIN (FORMAT JSON) ") + query, values)
+    return int(cursor.fetchone()[0][0]["Plan"]["Plan Rows"])
+
+
+# Fetches one page ordered by (sort_key, id_column) using a named server-side cursor; where (with where_values)
+# narrows the listing to the rows matching a filter condition:
+def fetch_page(connection, table, columns, id_column, sort_key, page_size, cursor_token=None, where=None,
+               where_values=()):
+    if sort_key not in columns:
+        raise ValueError(f"Cannot sort {table} by {sort_key}")
+    if sort_key == id_column:
+        order_by = sql.Identifier(id_column)
+        after = sql.SQL("{} > %s").format(sql.Identifier(id_column))
+    else:
+        order_by = sql.SQL("{}, {}").format(sql.Identifier(sort_key), sql.Identifier(id_column))
+        after = sql.SQL("({}, {}) > (%s, %s)").format(sql.Identifier(sort_key), sql.Identifier(id_column))
+    select = sql.SQL("SELECT {} FROM {}").format(sql.SQL(", ").join(map(sql.Identifier, columns)),
+                                                 sql.Identifier(table.lower()))
+    conditions = [] if where is None else [sql.SQL("({})").format(where)]
+    values = list(where_values)
+    if cursor_token:
+        sort_value, id_value = decode_cursor(cursor_token, sort_key)
+        conditions.append(after)
+        values += [id_value] if sort_key == id_column else [sort_value, id_value]
+    query = select
+    if conditions:
+        query += sql.SQL(" WHERE ") + sql.SQL(" AND ").join(conditions)
+    query += sql.SQL(" ORDER BY ") + order_by + sql.SQL(" LIMIT %s")
+    # One extra row tells us whether another page follows:
+    values.append(page_size + 1)
+
+    with connection.cursor(name=f"{table.lower()}_page") as cursor:
+        cursor.itersize = min(cursor_itersize, page_size + 1)
+        cursor.execute(query, values)
+        rows = cursor.fetchmany(page_size + 1)
+    with connection.cursor() as cursor:
+        if where is None:
+            total_estimate = estimate_row_count(cursor, table)
+        else:
+            total_estimate = estimate_matching_rows(cursor, select + sql.SQL(" WHERE ") + where, list(where_values))
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last_row = rows[-1]
+        next_cursor = encode_cursor(sort_key, last_row[columns.index(sort_key)], last_row[columns.index(id_column)])
+    return Page(rows=rows, next_cursor=next_cursor, total_estimate=max(total_estimate, len(rows)))
+
+
+# Fetches one page of rows matching a text search, best rank first, each row followed by its rank. Only the newest
+# text_search_candidates matches (found through the index serving match, ordering by id + 0 keeps the planner off
+# the primary key) are ranked. That caps the ranking work but not the matching: the index still returns every
+# matching row, and each one is read from the table before the newest are picked, so a word found in most rows
+# costs more than a rare one. truncated tells the caller that older matches were left out and the total_estimate
+# is the number of ranked candidates:
+def _fetch_ranked_matches(connection, table, columns, id_column, match, rank, sort_key, values, page_size,
+                          cursor_token=None):
+    column_list = sql.SQL(", ").join(map(sql.Identifier, columns))
+    query = sql.SQL("""WITH candidates AS MATERIALIZED (
+                           SELECT {columns} FROM {table} WHERE {match}
+                           ORDER BY {id} + 0 DESC LIMIT %(candidates)s + 1),
+                       ranked AS (
+                           SELECT {columns}, {rank} AS rank, (SELECT count(*) FROM candidates) AS matches
+                           FROM candidates ORDER BY {id} DESC LIMIT %(candidates)s)
+                       SELECT {columns}, rank, matches FROM ranked""").format(
+        columns=column_list, table=sql.Identifier(table.lower()), match=match, rank=rank, id=sql.Identifier(id_column))
+    values = dict(values, candidates=text_search_candidates, page_size=page_size + 1)
+    if cursor_token:
+        values["rank"], values["id"] = decode_cursor(cursor_token, sort_key)
+        query += sql.SQL(" WHERE (rank, {}) < (%(rank)s::real, %(id)s)").format(sql.Identifier(id_column))
+    query += sql.SQL(" ORDER BY rank DESC, {} DESC LIMIT %(page_size)s").format(sql.Identifier(id_column))
+
+    with connection.cursor() as cursor:
+        cursor.execute(query, values)
+        rows = cursor.fetchall()
+    matches = rows[0][-1] if rows else 0
+    rows = [row[:-1] for row in rows]
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(sort_key, rows[-1][-1], rows[-1][columns.index(id_column)])
+    return Page(rows=rows, next_cursor=next_cursor, total_estimate=min(matches, text_search_candidates),
+                truncated=matches > text_search_candidates)
+
+
+# Ranked text search page: rows whose search vector (from a GIN expression index) matches the tsquery, ranked by
+# ts_rank_cd:
+def fetch_ranked_page(connection, table, columns, id_column, vector, tsquery, page_size, cursor_token=None):
+    return _fetch_ranked_matches(
+        connection, table, columns, id_column,
+        sql.SQL("{} @@ to_tsquery('english', %(query)s)").format(vector),
+        sql.SQL("ts_rank_cd({}, to_tsquery('english', %(query)s))").format(vector),
+        "rank", {"query": tsquery}, page_size, cursor_token)
+
+
+# Fuzzy text search page: rows whose column holds a word like the text (so typos still match), ranked by pg_trgm's
+# word_similarity and served by a gin_trgm_ops index on the column:
+def fetch_similar_page(connection, table, columns, id_column, column, text, page_size, cursor_token=None):
+    page = _fetch_ranked_matches(
+        connection, table, columns, id_column,
+        sql.SQL("%(query)s <%% {}").format(sql.Identifier(column)),
+        sql.SQL("word_similarity(%(query)s, {})").format(sql.Identifier(column)),
+        "similarity", {"query": text}, page_size, cursor_token)
+    page.similar = True
+    return page
+
+
+# Whether pg_trgm is installed in the database, which migrations only do where the server offers it:
+def trigram_search_available(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("""SELECT to_regproc('word_similarity') IS NOT NULL""")
+        return cursor.fetchone()[0]
+
+
+# Text search page: ranked word-prefix matches of the tsquery, or, when nothing matches and pg_trgm is installed,
+# the rows whose similar_column looks most like the text; a cursor continues the kind of search that issued it:
+def fetch_text_search_page(connection, table, columns, id_column, vector, tsquery, similar_column, text, page_size,
+                           cursor_token=None):
+    if cursor_token and cursor_sort_key(cursor_token) == "similarity":
+        return fetch_similar_page(connection, table, columns, id_column, similar_column, text, page_size,
+                                  cursor_token)
+    page = fetch_ranked_page(connection, table, columns, id_column, vector, tsquery, page_size, cursor_token)
+    if not page.rows and not cursor_token and trigram_search_available(connection):
+        page = fetch_similar_page(connection, table, columns, id_column, similar_column, text, page_size)
+    return page
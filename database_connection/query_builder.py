@@ -0,0 +1,114 @@
+import re
+
+from psycopg2 import sql
+
+# Filter operators, written as <column>__<operator>=value (plain <column>=value means equality):
+OPERATORS = {
+    "eq": "{} = %s",
+    "gt": "{} > %s",
+    "gte": "{} >= %s",
+    "lt": "{} < %s",
+    "lte": "{} <= %s",
+    "in": "{} = ANY(%s)",
+    "prefix": "{} LIKE %s",
+}
+
+
+# Escapes the LIKE wildcards in user text so it is matched literally:
+def escape_like(value):
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+# Turns free text into a tsquery in which every word must match as a word prefix ("cop wir" finds "Copper Wire"):
+def prefix_tsquery(text):
+    return " & ".join(word + ":*" for word in re.findall(r"[^\W_]+", text.lower()))
+
+
+# Ranges of the IDs written with the typed digits as a prefix, shortest IDs first ("12" -> 12..12, 120..129,
+# 1200..1299, ...). They are disjoint and ascending, and each one is a primary key range scan, unlike id::text LIKE:
+def id_prefix_ranges(text, max_id=2147483647):
+    if not (text.isascii() and text.isdigit()) or (text.startswith("0") and text != "0"):
+        return []
+    ranges = []
+    low, width = int(text), 1
+    while low <= max_id:
+        ranges.append((low, min(low + width - 1, max_id)))
+        if low == 0:
+            break
+        low, width = low * 10, width * 10
+    return ranges
+
+
+# Typeahead lookup built from separately LIMITed branches, so none of them scans a whole table: the ID prefix
+# ranges walked in primary key order, then each (condition, values) of matches served by its own index. The
+# branches are merged without duplicates and cut to the lowest limit IDs; scope (with scope_values) narrows every
+# branch, and empty text lists the first IDs:
+def build_typeahead(select, id_column, text, limit, matches=(), scope=None, scope_values=()):
+    select, id_identifier = sql.SQL(select), sql.SQL(id_column)
+    branches = []
+    values = []
+
+    def add_branch(condition, condition_values, ordered):
+        if scope is not None:
+            condition = condition + sql.SQL(" AND ") + sql.SQL(scope)
+            condition_values = [*condition_values, *scope_values]
+        order = sql.SQL(" ORDER BY {}").format(id_identifier) if ordered else sql.SQL("")
+        branches.append(sql.SQL("({} WHERE {}{} LIMIT %s)").format(select, condition, order))
+        values.extend([*condition_values, limit])
+
+    if not text:
+        add_branch(sql.SQL("TRUE"), [], True)
+    for low, high in id_prefix_ranges(text):
+        add_branch(sql.SQL("{} BETWEEN %s AND %s").format(id_identifier), [low, high], True)
+    if text:
+        for condition, condition_values in matches:
+            add_branch(sql.SQL(condition), condition_values, False)
+    if not branches:
+        add_branch(sql.SQL("FALSE"), [], False)
+    query = sql.SQL("SELECT * FROM ({}) matches ORDER BY {} LIMIT %s").format(
+        sql.SQL(" UNION ").join(branches), sql.Identifier(id_column.split(".")[-1]))
+    return query, values + [limit]
+
+
+# Turns keyword filters into conditions (to be joined with AND) and their values, accepting only whitelisted
+# columns and operators; blank filters are skipped:
+def build_conditions(filters, filterable_columns, alias=None):
+    conditions = []
+    values = []
+    for name, value in filters.items():
+        if value is None or value == "" or (isinstance(value, (list, tuple, set)) and len(value) == 0):
+            continue
+        column, _, operator = name.partition("__")
+        operator = operator or "eq"
+        if operator not in filterable_columns.get(column, ()):
+            raise ValueError(f"Unsupported search filter: {name}")
+        identifier = sql.Identifier(alias, column) if alias else sql.Identifier(column)
+        conditions.append(sql.SQL(OPERATORS[operator]).format(identifier))
+        if operator == "in":
+            values.append(list(value))
+        elif operator == "prefix":
+            values.append(escape_like(str(value)) + "%")
+        else:
+            values.append(value)
+    return conditions, values
+
+
+# Builds a WHERE clause from keyword filters, accepting only whitelisted columns and operators:
+def build_where(filters, filterable_columns, alias=None):
+    conditions, values = build_conditions(filters, filterable_columns, alias)
+    if not conditions:
+        return sql.SQL(""), values
+    return sql.SQL(" WHERE ") + sql.SQL(" AND ").join(conditions), values
+
+
+def _plan_node_types(plan):
+    yield plan["Node Type"]
+    for child in plan.get("Plans", []):
+        yield from _plan_node_types(child)
+
+
+# Runs EXPLAIN on a query and reports whether the plan reads through an index:
+def explain_uses_index(cursor, query, values):
+    cursor.execute(sql.SQL("EXPLAIN (FORMAT JSON) ") + query, values)
+    plan = cursor.fetchone()[0][0]["Plan"]
+    return any("Index" in node_type for node_type in _plan_node_types(plan))
@@ -0,0 +1,63 @@
+import functools
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Cache freshness and size settings (overridable through the .env file):
+cache_ttl_seconds = float(os.getenv('REFERENCE_CACHE_TTL_SECONDS', '300'))
+cache_max_entries = int(os.getenv('REFERENCE_CACHE_MAX_ENTRIES', '4096'))
+
+
+# In-process read-through cache for Supplier/Product reference data:
+class ReferenceCache:
+    def __init__(self, ttl_seconds=cache_ttl_seconds, max_entries=cache_max_entries):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by every invalidation, so a value loaded before one is not stored after it:
+        self._generation = 0
+
+    def get_or_load(self, key, loader):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                return entry[1]
+            generation = self._generation
+        value = loader()
+        # Missing rows and failed lookups are not cached, so they are retried on the next rerun:
+        if value is not None:
+            with self._lock:
+                if self._generation != generation:
+                    return value
+                self._entries[key] = (now + self.ttl_seconds, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return value
+
+    # Drops every key starting with the given prefix, e.g. invalidate("product", 7):
+    def invalidate(self, *prefix):
+        with self._lock:
+            self._generation += 1
+            if not prefix:
+                self._entries.clear()
+                return
+            stale_keys = [key for key in self._entries if key[:len(prefix)] == prefix]
+            for key in stale_keys:
+                del self._entries[key]
+
+    # Decorator for read-only lookup methods; key_builder receives the method's arguments:
+    def cached(self, key_builder):
+        def decorator(method):
+            @functools.wraps(method)
+            def wrapper(*args, **kwargs):
+                return self.get_or_load(key_builder(*args, **kwargs), lambda: method(*args, **kwargs))
+            return wrapper
+        return decorator
+
+
+reference_cache = ReferenceCache()
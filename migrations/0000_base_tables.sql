@@ -0,0 +1,44 @@
+-- Base tables, so an empty database (e.g. the docker-compose container) can be set up by the migration runner.
+-- Existing databases already have them, which makes this a no-op there.
+CREATE TABLE IF NOT EXISTS Supplier (
+    supplier_id INTEGER PRIMARY KEY,
+    supplier_name VARCHAR(100) NOT NULL,
+    landline_no VARCHAR(20),
+    email VARCHAR(100) NOT NULL,
+    mobile_no VARCHAR(20) NOT NULL,
+    address TEXT NOT NULL,
+    city VARCHAR(50) NOT NULL,
+    state_province VARCHAR(50) NOT NULL,
+    country VARCHAR(50) NOT NULL,
+    postal_code VARCHAR(20) NOT NULL,
+    gstin_number VARCHAR(20) NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS Product (
+    product_id INTEGER PRIMARY KEY,
+    product_name VARCHAR(100) NOT NULL,
+    description TEXT NOT NULL,
+    category VARCHAR(50) NOT NULL,
+    supplier_id INTEGER NOT NULL,
+    unit_price FLOAT NOT NULL,
+    FOREIGN KEY (supplier_id) REFERENCES Supplier(supplier_id)
+);
+
+CREATE TABLE IF NOT EXISTS Purchase (
+    purchase_id INTEGER PRIMARY KEY,
+    supplier_id INTEGER NOT NULL,
+    gstin_number VARCHAR(20) NOT NULL,
+    product_id INTEGER NOT NULL,
+    quantity INTEGER NOT NULL,
+    unit_price FLOAT NOT NULL,
+    total_price FLOAT NOT NULL,
+    discount FLOAT NOT NULL,
+    cgst FLOAT NOT NULL,
+    sgst FLOAT NOT NULL,
+    igst FLOAT NOT NULL,
+    amount FLOAT NOT NULL,
+    purchase_date DATE NOT NULL,
+    item_description TEXT NOT NULL,
+    FOREIGN KEY (supplier_id) REFERENCES Supplier(supplier_id),
+    FOREIGN KEY (product_id) REFERENCES Product(product_id)
+);
@@ -0,0 +1,7 @@
+-- Indexes backing the Purchase search filters and the keyset-paginated Show All screen.
+CREATE INDEX IF NOT EXISTS purchase_purchase_date_idx ON Purchase (purchase_date, purchase_id);
+CREATE INDEX IF NOT EXISTS purchase_supplier_id_idx ON Purchase (supplier_id, purchase_date);
+CREATE INDEX IF NOT EXISTS purchase_product_id_idx ON Purchase (product_id, purchase_id);
+CREATE INDEX IF NOT EXISTS purchase_amount_idx ON Purchase (amount, purchase_id);
+-- varchar_pattern_ops serves both equality and LIKE 'prefix%' regardless of the database collation.
+CREATE INDEX IF NOT EXISTS purchase_gstin_number_idx ON Purchase (gstin_number varchar_pattern_ops);
@@ -0,0 +1,29 @@
+-- Multi-line purchase orders: one header per supplier bill and one row per billed item.
+CREATE TABLE IF NOT EXISTS Purchase_Order (
+    order_id INTEGER PRIMARY KEY,
+    supplier_id INTEGER NOT NULL,
+    gstin_number VARCHAR(20) NOT NULL,
+    order_date DATE NOT NULL,
+    FOREIGN KEY (supplier_id) REFERENCES Supplier(supplier_id)
+);
+
+CREATE TABLE IF NOT EXISTS Purchase_Order_Line (
+    order_id INTEGER NOT NULL,
+    line_no INTEGER NOT NULL,
+    product_id INTEGER NOT NULL,
+    quantity INTEGER NOT NULL,
+    unit_price FLOAT NOT NULL,
+    total_price FLOAT NOT NULL,
+    discount FLOAT NOT NULL,
+    cgst FLOAT NOT NULL,
+    sgst FLOAT NOT NULL,
+    igst FLOAT NOT NULL,
+    amount FLOAT NOT NULL,
+    item_description TEXT NOT NULL,
+    PRIMARY KEY (order_id, line_no),
+    FOREIGN KEY (order_id) REFERENCES Purchase_Order(order_id) ON DELETE CASCADE,
+    FOREIGN KEY (product_id) REFERENCES Product(product_id)
+);
+
+CREATE INDEX IF NOT EXISTS purchase_order_supplier_id_idx ON Purchase_Order (supplier_id, order_date);
+CREATE INDEX IF NOT EXISTS purchase_order_line_product_id_idx ON Purchase_Order_Line (product_id);
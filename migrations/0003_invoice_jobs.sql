@@ -0,0 +1,17 @@
+-- Background tax invoice jobs; at most one queued or running job per purchase.
+CREATE TABLE IF NOT EXISTS Invoice_Job (
+    job_id SERIAL PRIMARY KEY,
+    purchase_id INTEGER NOT NULL,
+    status VARCHAR(10) NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    artifact_path TEXT,
+    error TEXT,
+    run_after TIMESTAMPTZ NOT NULL DEFAULT now(),
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    CHECK (status IN ('queued', 'running', 'done', 'failed')),
+    FOREIGN KEY (purchase_id) REFERENCES Purchase(purchase_id) ON DELETE CASCADE
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS invoice_job_active_purchase_idx ON Invoice_Job (purchase_id) WHERE status IN ('queued', 'running');
+CREATE INDEX IF NOT EXISTS invoice_job_queued_idx ON Invoice_Job (run_after, job_id) WHERE status = 'queued';
@@ -0,0 +1,29 @@
+-- Monthly purchase totals per supplier and product, covering single purchases and purchase order lines.
+-- Reports aggregate this view instead of the Purchase table; it is refreshed concurrently by billing.reports.
+CREATE MATERIALIZED VIEW IF NOT EXISTS purchase_monthly_summary AS
+SELECT date_trunc('month', lines.purchase_date)::date AS month, lines.supplier_id, lines.product_id,
+       count(*) AS purchase_count, sum(lines.quantity) AS quantity, sum(lines.total_price) AS total_price,
+       sum(lines.discount) AS discount, sum(lines.cgst) AS cgst, sum(lines.sgst) AS sgst, sum(lines.igst) AS igst,
+       sum(lines.amount) AS amount
+FROM (
+    SELECT purchase_date, supplier_id, product_id, quantity, total_price, discount, cgst, sgst, igst, amount
+    FROM Purchase
+    UNION ALL
+    SELECT o.order_date, o.supplier_id, l.product_id, l.quantity, l.total_price, l.discount, l.cgst, l.sgst, l.igst,
+           l.amount
+    FROM Purchase_Order o JOIN Purchase_Order_Line l ON l.order_id = o.order_id
+) AS lines
+GROUP BY 1, 2, 3;
+
+-- REFRESH ... CONCURRENTLY needs a unique index over every row:
+CREATE UNIQUE INDEX IF NOT EXISTS purchase_monthly_summary_key_idx ON purchase_monthly_summary (month, supplier_id, product_id);
+CREATE INDEX IF NOT EXISTS purchase_monthly_summary_supplier_idx ON purchase_monthly_summary (supplier_id, month);
+CREATE INDEX IF NOT EXISTS purchase_monthly_summary_product_idx ON purchase_monthly_summary (product_id, month);
+
+-- When each summary view was last refreshed, how long it took and the base-table write counter it reflects:
+CREATE TABLE IF NOT EXISTS Report_Refresh (
+    view_name VARCHAR(63) PRIMARY KEY,
+    refreshed_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    seconds FLOAT NOT NULL,
+    changes BIGINT NOT NULL DEFAULT 0
+);
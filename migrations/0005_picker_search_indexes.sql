@@ -0,0 +1,13 @@
+-- Typeahead picker lookups (query_builder.build_typeahead), one LIMITed branch per kind of match: IDs by prefix as
+-- primary key ranges, GSTINs by prefix through the index below and names by substring, which needs a pg_trgm index.
+-- Servers without the extension still answer the name lookups, by scanning the Supplier and Product tables.
+CREATE INDEX IF NOT EXISTS supplier_gstin_number_idx ON Supplier (gstin_number varchar_pattern_ops);
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm') THEN
+        CREATE EXTENSION IF NOT EXISTS pg_trgm;
+        CREATE INDEX IF NOT EXISTS supplier_supplier_name_trgm_idx ON Supplier USING gin (supplier_name gin_trgm_ops);
+        CREATE INDEX IF NOT EXISTS product_product_name_trgm_idx ON Product USING gin (product_name gin_trgm_ops);
+    END IF;
+END
+$$;
@@ -0,0 +1,6 @@
+-- Ranked text search over product names and descriptions and purchase item descriptions. The GIN indexes are on
+-- the same to_tsvector expressions the search queries use, so Postgres keeps them up to date on every write.
+CREATE INDEX IF NOT EXISTS product_text_search_idx ON Product USING gin (
+    (setweight(to_tsvector('english', product_name), 'A') || setweight(to_tsvector('english', description), 'B')));
+CREATE INDEX IF NOT EXISTS purchase_item_description_search_idx ON Purchase USING gin (
+    to_tsvector('english', item_description));
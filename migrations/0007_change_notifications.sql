@@ -0,0 +1,71 @@
+-- Change notifications for the caches kept by every app and API process. Each statement that writes Supplier,
+-- Product or Purchase sends one NOTIFY on the billing_changes channel, delivered when its transaction commits, with
+-- the key columns (the trigger arguments) of the rows it touched, e.g.
+-- {"table": "product", "operation": "UPDATE", "rows": [{"product_id": 7, "supplier_id": 1}, ...]}.
+-- Statements touching more than 100 rows send "rows": null instead, meaning any row of the table may have changed,
+-- which keeps bulk imports cheap and the payload under the 8000-byte NOTIFY limit.
+CREATE OR REPLACE FUNCTION notify_billing_change() RETURNS trigger AS $$
+DECLARE
+    changed_rows jsonb := '[]';
+    changed_count bigint := 0;
+    statement_count bigint;
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        SELECT count(*) INTO statement_count FROM new_rows;
+        changed_count := changed_count + statement_count;
+        IF changed_count <= 100 THEN
+            SELECT changed_rows || coalesce(jsonb_agg(to_jsonb(new_row)), '[]') INTO changed_rows
+            FROM new_rows AS new_row;
+        END IF;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        SELECT count(*) INTO statement_count FROM old_rows;
+        changed_count := changed_count + statement_count;
+        IF changed_count <= 100 THEN
+            SELECT changed_rows || coalesce(jsonb_agg(to_jsonb(old_row)), '[]') INTO changed_rows
+            FROM old_rows AS old_row;
+        END IF;
+    END IF;
+    IF changed_count = 0 THEN
+        RETURN NULL;
+    END IF;
+
+    PERFORM pg_notify('billing_changes', jsonb_build_object(
+        'table', lower(TG_TABLE_NAME),
+        'operation', TG_OP,
+        'rows', CASE WHEN changed_count <= 100 THEN (
+            SELECT jsonb_agg(DISTINCT row_keys)
+            FROM (SELECT (SELECT jsonb_object_agg(key_column, changed_row -> key_column)
+                          FROM unnest(TG_ARGV) AS key_column) AS row_keys
+                  FROM jsonb_array_elements(changed_rows) AS changed_row) AS changed_keys) END)::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS supplier_insert_notify ON Supplier;
+DROP TRIGGER IF EXISTS supplier_update_notify ON Supplier;
+DROP TRIGGER IF EXISTS supplier_delete_notify ON Supplier;
+CREATE TRIGGER supplier_insert_notify AFTER INSERT ON Supplier REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_billing_change('supplier_id');
+CREATE TRIGGER supplier_update_notify AFTER UPDATE ON Supplier REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_billing_change('supplier_id');
+CREATE TRIGGER supplier_delete_notify AFTER DELETE ON Supplier REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_billing_change('supplier_id');
+
+DROP TRIGGER IF EXISTS product_insert_notify ON Product;
+DROP TRIGGER IF EXISTS product_update_notify ON Product;
+DROP TRIGGER IF EXISTS product_delete_notify ON Product;
+CREATE TRIGGER product_insert_notify AFTER INSERT ON Product REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_billing_change('product_id', 'supplier_id');
+CREATE TRIGGER product_update_notify AFTER UPDATE ON Product REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_billing_change('product_id', 'supplier_id');
+CREATE TRIGGER product_delete_notify AFTER DELETE ON Product REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_billing_change('product_id', 'supplier_id');
+
+-- Nothing is cached for a purchase before it exists, so purchase inserts (and bulk imports) send no notification:
+DROP TRIGGER IF EXISTS purchase_update_notify ON Purchase;
+DROP TRIGGER IF EXISTS purchase_delete_notify ON Purchase;
+CREATE TRIGGER purchase_update_notify AFTER UPDATE ON Purchase REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_billing_change('purchase_id');
+CREATE TRIGGER purchase_delete_notify AFTER DELETE ON Purchase REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_billing_change('purchase_id');
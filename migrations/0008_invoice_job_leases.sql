@@ -0,0 +1,7 @@
+-- Invoice jobs are shared by every app and API process. A running job is leased: its worker refreshes updated_at
+-- while rendering, and only jobs whose lease has run out (their process died) are handed back to the queue. The
+-- artifact is written to the rendering host's INVOICE_ARTIFACT_DIR, which is recorded so other hosts render their
+-- own copy instead of opening a path that only exists elsewhere.
+ALTER TABLE Invoice_Job ADD COLUMN IF NOT EXISTS artifact_host TEXT;
+
+CREATE INDEX IF NOT EXISTS invoice_job_running_idx ON Invoice_Job (updated_at) WHERE status = 'running';
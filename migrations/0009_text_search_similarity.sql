@@ -0,0 +1,12 @@
+-- Fuzzy fallback of the text searches (pagination.fetch_similar_page), used when no word starts with the text typed:
+-- product names are covered by the trigram index of 0005, item descriptions get one here. Servers without pg_trgm
+-- keep the word-prefix search only.
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm') THEN
+        CREATE EXTENSION IF NOT EXISTS pg_trgm;
+        CREATE INDEX IF NOT EXISTS purchase_item_description_trgm_idx ON Purchase
+            USING gin (item_description gin_trgm_ops);
+    END IF;
+END
+$$;
@@ -0,0 +1,14 @@
+-- Keyset pagination (pagination.fetch_page) seeks on (sort_key, primary key) for every sort key offered by the
+-- Show All screens and the API, so each one has a matching composite index and a page costs the same at any depth.
+-- Purchase dates, product IDs and amounts are already covered by 0001.
+CREATE INDEX IF NOT EXISTS purchase_supplier_id_purchase_id_idx ON Purchase (supplier_id, purchase_id);
+
+CREATE INDEX IF NOT EXISTS product_product_name_idx ON Product (product_name, product_id);
+CREATE INDEX IF NOT EXISTS product_category_idx ON Product (category, product_id);
+CREATE INDEX IF NOT EXISTS product_supplier_id_idx ON Product (supplier_id, product_id);
+CREATE INDEX IF NOT EXISTS product_unit_price_idx ON Product (unit_price, product_id);
+
+CREATE INDEX IF NOT EXISTS supplier_supplier_name_idx ON Supplier (supplier_name, supplier_id);
+CREATE INDEX IF NOT EXISTS supplier_city_idx ON Supplier (city, supplier_id);
+CREATE INDEX IF NOT EXISTS supplier_state_province_idx ON Supplier (state_province, supplier_id);
+CREATE INDEX IF NOT EXISTS supplier_country_idx ON Supplier (country, supplier_id);
@@ -0,0 +1,181 @@
+from psycopg2 import sql
+
+from database_connection.batch import delete_rows, insert_rows, update_rows
+from database_connection.errors import NotFoundError, ValidationError, database_errors
+from database_connection.pagination import fetch_page, fetch_text_search_page
+from database_connection.query_builder import build_typeahead, escape_like, prefix_tsquery
+from database_connection.reference_cache import reference_cache
+
+PRODUCT_COLUMNS = ["product_id", "product_name", "description", "category", "supplier_id", "unit_price"]
+PRODUCT_SORT_KEYS = ["product_id", "product_name", "category", "supplier_id", "unit_price"]
+# Text searched by search_product_text, names weighted above descriptions; migrations/0006 indexes this expression:
+PRODUCT_SEARCH_VECTOR = sql.SQL("setweight(to_tsvector('english', product_name), 'A') || "
+                                "setweight(to_tsvector('english', description), 'B')")
+
+
+# Creating Product Class (raises the typed errors of database_connection.errors; the UI reports them):
+class Product:
+    def __init__(self, pool):
+        self.pool = pool
+
+    def insert_product(self, product_id: int, product_name: str, description: str, category: str, supplier_id: int,
+                       unit_price: float, unit_of_work=None):
+        with database_errors("Failed to insert record into Product table"):
+            with self.pool.transaction(unit_of_work) as unit_of_work:
+                cursor = unit_of_work.cursor()
+                postgres_insert_query = """INSERT INTO Product (product_id, product_name, description, category, supplier_id, unit_price) VALUES (%s, %s, %s, %s, %s, %s)"""
+                record_to_insert = (product_id, product_name, description, category, supplier_id, unit_price)
+                cursor.execute(postgres_insert_query, record_to_insert)
+                unit_of_work.on_commit(lambda: reference_cache.invalidate("product", "ids"))
+                unit_of_work.on_commit(lambda: reference_cache.invalidate("product", "by_supplier", supplier_id))
+                count = cursor.rowcount
+                return count
+
+    def update_product(self, product_id: int, product_name: str, description: str, category: str, supplier_id: int,
+                       unit_price: float, unit_of_work=None):
+        with database_errors("Failed to update record in Product table"):
+            with self.pool.transaction(unit_of_work) as unit_of_work:
+                cursor = unit_of_work.cursor()
+                postgres_update_query = """UPDATE Product SET product_name = %s, description = %s, category = %s, supplier_id = %s, unit_price = %s WHERE product_id = %s"""
+                record_to_update = (product_name, description, category, supplier_id, unit_price, product_id)
+                cursor.execute(postgres_update_query, record_to_update)
+                unit_of_work.on_commit(lambda: reference_cache.invalidate("product", product_id))
+                unit_of_work.on_commit(lambda: reference_cache.invalidate("product", "by_supplier"))
+                count = cursor.rowcount
+                return count
+
+    def delete_product(self, product_id: int, unit_of_work=None):
+        with database_errors("Failed to delete record from Product table"):
+            with self.pool.transaction(unit_of_work) as unit_of_work:
+                cursor = unit_of_work.cursor()
+                postgres_delete_query = """DELETE FROM Product WHERE product_id = %s"""
+                cursor.execute(postgres_delete_query, (product_id,))
+                unit_of_work.on_commit(lambda: reference_cache.invalidate("product", product_id))
+                unit_of_work.on_commit(lambda: reference_cache.invalidate("product", "ids"))
+                unit_of_work.on_commit(lambda: reference_cache.invalidate("product", "by_supplier"))
+                count = cursor.rowcount
+                return count
+
+    # Batch forms of the mutations above: records are dicts keyed by PRODUCT_COLUMNS (or tuples in that order),
+    # written with multi-row statements in one transaction:
+    def insert_products(self, records, unit_of_work=None):
+        with database_errors("Failed to insert records into Product table"):
+            with self.pool.transaction(unit_of_work) as unit_of_work:
+                count = insert_rows(unit_of_work.cursor(), "Product", PRODUCT_COLUMNS, records, "product_id")
+                unit_of_work.on_commit(lambda: reference_cache.invalidate("product"))
+                return count
+
+    def update_products(self, records, unit_of_work=None):
+        with database_errors("Failed to update records in Product table"):
+            with self.pool.transaction(unit_of_work) as unit_of_work:
+                count = update_rows(unit_of_work.cursor(), "Product", PRODUCT_COLUMNS, list(records), "product_id")
+                unit_of_work.on_commit(lambda: reference_cache.invalidate("product"))
+                return count
+
+    def delete_products(self, product_ids, unit_of_work=None):
+        with database_errors("Failed to delete records from Product table"):
+            with self.pool.transaction(unit_of_work) as unit_of_work:
+                count = delete_rows(unit_of_work.cursor(), "Product", "product_id", product_ids)
+                unit_of_work.on_commit(lambda: reference_cache.invalidate("product"))
+                return count
+
+    def show_all_products(self):
+        with database_errors("Failed to fetch records from Product table"):
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                cursor.execute("""SELECT * FROM Product""")
+                products = cursor.fetchall()
+                if len(products) > 0:
+                    return products
+                else:
+                    raise NotFoundError("No records found in the Product table")
+
+    def list_products(self, page_size: int = 50, sort_key: str = "product_id", cursor: str = None):
+        with database_errors("Failed to fetch records from Product table"):
+            if sort_key not in PRODUCT_SORT_KEYS:
+                raise ValidationError(f"Product records cannot be sorted by {sort_key}")
+            with self.pool.connection() as connection:
+                page = fetch_page(connection, "Product", PRODUCT_COLUMNS, "product_id", sort_key, page_size, cursor)
+                if len(page.rows) > 0:
+                    return page
+                else:
+                    raise NotFoundError("No records found in the Product table")
+
+    def search_product(self, **kwargs):
+        with database_errors("Failed to fetch records from Product table"):
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                search_query = """SELECT * FROM Product WHERE """
+                conditions = []
+                values = []
+                for key, value in kwargs.items():
+                    if value is not None and value != "":
+                        conditions.append(f"{key} = %s")
+                        values.append(value)
+                search_query += " AND ".join(conditions)
+                cursor.execute(search_query, tuple(values))
+                products = cursor.fetchall()
+                if len(products) > 0:
+                    return products
+                else:
+                    raise NotFoundError("No records found in the Product table")
+
+    # Ranked text search over product names and descriptions, one page at a time; each row ends with its rank.
+    # Misspelled words fall back to product names that look alike:
+    def search_product_text(self, text: str, page_size: int = 50, cursor: str = None):
+        with database_errors("Failed to fetch records from Product table"):
+            tsquery = prefix_tsquery(text)
+            if not tsquery:
+                raise ValidationError("Enter one or more words to search for")
+            with self.pool.connection() as connection:
+                page = fetch_text_search_page(connection, "Product", PRODUCT_COLUMNS, "product_id",
+                                              PRODUCT_SEARCH_VECTOR, tsquery, "product_name", text.strip(),
+                                              page_size, cursor)
+                if len(page.rows) > 0:
+                    return page
+                else:
+                    raise NotFoundError("No records found in the Product table")
+
+    @reference_cache.cached(lambda self, product_id: ("product", product_id, "details"))
+    def product_details(self, product_id: int):
+        with database_errors("Failed to fetch records from Product table"):
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                cursor.execute("""SELECT * FROM Product WHERE product_id = %s""", (product_id,))
+                product = cursor.fetchone()
+                if product is not None:
+                    product_name = product[1]
+                    description = product[2]
+                    category = product[3]
+                    supplier_id = product[4]
+                    unit_price = product[5]
+                    return [product_name, description, category, supplier_id, unit_price]
+                else:
+                    raise NotFoundError("No records found in the Product table")
+
+    @reference_cache.cached(lambda self: ("product", "ids"))
+    def get_all_products(self):
+        with database_errors("Failed to fetch records from Product table"):
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                cursor.execute("""SELECT product_id FROM Product""")
+                product_ids = cursor.fetchall()
+                if len(product_ids) > 0:
+                    list_product_ids = [product_id[0] for product_id in product_ids]
+                    return sorted(list_product_ids)
+                else:
+                    raise NotFoundError("No records found in the Product table")
+
+    # Typeahead lookup for the product pickers: products whose ID starts with the text or whose name contains it,
+    # optionally of one supplier, as (product_id, product_name, category), each match served by its own index:
+    def search_products(self, text: str = "", supplier_id: int = None, limit: int = 20):
+        with database_errors("Failed to fetch records from Product table"):
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                text = text.strip()
+                query, values = build_typeahead(
+                    """SELECT product_id, product_name, category FROM Product""", "product_id", text, limit,
+                    matches=[("product_name ILIKE %s", ["%" + escape_like(text) + "%"])],
+                    scope=None if supplier_id is None else "supplier_id = %s", scope_values=[supplier_id])
+                cursor.execute(query, values)
+                return cursor.fetchall()
@@ -1,156 +1,43 @@
 import pandas as pd
 import streamlit as st
-import psycopg2
 
-from database_connection.database_connection import DatabaseConnection
+from database_connection.database_connection import get_connection_pool
+from products.product import PRODUCT_SORT_KEYS, Product
+from ui.pickers import search_picker
+from ui.streamlit_adapter import StreamlitAdapter
+from validation.validation import PRODUCT_RULES, validate_record
+
+# Confirmations shown after a successful change:
+PRODUCT_SUCCESS_MESSAGES = {
+    "insert_product": "{} Record(s) inserted successfully into Product table",
+    "update_product": "{} Record(s) updated successfully in Product table",
+    "delete_product": "{} Record(s) deleted successfully from Product table",
+}
 
 
 # Validating User Inputs:
 def validate_inputs(product_id: int, product_name: str, description: str, category: str, supplier_id: int,
                     unit_price: float):
-    if not product_id or product_id <= 0:
-        st.warning("Please enter the Product ID")
-        return False
-    if not product_name.strip():
-        st.warning("Please enter the Product Name")
-        return False
-    if not description.strip():
-        st.warning("Please enter the Description")
-        return False
-    if not category.strip():
-        st.warning("Please enter the Category")
-        return False
-    if not supplier_id or supplier_id <= 0:
-        st.warning("Please enter the Supplier ID")
-        return False
-    if not unit_price or unit_price <= 0.0:
-        st.warning("Please enter the Unit Price")
+    errors = validate_record(PRODUCT_RULES, product_id=product_id, product_name=product_name,
+                             description=description, category=category, supplier_id=supplier_id,
+                             unit_price=unit_price)
+    if errors:
+        st.warning(errors[0])
         return False
     else:
         return True
 
 
-# Creating Product Class:
-class Product:
-    def __init__(self, connection):
-        self.connection = connection
-
-    def insert_product(self, product_id: int, product_name: str, description: str, category: str, supplier_id: int,
-                       unit_price: float):
-        try:
-            cursor = self.connection.cursor()
-            postgres_insert_query = """INSERT INTO Product (product_id, product_name, description, category, supplier_id, unit_price) VALUES (%s, %s, %s, %s, %s, %s)"""
-            record_to_insert = (product_id, product_name, description, category, supplier_id, unit_price)
-            cursor.execute(postgres_insert_query, record_to_insert)
-            self.connection.commit()
-            count = cursor.rowcount
-            st.success(f"{count} Record(s) inserted successfully into Product table")
-        except (Exception, psycopg2.Error) as error:
-            st.error("Failed to insert record into Product table: " + str(error))
-
-    def update_product(self, product_id: int, product_name: str, description: str, category: str, supplier_id: int,
-                       unit_price: float):
-        try:
-            cursor = self.connection.cursor()
-            postgres_update_query = """UPDATE Product SET product_name = %s, description = %s, category = %s, supplier_id = %s, unit_price = %s WHERE product_id = %s"""
-            record_to_update = (product_name, description, category, supplier_id, unit_price, product_id)
-            cursor.execute(postgres_update_query, record_to_update)
-            self.connection.commit()
-            count = cursor.rowcount
-            st.success(f"{count} Record(s) updated successfully in Product table")
-        except (Exception, psycopg2.Error) as error:
-            st.error("Failed to update record in Product table: " + str(error))
-
-    def delete_product(self, product_id: int):
-        try:
-            cursor = self.connection.cursor()
-            postgres_delete_query = """DELETE FROM Product WHERE product_id = %s"""
-            cursor.execute(postgres_delete_query, (product_id,))
-            self.connection.commit()
-            count = cursor.rowcount
-            st.success(f"{count} Record(s) deleted successfully from Product table")
-        except (Exception, psycopg2.Error) as error:
-            st.error("Failed to delete record from Product table: " + str(error))
-
-    def show_all_products(self):
-        try:
-            cursor = self.connection.cursor()
-            cursor.execute("""SELECT * FROM Product""")
-            products = cursor.fetchall()
-            if len(products) > 0:
-                return products
-            else:
-                st.info("No records found in the Product table")
-                return None
-        except (Exception, psycopg2.Error) as error:
-            st.error("Failed to fetch records from Product table: " + str(error))
-
-    def search_product(self, **kwargs):
-        try:
-            cursor = self.connection.cursor()
-            search_query = """SELECT * FROM Product WHERE """
-            conditions = []
-            values = []
-            for key, value in kwargs.items():
-                if value is not None and value != "":
-                    conditions.append(f"{key} = %s")
-                    values.append(value)
-            search_query += " AND ".join(conditions)
-            cursor.execute(search_query, tuple(values))
-            products = cursor.fetchall()
-            if len(products) > 0:
-                return products
-            else:
-                st.info("No records found in the Product table")
-                return None
-        except (Exception, psycopg2.Error) as error:
-            st.error("Failed to fetch records from Product table: " + str(error))
-
-    def product_details(self, product_id: int):
-        try:
-            cursor = self.connection.cursor()
-            cursor.execute("""SELECT * FROM Product WHERE product_id = %s""", (product_id,))
-            product = cursor.fetchone()
-            if product is not None:
-                product_name = product[1]
-                description = product[2]
-                category = product[3]
-                supplier_id = product[4]
-                unit_price = product[5]
-                return [product_name, description, category, supplier_id, unit_price]
-            else:
-                st.info("No records found in the Product table")
-                return None
-        except (Exception, psycopg2.Error) as error:
-            st.error("Failed to fetch records from Product table: " + str(error))
-            return None
-
-    def get_all_products(self):
-        try:
-            cursor = self.connection.cursor()
-            cursor.execute("""SELECT product_id FROM Product""")
-            product_ids = cursor.fetchall()
-            if len(product_ids) > 0:
-                list_product_ids = [product_id[0] for product_id in product_ids]
-                return sorted(list_product_ids)
-            else:
-                st.info("No records found in the Product table")
-                return None
-        except (Exception, psycopg2.Error) as error:
-            st.error("Failed to fetch records from Product table: " + str(error))
-            return None
-
-
 # Streamlit UI for Product Management:
 def main_product():
-    # Initialize session state
-    if 'db_connection' not in st.session_state:
-        st.session_state.db_connection = DatabaseConnection().connect()
+    # Borrow connections from the shared pool per operation:
+    pool = get_connection_pool()
     st.header("Product Information Management")
     try:
-        product = Product(st.session_state.db_connection)
-        if product.connection is not None:
-            product_menu = st.selectbox("Product Menu", ["Insert", "Show All", "Search", "Update", "Delete"],
+        product = StreamlitAdapter(Product(pool), PRODUCT_SUCCESS_MESSAGES)
+        if product.pool is not None:
+            product_menu = st.selectbox("Product Menu", ["Insert", "Show All", "Search", "Text Search", "Update",
+                                                          "Delete"],
                                         key="product_menu",
                                         help="Select the operation you want to perform on the Product table")
 
@@ -184,20 +71,40 @@ def main_product():
             elif product_menu == "Show All":
                 st.subheader("Show All Products")
                 try:
-                    products = product.show_all_products()
-                    if products is not None:
+                    sort_key = st.selectbox("Sort By", PRODUCT_SORT_KEYS, key="product_sort_key",
+                                            help="Select the column the products are ordered by")
+                    page_size = st.selectbox("Records per Page", [25, 50, 100, 500], index=1,
+                                             key="product_page_size", help="Select how many records to show per page")
+                    # Keep a stack of cursor tokens so the user can page back; reset it when the ordering changes:
+                    if st.session_state.get("product_page_state") != (sort_key, page_size):
+                        st.session_state.product_page_state = (sort_key, page_size)
+                        st.session_state.product_page_cursors = [None]
+                    page_cursors = st.session_state.product_page_cursors
+                    page = product.list_products(page_size=page_size, sort_key=sort_key, cursor=page_cursors[-1])
+                    if page is not None:
                         columns = ["Product ID", "Product Name", "Description", "Category", "Supplier ID", "Unit Price"]
-                        df = pd.DataFrame(products, columns=columns)
+                        df = pd.DataFrame(page.rows, columns=columns)
                         st.dataframe(df, hide_index=True)
+                        total_pages = max(1, -(-page.total_estimate // page_size))
+                        st.caption(f"Page {len(page_cursors)} of about {total_pages} "
+                                   f"(~{page.total_estimate} records)")
+                        previous_column, next_column = st.columns(2)
+                        if previous_column.button("Previous Page", key="product_previous_page",
+                                                  disabled=len(page_cursors) == 1):
+                            page_cursors.pop()
+                            st.rerun()
+                        if next_column.button("Next Page", key="product_next_page",
+                                              disabled=page.next_cursor is None):
+                            page_cursors.append(page.next_cursor)
+                            st.rerun()
                 except Exception as e:
                     st.error("Failed to fetch records from Product table: " + str(e))
 
             # Search Product:
             elif product_menu == "Search":
                 st.subheader("Search Product")
-                list_product_ids = product.get_all_products()
-                product_id = st.selectbox("Product ID", options=list_product_ids, key="product_id",
-                                          help="Select the unique numeric ID of the product you want to search")
+                product_id = search_picker("Product ID", product.search_products, key="product_id",
+                                           help="Search the product you want to search by ID or name")
                 product_name = st.text_input("Product Name", key="product_name",
                                              help="Enter the name of the product you want to search")
                 category = st.text_input("Category", key="category",
@@ -220,45 +127,83 @@ def main_product():
                     except Exception as e:
                         st.error("Failed to fetch records from Product table: " + str(e))
 
+            # Ranked Text Search over Product Names and Descriptions:
+            elif product_menu == "Text Search":
+                st.subheader("Text Search Products")
+                search_text = st.text_input("Search Text", key="product_search_text",
+                                            help="Enter words (or the start of words) from the product name or "
+                                                 "description")
+                if search_text.strip():
+                    try:
+                        # Keep a stack of cursor tokens so the user can page back; reset it when the search changes:
+                        if st.session_state.get("product_text_search_state") != search_text:
+                            st.session_state.product_text_search_state = search_text
+                            st.session_state.product_text_search_cursors = [None]
+                        page_cursors = st.session_state.product_text_search_cursors
+                        page = product.search_product_text(search_text, cursor=page_cursors[-1])
+                        if page is not None:
+                            columns = ["Product ID", "Product Name", "Description", "Category", "Supplier ID",
+                                       "Unit Price", "Rank"]
+                            df = pd.DataFrame(page.rows, columns=columns)
+                            st.dataframe(df, hide_index=True)
+                            st.caption(f"Page {len(page_cursors)}, best matches first "
+                                       f"({page.total_estimate} ranked)")
+                            if page.similar:
+                                st.info("No word starts with the text typed, so the closest spellings are shown instead.")
+                            if page.truncated:
+                                st.warning(f"Only the {page.total_estimate} most recent matches are ranked; add words to the search "
+                                           f"to reach older records.")
+                            previous_column, next_column = st.columns(2)
+                            if previous_column.button("Previous Page", key="product_text_search_previous_page",
+                                                      disabled=len(page_cursors) == 1):
+                                page_cursors.pop()
+                                st.rerun()
+                            if next_column.button("Next Page", key="product_text_search_next_page",
+                                                  disabled=page.next_cursor is None):
+                                page_cursors.append(page.next_cursor)
+                                st.rerun()
+                    except Exception as e:
+                        st.error("Failed to fetch records from Product table: " + str(e))
+
             # Update Existing Product:
             elif product_menu == "Update":
                 st.subheader("Update Existing Product")
-                list_product_ids = product.get_all_products()
-                product_id = st.selectbox("Product ID", options=list_product_ids, key="product_id",
-                                          help="Select the unique numeric ID of the product you want to update")
-                product_details = product.product_details(product_id)
-                product_name = st.text_input("Product Name", value=product_details[0],
-                                             key="product_name",
-                                             help="Enter the updated name of the product")
-                description = st.text_area("Description", value=product_details[1],
-                                           key="description",
-                                           help="Enter the updated description of the product")
-                category = st.text_input("Category", value=product_details[2],
-                                         key="category",
-                                         help="Enter the updated category of the product")
-                supplier_id = st.number_input("Supplier ID", value=product_details[3],
-                                              key="supplier_id", min_value=1,
-                                              step=1, help="Enter the updated unique numeric ID of the supplier")
-                unit_price = st.number_input("Unit Price", value=product_details[4],
-                                             key="unit_price",
-                                             min_value=0.0, help="Enter the updated unit price of the product")
-                if st.button("Update Product"):
-                    try:
-                        if validate_inputs(product_id, product_name, description, category, supplier_id, unit_price):
-                            product.update_product(product_id=product_id, product_name=product_name,
-                                                   description=description,
-                                                   category=category, supplier_id=supplier_id,
-                                                   unit_price=unit_price)
-                    except Exception as e:
-                        st.error("Failed to update record in Product table: " + str(e))
+                product_id = search_picker("Product ID", product.search_products, key="product_id",
+                                           help="Search the product you want to update by ID or name")
+                product_details = product.product_details(product_id) if product_id else None
+                if product_details is not None:
+                    product_name = st.text_input("Product Name", value=product_details[0],
+                                                 key="product_name",
+                                                 help="Enter the updated name of the product")
+                    description = st.text_area("Description", value=product_details[1],
+                                               key="description",
+                                               help="Enter the updated description of the product")
+                    category = st.text_input("Category", value=product_details[2],
+                                             key="category",
+                                             help="Enter the updated category of the product")
+                    supplier_id = st.number_input("Supplier ID", value=product_details[3],
+                                                  key="supplier_id", min_value=1,
+                                                  step=1, help="Enter the updated unique numeric ID of the supplier")
+                    unit_price = st.number_input("Unit Price", value=product_details[4],
+                                                 key="unit_price",
+                                                 min_value=0.0, help="Enter the updated unit price of the product")
+                    if st.button("Update Product"):
+                        try:
+                            if validate_inputs(product_id, product_name, description, category, supplier_id,
+                                               unit_price):
+                                product.update_product(product_id=product_id, product_name=product_name,
+                                                       description=description,
+                                                       category=category, supplier_id=supplier_id,
+                                                       unit_price=unit_price)
+                        except Exception as e:
+                            st.error("Failed to update record in Product table: " + str(e))
 
             # Delete Existing Product:
             elif product_menu == "Delete":
                 st.subheader("Delete Existing Product")
-                list_product_ids = product.get_all_products()
-                product_id = st.selectbox("Product ID", options=list_product_ids, key="product_id",
-                                          help="Select the unique numeric ID of the product you want to delete")
-                product_details = product.product_details(product_id)
+                product_id = search_picker("Product ID", product.search_products, key="product_id",
+                                           help="Search the product you want to delete by ID or name")
+                product_details = product.product_details(product_id) if product_id else None
                 if product_details is not None:
                     product_name = st.text_input("Product Name", value=product_details[0], key="product_name",
                                                  disabled=True)
@@ -269,15 +214,11 @@ def main_product():
                                                   disabled=True)
                     unit_price = st.number_input("Unit Price", value=product_details[4], key="unit_price",
                                                  disabled=True)
-                if st.button("Delete Product"):
-                    try:
-                        product.delete_product(product_id)
-                    except Exception as e:
-                        st.error("Failed to delete record from Product table: " + str(e))
-
-            # Close the database connection:
-            # product.connection.close()
-            # st.info("Database connection closed successfully.")
+                    if st.button("Delete Product"):
+                        try:
+                            product.delete_product(product_id)
+                        except Exception as e:
+                            st.error("Failed to delete record from Product table: " + str(e))
 
         else:
             st.error("Failed to connect to the database.")
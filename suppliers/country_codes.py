@@ -0,0 +1,37 @@
+import functools
+import json
+import logging
+import os
+
+country_codes_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "country_codes.json")
+
+
+# Building the Country Code table from phonenumbers metadata (slow; only used to regenerate country_codes.json):
+def build_country_codes():
+    import phonenumbers
+    from phonenumbers import geocoder
+
+    country_codes = {}
+    for code, name in phonenumbers.COUNTRY_CODE_TO_REGION_CODE.items():
+        country = geocoder.country_name_for_number(phonenumbers.parse("+" + str(code) + "123456"), "en")
+        country_codes[country] = "+" + str(code)
+    return country_codes
+
+
+# Getting Country Codes from the packaged table, once per process:
+@functools.lru_cache(maxsize=None)
+def get_country_codes():
+    try:
+        with open(country_codes_path, encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError) as e:
+        logging.info("Rebuilding country codes from phonenumbers metadata: " + str(e))
+        return build_country_codes()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    with open(country_codes_path, "w", encoding="utf-8") as output:
+        json.dump(dict(sorted(build_country_codes().items())), output, ensure_ascii=False, indent=0)
+        output.write("\n")
+    logging.info(f"Wrote {country_codes_path}")
@@ -0,0 +1,169 @@
+from database_connection.batch import delete_rows, insert_rows, update_rows
+from database_connection.errors import NotFoundError, ValidationError, database_errors
+from database_connection.pagination import fetch_page
+from database_connection.query_builder import build_typeahead, escape_like
+from database_connection.reference_cache import reference_cache
+
+SUPPLIER_COLUMNS = ["supplier_id", "supplier_name", "landline_no", "email", "mobile_no", "address", "city",
+                    "state_province", "country", "postal_code", "gstin_number"]
+SUPPLIER_SORT_KEYS = ["supplier_id", "supplier_name", "city", "state_province", "country"]
+
+
+# Creating Supplier Class (raises the typed errors of database_connection.errors; the UI reports them):
+class Supplier:
+    def __init__(self, pool):
+        self.pool = pool
+
+    def insert_supplier(self, supplier_id: int, supplier_name: str, landline_no: str, email: str, mobile_no: str,
+                        address: str, city: str, state_province: str, country: str, postal_code: str,
+                        gstin_number: str, unit_of_work=None):
+        with database_errors("Failed to insert record into Supplier table"):
+            with self.pool.transaction(unit_of_work) as unit_of_work:
+                cursor = unit_of_work.cursor()
+                postgres_insert_query = """INSERT INTO Supplier (supplier_id, supplier_name, landline_no, email, mobile_no, address, city, state_province, country, postal_code, gstin_number) VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)"""
+                record_to_insert = (supplier_id, supplier_name, landline_no, email, mobile_no, address, city,
+                                    state_province, country, postal_code, gstin_number)
+                cursor.execute(postgres_insert_query, record_to_insert)
+                unit_of_work.on_commit(lambda: reference_cache.invalidate("supplier", "ids"))
+                count = cursor.rowcount
+                return count
+
+    def update_supplier(self, supplier_id: int, supplier_name: str, landline_no: str, email: str, mobile_no: str,
+                        address: str, city: str, state_province: str, country: str, postal_code: int,
+                        gstin_number: str, unit_of_work=None):
+        with database_errors("Failed to update record in Supplier table"):
+            with self.pool.transaction(unit_of_work) as unit_of_work:
+                cursor = unit_of_work.cursor()
+                postgres_update_query = """UPDATE Supplier SET supplier_name = %s, landline_no = %s, email = %s, mobile_no = %s, address = %s, city = %s, state_province = %s, country = %s, postal_code = %s, gstin_number = %s WHERE supplier_id = %s"""
+                record_to_update = (supplier_name, landline_no, email, mobile_no, address, city, state_province,
+                                    country, postal_code, gstin_number, supplier_id)
+                cursor.execute(postgres_update_query, record_to_update)
+                unit_of_work.on_commit(lambda: reference_cache.invalidate("supplier", supplier_id))
+                count = cursor.rowcount
+                return count
+
+    def delete_supplier(self, supplier_id: int, unit_of_work=None):
+        with database_errors("Failed to delete record from Supplier table"):
+            with self.pool.transaction(unit_of_work) as unit_of_work:
+                cursor = unit_of_work.cursor()
+                postgres_delete_query = """DELETE FROM Supplier WHERE supplier_id = %s"""
+                cursor.execute(postgres_delete_query, (supplier_id,))
+                unit_of_work.on_commit(lambda: reference_cache.invalidate("supplier", supplier_id))
+                unit_of_work.on_commit(lambda: reference_cache.invalidate("supplier", "ids"))
+                count = cursor.rowcount
+                return count
+
+    # Batch forms of the mutations above: records are dicts keyed by SUPPLIER_COLUMNS (or tuples in that order),
+    # written with multi-row statements in one transaction:
+    def insert_suppliers(self, records, unit_of_work=None):
+        with database_errors("Failed to insert records into Supplier table"):
+            with self.pool.transaction(unit_of_work) as unit_of_work:
+                count = insert_rows(unit_of_work.cursor(), "Supplier", SUPPLIER_COLUMNS, records, "supplier_id")
+                unit_of_work.on_commit(lambda: reference_cache.invalidate("supplier"))
+                return count
+
+    def update_suppliers(self, records, unit_of_work=None):
+        with database_errors("Failed to update records in Supplier table"):
+            with self.pool.transaction(unit_of_work) as unit_of_work:
+                count = update_rows(unit_of_work.cursor(), "Supplier", SUPPLIER_COLUMNS, list(records), "supplier_id")
+                unit_of_work.on_commit(lambda: reference_cache.invalidate("supplier"))
+                return count
+
+    def delete_suppliers(self, supplier_ids, unit_of_work=None):
+        with database_errors("Failed to delete records from Supplier table"):
+            with self.pool.transaction(unit_of_work) as unit_of_work:
+                count = delete_rows(unit_of_work.cursor(), "Supplier", "supplier_id", supplier_ids)
+                unit_of_work.on_commit(lambda: reference_cache.invalidate("supplier"))
+                return count
+
+    def show_all_suppliers(self):
+        with database_errors("Failed to fetch records from Supplier table"):
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                cursor.execute("""SELECT * FROM Supplier""")
+                suppliers = cursor.fetchall()
+                if len(suppliers) > 0:
+                    return suppliers
+                else:
+                    raise NotFoundError("No records found in the Supplier table")
+
+    def list_suppliers(self, page_size: int = 50, sort_key: str = "supplier_id", cursor: str = None):
+        with database_errors("Failed to fetch records from Supplier table"):
+            if sort_key not in SUPPLIER_SORT_KEYS:
+                raise ValidationError(f"Supplier records cannot be sorted by {sort_key}")
+            with self.pool.connection() as connection:
+                page = fetch_page(connection, "Supplier", SUPPLIER_COLUMNS, "supplier_id", sort_key, page_size, cursor)
+                if len(page.rows) > 0:
+                    return page
+                else:
+                    raise NotFoundError("No records found in the Supplier table")
+
+    def search_supplier(self, **kwargs):
+        with database_errors("Failed to fetch records from Supplier table"):
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                query = """SELECT * FROM Supplier WHERE """
+                conditions = []
+                values = []
+                for key, value in kwargs.items():
+                    if value is not None and value != "":
+                        conditions.append(f"{key} = %s")
+                        values.append(value)
+                query += " AND ".join(conditions)
+                cursor.execute(query, tuple(values))
+                supplier = cursor.fetchall()
+                if len(supplier) > 0:
+                    return supplier
+                else:
+                    raise NotFoundError("No supplier found with the given search criteria")
+
+    @reference_cache.cached(lambda self, supplier_id: ("supplier", supplier_id, "details"))
+    def supplier_details(self, supplier_id: int):
+        with database_errors("Failed to fetch records from Supplier table"):
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                cursor.execute("""SELECT * FROM Supplier WHERE supplier_id = %s""", (supplier_id,))
+                supplier = cursor.fetchone()
+                if supplier is not None:
+                    supplier_name = supplier[1]
+                    landline_no = supplier[2]
+                    email = supplier[3]
+                    mobile_no = supplier[4]
+                    address = supplier[5]
+                    city = supplier[6]
+                    state_province = supplier[7]
+                    country = supplier[8]
+                    postal_code = supplier[9]
+                    gstin_number = supplier[10]
+                    return [supplier_name, landline_no, email, mobile_no, address, city, state_province, country,
+                            postal_code, gstin_number]
+                else:
+                    raise NotFoundError("No supplier found with the given ID")
+
+    @reference_cache.cached(lambda self: ("supplier", "ids", "unsorted"))
+    def get_all_suppliers(self):
+        with database_errors("Failed to fetch records from Supplier table"):
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                cursor.execute("""SELECT supplier_id FROM Supplier""")
+                supplier_ids = cursor.fetchall()
+                if len(supplier_ids) > 0:
+                    list_supplier_ids = [supplier_id[0] for supplier_id in supplier_ids]
+                    return list_supplier_ids
+                else:
+                    raise NotFoundError("No records found in the Supplier table")
+
+    # Typeahead lookup for the supplier pickers: suppliers whose ID or GSTIN starts with the text or whose name
+    # contains it, as (supplier_id, supplier_name, gstin_number), each match served by its own index:
+    def search_suppliers(self, text: str = "", limit: int = 20):
+        with database_errors("Failed to fetch records from Supplier table"):
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                text = text.strip()
+                pattern = escape_like(text)
+                query, values = build_typeahead(
+                    """SELECT supplier_id, supplier_name, gstin_number FROM Supplier""", "supplier_id", text, limit,
+                    matches=[("gstin_number LIKE %s", [pattern.upper() + "%"]),
+                             ("supplier_name ILIKE %s", ["%" + pattern + "%"])])
+                cursor.execute(query, values)
+                return cursor.fetchall()
@@ -0,0 +1,45 @@
+from datetime import date
+
+import pytest
+
+from api.api import ERROR_STATUS, BadRequestError, _date_field, _id_list_field, _parse_json
+from database_connection.errors import ValidationError
+
+
+def test_parse_json_returns_the_expected_value():
+    assert _parse_json(b'{"supplier_id": 1}') == {"supplier_id": 1}
+    assert _parse_json(b'[{"purchase_id": 1}]', (list, dict)) == [{"purchase_id": 1}]
+
+
+@pytest.mark.parametrize("body", [b"{bad", b"", b"\xff", b"[1, 2]", b'"text"'])
+def test_parse_json_rejects_malformed_or_unexpected_bodies(body):
+    with pytest.raises(BadRequestError):
+        _parse_json(body)
+
+
+def test_bad_request_is_answered_with_400():
+    status = next(status for error_class, status in ERROR_STATUS.items()
+                  if isinstance(BadRequestError("bad"), error_class))
+    assert status == 400
+
+
+def test_date_field_parses_iso_dates_and_skips_missing_ones():
+    assert _date_field({"start_date": "2024-04-01"}, "start_date") == date(2024, 4, 1)
+    assert _date_field({}, "start_date") is None
+
+
+@pytest.mark.parametrize("value", ["2024-13-01", "01-04-2024", 20240401, ["2024-04-01"]])
+def test_date_field_rejects_invalid_dates(value):
+    with pytest.raises(ValidationError):
+        _date_field({"start_date": value}, "start_date")
+
+
+def test_id_list_field_accepts_integer_lists():
+    assert _id_list_field({"supplier_ids": [1, 2]}, "supplier_ids") == [1, 2]
+    assert _id_list_field({}, "supplier_ids") is None
+
+
+@pytest.mark.parametrize("value", [1, "1,2", ["1"], [1.5], [True], {"1": 1}])
+def test_id_list_field_rejects_anything_else(value):
+    with pytest.raises(ValidationError):
+        _id_list_field({"supplier_ids": value}, "supplier_ids")
@@ -0,0 +1,56 @@
+import dataclasses
+import os
+from datetime import date
+
+import pytest
+
+from billing.artifact_cache import ArtifactCache, invoice_cache_key
+from billing.tax_invoice import InvoiceItem, TaxInvoice
+
+INVOICE = TaxInvoice(invoice_no=100, supplier_name="Acme Corp", supplier_phone="9876543210",
+                     supplier_address="1 Main Road, Pune\nMaharashtra, India - 411001",
+                     supplier_gstin="27AAPFU0939F1ZV", invoice_date=date(2024, 4, 1),
+                     items=(InvoiceItem("Copper Wire", 2, 100.0, 10.0, 9.0, 9.0, 0.0, 108.0),),
+                     total_tax=18.0, total_amount=108.0)
+
+
+def test_invoice_cache_key_is_stable():
+    assert invoice_cache_key(INVOICE, "01-04-2024") == invoice_cache_key(INVOICE, "01-04-2024")
+
+
+def test_invoice_cache_key_changes_with_any_input():
+    key = invoice_cache_key(INVOICE, "01-04-2024")
+    assert invoice_cache_key(INVOICE, "02-04-2024") != key
+    assert invoice_cache_key(dataclasses.replace(INVOICE, total_amount=109.0), "01-04-2024") != key
+    assert invoice_cache_key(dataclasses.replace(INVOICE, supplier_name="Acme Ltd"), "01-04-2024") != key
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ArtifactCache(directory=str(tmp_path), max_bytes=1024 * 1024)
+
+
+def test_stored_artifact_is_found_by_name_and_key(cache):
+    path = cache.store("purchase-1", "abc", "1_tax_invoice.pdf", "<html></html>", b"%PDF")
+    assert cache.lookup("purchase-1", "abc") == path
+    assert os.path.exists(os.path.splitext(path)[0] + ".html")
+    assert cache.lookup("purchase-1", "other") is None
+
+
+def test_invalidate_drops_only_the_named_entries(cache):
+    cache.store("purchase-1", "abc", "1.pdf", "", b"1")
+    cache.store("purchase-12", "abc", "12.pdf", "", b"12")
+    cache.invalidate("purchase-1")
+    assert cache.lookup("purchase-1", "abc") is None
+    assert cache.lookup("purchase-12", "abc") is not None
+
+
+def test_least_recently_used_entries_are_evicted_over_the_size_limit(tmp_path):
+    cache = ArtifactCache(directory=str(tmp_path), max_bytes=2500)
+    cache.store("purchase-1", "a", "1.pdf", "", b"x" * 1000)
+    os.utime(os.path.join(str(tmp_path), "purchase-1-a"), (1, 1))
+    cache.store("purchase-2", "a", "2.pdf", "", b"x" * 1000)
+    cache.store("purchase-3", "a", "3.pdf", "", b"x" * 1000)
+    assert cache.lookup("purchase-1", "a") is None
+    assert cache.lookup("purchase-2", "a") is not None
+    assert cache.lookup("purchase-3", "a") is not None
@@ -0,0 +1,67 @@
+import logging
+
+import pytest
+
+from database_connection.change_listener import Change, ChangeListener, invalidate_reference_data
+from database_connection.reference_cache import reference_cache
+
+KEYS = [("product", 7, "details"), ("product", 8, "details"), ("product", "ids"),
+        ("product", "by_supplier", 1), ("product", "by_supplier", 2), ("supplier", 7)]
+
+
+@pytest.fixture
+def cached():
+    reference_cache.invalidate()
+    for key in KEYS:
+        reference_cache.get_or_load(key, lambda: "cached")
+    yield lambda key: reference_cache.get_or_load(key, lambda: "fresh") == "cached"
+    reference_cache.invalidate()
+
+
+def test_change_keys_skip_missing_values():
+    change = Change("product", "UPDATE", [{"product_id": 7, "supplier_id": 1}, {"product_id": 8}])
+    assert change.keys("product_id") == {7, 8}
+    assert change.keys("supplier_id") == {1}
+
+
+def test_update_drops_the_changed_rows_and_their_supplier_lists(cached):
+    invalidate_reference_data(Change("product", "UPDATE", [{"product_id": 7, "supplier_id": 1}]))
+    assert [cached(key) for key in KEYS] == [False, True, True, False, True, True]
+
+
+def test_insert_also_drops_the_id_lists(cached):
+    invalidate_reference_data(Change("product", "INSERT", [{"product_id": 9, "supplier_id": 2}]))
+    assert [cached(key) for key in KEYS] == [True, True, False, True, False, True]
+
+
+def test_bulk_change_drops_the_whole_table(cached):
+    invalidate_reference_data(Change("product", "UPDATE"))
+    assert [cached(key) for key in KEYS] == [False, False, False, False, False, True]
+
+
+def test_notification_is_passed_to_the_table_handlers():
+    listener, changes = ChangeListener(), []
+    listener.subscribe("product", changes.append)
+    listener.handle_notification('{"table": "product", "operation": "DELETE", "rows": [{"product_id": 7}]}')
+    assert changes == [Change("product", "DELETE", [{"product_id": 7}])]
+
+
+@pytest.mark.parametrize("payload", ["not json", '{"table": "product"}', '["product"]', "null",
+                                     '{"table": "product", "operation": "UPDATE", "rows": 7}'])
+def test_malformed_notification_is_logged_and_skipped(payload, caplog):
+    listener, changes = ChangeListener(), []
+    listener.subscribe("product", changes.append)
+    with caplog.at_level(logging.ERROR):
+        listener.handle_notification(payload)
+    assert changes == []
+    assert "Ignoring malformed change notification" in caplog.text
+
+
+def test_failing_handler_does_not_stop_the_others(caplog):
+    listener, changes = ChangeListener(), []
+    listener.subscribe("product", lambda change: 1 / 0)
+    listener.subscribe("product", changes.append)
+    with caplog.at_level(logging.ERROR):
+        listener.handle_notification('{"table": "product", "operation": "UPDATE", "rows": null}')
+    assert changes == [Change("product", "UPDATE")]
+    assert "Failed to apply a product change" in caplog.text
@@ -0,0 +1,45 @@
+import threading
+
+import psycopg2
+import psycopg2.extensions
+
+from database_connection.database_connection import ConnectionPool
+
+
+class FakeConnection:
+    closed = 0
+
+    def get_transaction_status(self):
+        return psycopg2.extensions.TRANSACTION_STATUS_INERROR
+
+    def rollback(self):
+        raise psycopg2.OperationalError("server closed the connection unexpectedly")
+
+    def close(self):
+        self.closed = 1
+
+
+class FakePool:
+    def __init__(self):
+        self.returned = []
+
+    def putconn(self, conn, close=False):
+        self.returned.append((conn, close))
+
+
+def make_pool():
+    pool = ConnectionPool.__new__(ConnectionPool)
+    pool._pool = FakePool()
+    pool._slots = threading.BoundedSemaphore(1)
+    pool._slots.acquire()
+    pool._last_used = {}
+    pool._lock = threading.Lock()
+    return pool
+
+
+def test_connection_that_fails_to_roll_back_is_closed_and_returned():
+    pool, conn = make_pool(), FakeConnection()
+    pool.putconn(conn)
+    assert conn.closed
+    assert pool._pool.returned == [(conn, True)]
+    assert pool._slots.acquire(blocking=False)
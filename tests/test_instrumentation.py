@@ -0,0 +1,54 @@
+import logging
+from types import SimpleNamespace
+
+import pytest
+from psycopg2 import sql
+
+from database_connection import instrumentation
+from database_connection.instrumentation import QueryStats, statement_text
+
+CURSOR = SimpleNamespace(connection=SimpleNamespace(encoding="UTF8"))
+
+
+def test_statement_text_accepts_str_and_bytes():
+    assert statement_text(CURSOR, "SELECT 1") == "SELECT 1"
+    assert statement_text(CURSOR, "SELECT 'é'".encode("utf-8")) == "SELECT 'é'"
+
+
+def test_statement_text_renders_composables():
+    assert statement_text(CURSOR, sql.SQL("SELECT 1")) == "SELECT 1"
+
+
+def test_record_totals_statements_per_caller():
+    stats = QueryStats()
+    stats.record(CURSOR, "SELECT 1", 0.25, 3)
+    stats.record(CURSOR, "SELECT 1", 0.5, 1)
+    totals = stats.snapshot()["test_record_totals_statements_per_caller"]
+    assert (totals.calls, totals.seconds, totals.rows, totals.max_seconds) == (2, 0.75, 4, 0.5)
+
+
+def test_scope_collects_only_the_statements_inside_it():
+    stats = QueryStats()
+    stats.record(CURSOR, "SELECT 1", 0.1, 1)
+    with stats.scope() as scope:
+        stats.record(CURSOR, "SELECT 2", 0.2, 1)
+    assert scope["test_scope_collects_only_the_statements_inside_it"].calls == 1
+    assert stats.snapshot()["test_scope_collects_only_the_statements_inside_it"].calls == 2
+
+
+@pytest.fixture
+def slow_threshold_zero(monkeypatch):
+    monkeypatch.setattr(instrumentation, "slow_query_ms", 0)
+
+
+def test_slow_batch_statement_sent_as_bytes_is_logged(slow_threshold_zero, caplog):
+    with caplog.at_level(logging.WARNING, logger="slow_query"):
+        QueryStats().record(CURSOR, b"INSERT INTO Purchase VALUES (1),\n  (2)", 0.3, 2)
+    assert "300 ms in test_slow_batch_statement_sent_as_bytes_is_logged: INSERT INTO Purchase VALUES (1), (2)" \
+        in caplog.text
+
+
+def test_record_never_raises(slow_threshold_zero, caplog):
+    with caplog.at_level(logging.ERROR):
+        QueryStats().record(CURSOR, object(), 0.3, 0)
+    assert "Failed to record statement timing" in caplog.text
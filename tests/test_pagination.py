@@ -0,0 +1,35 @@
+from datetime import date
+
+import pytest
+
+from database_connection.pagination import cursor_sort_key, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trips_numbers_and_text():
+    assert decode_cursor(encode_cursor("amount", 12.5, 7), "amount") == (12.5, 7)
+    assert decode_cursor(encode_cursor("supplier_name", "Acme Corp", 3), "supplier_name") == ("Acme Corp", 3)
+
+
+def test_cursor_round_trips_dates():
+    token = encode_cursor("purchase_date", date(2024, 4, 1), 42)
+    assert decode_cursor(token, "purchase_date") == (date(2024, 4, 1), 42)
+
+
+def test_cursor_is_url_safe():
+    token = encode_cursor("supplier_name", "?&/+ é", 1)
+    assert set(token) <= set("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_=")
+
+
+def test_cursor_for_another_sort_key_is_rejected():
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor("amount", 12.5, 7), "purchase_date")
+
+
+def test_cursor_sort_key_tells_text_search_cursors_apart():
+    assert cursor_sort_key(encode_cursor("rank", 0.5, 9)) == "rank"
+    assert cursor_sort_key(encode_cursor("similarity", 0.5, 9)) == "similarity"
+
+
+def test_malformed_cursor_raises_value_error():
+    with pytest.raises(ValueError):
+        decode_cursor("not a cursor", "amount")
@@ -0,0 +1,85 @@
+import pytest
+
+from database_connection.query_builder import (build_conditions, build_typeahead, build_where, escape_like,
+                                               id_prefix_ranges, prefix_tsquery)
+
+FILTERS = {"supplier_id": ("eq", "in"), "purchase_date": ("gte", "lte"), "gstin_number": ("prefix",)}
+
+
+def test_escape_like_escapes_wildcards_and_backslashes():
+    assert escape_like("50%_off\\") == "50\\%\\_off\\\\"
+    assert escape_like("plain") == "plain"
+
+
+def test_prefix_tsquery_matches_every_word_as_a_prefix():
+    assert prefix_tsquery("Copper  WIRE") == "copper:* & wire:*"
+
+
+def test_prefix_tsquery_drops_tsquery_syntax():
+    assert prefix_tsquery("cop|per & !wire:*") == "cop:* & per:* & wire:*"
+    assert prefix_tsquery("  -_- ") == ""
+
+
+def test_build_where_skips_empty_filters():
+    where, values = build_where({"supplier_id": None, "gstin_number": "", "supplier_id__in": []}, FILTERS)
+    assert where.as_string(None) == ""
+    assert values == []
+
+
+def test_build_where_collects_values_in_order():
+    _, values = build_where({"supplier_id__in": (1, 2), "purchase_date__gte": "2024-04-01",
+                             "gstin_number__prefix": "27A%"}, FILTERS)
+    assert values == [[1, 2], "2024-04-01", "27A\\%%"]
+
+
+def test_build_conditions_returns_one_condition_per_set_filter():
+    conditions, values = build_conditions({"supplier_id": 3, "gstin_number__prefix": "", "purchase_date__lte": None},
+                                          FILTERS)
+    assert len(conditions) == 1
+    assert values == [3]
+    assert build_conditions({"supplier_id__in": []}, FILTERS) == ([], [])
+
+
+def test_build_where_rejects_unlisted_columns_and_operators():
+    with pytest.raises(ValueError):
+        build_where({"amount": 5}, FILTERS)
+    with pytest.raises(ValueError):
+        build_where({"supplier_id__gt": 5}, FILTERS)
+
+
+def test_id_prefix_ranges_cover_longer_ids_in_ascending_order():
+    assert id_prefix_ranges("12", max_id=99999) == [(12, 12), (120, 129), (1200, 1299), (12000, 12999)]
+
+
+def test_id_prefix_ranges_stop_at_the_largest_id():
+    assert id_prefix_ranges("9", max_id=950) == [(9, 9), (90, 99), (900, 950)]
+    assert id_prefix_ranges("99999999999") == []
+
+
+def test_id_prefix_ranges_need_plain_digits():
+    assert id_prefix_ranges("") == []
+    assert id_prefix_ranges("12a") == []
+    assert id_prefix_ranges("٣") == []
+    assert id_prefix_ranges("012") == []
+    assert id_prefix_ranges("0") == [(0, 0)]
+
+
+def test_build_typeahead_limits_every_branch():
+    _, values = build_typeahead("SELECT supplier_id FROM Supplier", "supplier_id", "27", 5,
+                                matches=[("gstin_number LIKE %s", ["27%"])])
+    ranges = id_prefix_ranges("27")
+    assert values[:3 * len(ranges)] == [value for low, high in ranges for value in (low, high, 5)]
+    assert values[3 * len(ranges):] == ["27%", 5, 5]
+
+
+def test_build_typeahead_without_text_lists_the_first_ids_only():
+    _, values = build_typeahead("SELECT supplier_id FROM Supplier", "supplier_id", "", 5,
+                                matches=[("supplier_name ILIKE %s", ["%%"])])
+    assert values == [5, 5]
+
+
+def test_build_typeahead_applies_the_scope_to_every_branch():
+    _, values = build_typeahead("SELECT product_id FROM Product", "product_id", "wire", 5,
+                                matches=[("product_name ILIKE %s", ["%wire%"])], scope="supplier_id = %s",
+                                scope_values=[3])
+    assert values == ["%wire%", 3, 5, 5]
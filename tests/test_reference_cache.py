@@ -0,0 +1,77 @@
+import pytest
+
+from database_connection import reference_cache as reference_cache_module
+from database_connection.reference_cache import ReferenceCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(reference_cache_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_values_are_loaded_once_until_they_expire(clock):
+    cache = ReferenceCache(ttl_seconds=10, max_entries=10)
+    loads = []
+    load = lambda: loads.append(1) or len(loads)
+    assert cache.get_or_load(("supplier", 1), load) == 1
+    clock[0] += 9
+    assert cache.get_or_load(("supplier", 1), load) == 1
+    clock[0] += 2
+    assert cache.get_or_load(("supplier", 1), load) == 2
+
+
+def test_missing_values_are_not_cached(clock):
+    cache = ReferenceCache(ttl_seconds=10, max_entries=10)
+    assert cache.get_or_load(("supplier", 1), lambda: None) is None
+    assert cache.get_or_load(("supplier", 1), lambda: "Acme") == "Acme"
+
+
+def test_least_recently_used_entry_is_dropped_first(clock):
+    cache = ReferenceCache(ttl_seconds=10, max_entries=2)
+    cache.get_or_load(("supplier", 1), lambda: "one")
+    cache.get_or_load(("supplier", 2), lambda: "two")
+    cache.get_or_load(("supplier", 1), lambda: "reloaded")
+    cache.get_or_load(("supplier", 3), lambda: "three")
+    assert cache.get_or_load(("supplier", 1), lambda: "reloaded") == "one"
+    assert cache.get_or_load(("supplier", 2), lambda: "reloaded") == "reloaded"
+
+
+def test_invalidate_drops_keys_with_the_prefix(clock):
+    cache = ReferenceCache(ttl_seconds=10, max_entries=10)
+    for key in [("product", 7, "details"), ("product", 7, "item"), ("product", 8, "details"), ("supplier", 7)]:
+        cache.get_or_load(key, lambda: "cached")
+    cache.invalidate("product", 7)
+    assert cache.get_or_load(("product", 7, "details"), lambda: "fresh") == "fresh"
+    assert cache.get_or_load(("product", 7, "item"), lambda: "fresh") == "fresh"
+    assert cache.get_or_load(("product", 8, "details"), lambda: "fresh") == "cached"
+    cache.invalidate()
+    assert cache.get_or_load(("supplier", 7), lambda: "fresh") == "fresh"
+
+
+def test_value_loaded_across_an_invalidation_is_not_stored(clock):
+    cache = ReferenceCache(ttl_seconds=10, max_entries=10)
+
+    def load_while_invalidated():
+        cache.invalidate("supplier", 1)
+        return "stale"
+
+    assert cache.get_or_load(("supplier", 1), load_while_invalidated) == "stale"
+    assert cache.get_or_load(("supplier", 1), lambda: "fresh") == "fresh"
+
+
+def test_cached_decorator_keys_on_the_method_arguments(clock):
+    cache = ReferenceCache(ttl_seconds=10, max_entries=10)
+    calls = []
+
+    class Lookup:
+        @cache.cached(lambda self, supplier_id: ("supplier", supplier_id, "name"))
+        def supplier_name(self, supplier_id):
+            calls.append(supplier_id)
+            return f"Supplier {supplier_id}"
+
+    lookup = Lookup()
+    assert [lookup.supplier_name(1), lookup.supplier_name(1), lookup.supplier_name(2)] == [
+        "Supplier 1", "Supplier 1", "Supplier 2"]
+    assert calls == [1, 2]
@@ -0,0 +1,71 @@
+from datetime import date
+
+import pandas as pd
+
+from validation.validation import (PURCHASE_RULES, SUPPLIER_RULES, gstin_checksum_ok, summarize_errors,
+                                   validate_frame, validate_record)
+
+SUPPLIER = dict(supplier_id=1, supplier_name="Acme Corp", email="accounts@acme.example", country_code="+91",
+                mobile_no="9876543210", address="1 Main Road", city="Pune", state_province="Maharashtra",
+                country="India", postal_code="411001", gstin_number="27AAPFU0939F1ZV")
+
+PURCHASE = dict(purchase_id=1, supplier_id=1, gstin_number="27AAPFU0939F1ZV", product_id=10, quantity=2,
+                unit_price=50.0, total_price=100.0, discount=10.0, cgst=9.0, sgst=9.0, igst=0.0, amount=108.0,
+                purchase_date=date(2024, 4, 1), item_description="Copper wire")
+
+
+def test_gstin_checksum_accepts_valid_numbers():
+    assert gstin_checksum_ok(pd.Series(["27AAPFU0939F1ZV", "29AAGCB7383J1Z4"])).tolist() == [True, True]
+
+
+def test_gstin_checksum_normalises_case_and_whitespace():
+    assert gstin_checksum_ok(pd.Series([" 27aapfu0939f1zv "])).tolist() == [True]
+
+
+def test_gstin_checksum_rejects_wrong_check_character_and_malformed_values():
+    values = pd.Series(["27AAPFU0939F1ZA", "27AAPFU0939F1Z", "", None], dtype=object)
+    assert gstin_checksum_ok(values).tolist() == [False, False, False, False]
+
+
+def test_gstin_checksum_keeps_the_series_index():
+    values = pd.Series(["27AAPFU0939F1ZV", "bad"], index=[7, 9])
+    assert gstin_checksum_ok(values).index.tolist() == [7, 9]
+
+
+def test_valid_supplier_has_no_errors():
+    assert validate_record(SUPPLIER_RULES, **SUPPLIER) == []
+
+
+def test_supplier_errors_come_in_rule_order():
+    errors = validate_record(SUPPLIER_RULES, **dict(SUPPLIER, email="not-an-email", gstin_number="27AAPFU0939F1ZA"))
+    assert errors == ["Please enter a valid Email Address", "Please enter a valid GSTIN Number"]
+
+
+def test_valid_purchase_has_no_errors():
+    assert validate_record(PURCHASE_RULES, **PURCHASE) == []
+
+
+def test_purchase_amounts_must_add_up():
+    errors = validate_record(PURCHASE_RULES, **dict(PURCHASE, total_price=120.0))
+    assert "Total Price must equal Quantity x Unit Price" in errors
+    assert "Amount must equal Total Price - Discount + CGST + SGST + IGST" in errors
+
+
+def test_purchase_quantity_must_be_a_positive_integer():
+    assert "Please enter valid Quantity" in validate_record(PURCHASE_RULES, **dict(PURCHASE, quantity=1.5))
+    assert "Please enter valid Quantity" in validate_record(PURCHASE_RULES, **dict(PURCHASE, quantity=0))
+
+
+def test_validate_frame_reports_each_failing_row():
+    frame = pd.DataFrame([PURCHASE, dict(PURCHASE, purchase_id=2, item_description=" "),
+                          dict(PURCHASE, purchase_id=3, discount=-1.0, amount=119.0)])
+    report = validate_frame(frame, PURCHASE_RULES)
+    assert sorted(report["row"].unique().tolist()) == [1, 2]
+    assert summarize_errors(report).loc[1] == "Please enter the Item"
+    assert summarize_errors(report).loc[2] == "Please enter valid Discount"
+
+
+def test_validate_frame_without_failures_is_empty():
+    report = validate_frame(pd.DataFrame([PURCHASE]), PURCHASE_RULES)
+    assert report.empty
+    assert report.columns.tolist() == ["row", "column", "message"]
@@ -0,0 +1,38 @@
+import os
+
+import streamlit as st
+
+# Matches offered by each typeahead picker (overridable through the .env file):
+picker_limit = int(os.getenv('PICKER_SEARCH_LIMIT', '20'))
+
+
+# Label of a search result row: its ID followed by the describing columns, e.g. "7 · Acme Corp · 27AAPFU0939F1ZV":
+def option_label(row):
+    return " · ".join(str(value) for value in row if value is not None and value != "")
+
+
+# Typeahead replacement for a selectbox/multiselect over a whole table. The options are the first picker_limit rows
+# of search(text, limit) for the typed text, whose first column is the value; a multiselect also keeps the choices
+# made under earlier searches. A change of scope (e.g. the supplier the products belong to) clears the selection:
+def search_picker(label, search, key, multiple=False, index=0, scope=None, help=None,
+                  placeholder="Type an ID or name..."):
+    text = st.text_input(label, key=f"{key}_search", placeholder=placeholder, help=help)
+    rows = search(text, limit=picker_limit) or []
+    labels = st.session_state.setdefault(f"{key}_labels", {})
+    labels.update((row[0], option_label(row)) for row in rows)
+    values = [row[0] for row in rows]
+
+    selected = st.session_state.get(key)
+    if st.session_state.get(f"{key}_scope") != scope:
+        st.session_state[f"{key}_scope"] = scope
+        selected = None
+
+    def format_option(value):
+        return labels.get(value, str(value))
+
+    if multiple:
+        kept = list(selected or [])
+        return st.multiselect(label, kept + [value for value in values if value not in kept], default=kept,
+                              format_func=format_option, key=key, label_visibility="collapsed")
+    return st.selectbox(label, values, index=values.index(selected) if selected in values else index,
+                        format_func=format_option, key=key, label_visibility="collapsed")
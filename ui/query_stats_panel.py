@@ -0,0 +1,24 @@
+import pandas as pd
+import streamlit as st
+
+from database_connection.instrumentation import query_stats
+
+
+# One row per caller, the most expensive first:
+def query_stats_frame(stats):
+    frame = pd.DataFrame([{"caller": caller, "queries": entry.calls, "total_ms": round(entry.seconds * 1000, 1),
+                           "max_ms": round(entry.max_seconds * 1000, 1), "rows": entry.rows}
+                          for caller, entry in stats.items()],
+                         columns=["caller", "queries", "total_ms", "max_ms", "rows"])
+    return frame.sort_values("total_ms", ascending=False)
+
+
+# Sidebar panel with the database round trips and time of this rerun, and the totals since the process started:
+def show_query_stats_panel(rerun_stats):
+    with st.sidebar.expander("Database Time"):
+        queries, seconds = st.columns(2)
+        queries.metric("Queries", sum(entry.calls for entry in rerun_stats.values()))
+        seconds.metric("Time", f"{sum(entry.seconds for entry in rerun_stats.values()) * 1000:.1f} ms")
+        st.dataframe(query_stats_frame(rerun_stats), hide_index=True)
+        st.caption("Since the server started:")
+        st.dataframe(query_stats_frame(query_stats.snapshot()), hide_index=True)
@@ -0,0 +1,35 @@
+import streamlit as st
+
+from database_connection.errors import DomainError, NotFoundError, ValidationError
+
+
+# Streamlit face of a Billing, Product or Supplier object: every method call reports its outcome on the page
+# (success, empty result, invalid input or failure) and returns None instead of raising:
+class StreamlitAdapter:
+    def __init__(self, domain, success_messages=None):
+        self.domain = domain
+        # Method name -> message formatted with the result followed by the call's positional arguments:
+        self.success_messages = success_messages or {}
+
+    def __getattr__(self, name):
+        attribute = getattr(self.domain, name)
+        if not callable(attribute):
+            return attribute
+
+        def call(*args, **kwargs):
+            try:
+                result = attribute(*args, **kwargs)
+            except NotFoundError as error:
+                st.info(str(error))
+                return None
+            except ValidationError as error:
+                st.warning(str(error))
+                return None
+            except DomainError as error:
+                st.error(str(error))
+                return None
+            if name in self.success_messages:
+                st.success(self.success_messages[name].format(result, *args))
+            return result
+
+        return call
@@ -0,0 +1,161 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+EMAIL_PATTERN = r'^[\w\.-]+@[\w\.-]+\.\w+$'
+# 2-digit state code, 10-character PAN, entity number, 'Z' and a checksum character:
+GSTIN_PATTERN = r'^[0-9]{2}[A-Z]{5}[0-9]{4}[A-Z][1-9A-Z]Z[0-9A-Z]$'
+GSTIN_CHARSET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+# A validation rule flags the invalid rows of a DataFrame in one vectorized pass:
+@dataclass(frozen=True)
+class Rule:
+    column: str
+    message: str
+    invalid: object
+
+
+def _numeric(frame, column):
+    return pd.to_numeric(frame[column], errors="coerce")
+
+
+def _text(frame, column):
+    return frame[column].fillna("").astype(str).str.strip()
+
+
+def positive(column, message):
+    return Rule(column, message, lambda frame: ~(_numeric(frame, column) > 0))
+
+
+def positive_integer(column, message):
+    return Rule(column, message, lambda frame: ~((_numeric(frame, column) > 0) & (_numeric(frame, column) % 1 == 0)))
+
+
+def non_negative(column, message):
+    return Rule(column, message, lambda frame: ~(_numeric(frame, column) >= 0))
+
+
+def non_empty(column, message):
+    return Rule(column, message, lambda frame: _text(frame, column) == "")
+
+
+def required(column, message):
+    return Rule(column, message, lambda frame: frame[column].isna())
+
+
+def matches(column, pattern, message):
+    return Rule(column, message, lambda frame: ~_text(frame, column).str.match(pattern))
+
+
+# GSTIN format plus the mod-36 checksum over the first 14 characters:
+def gstin_checksum_ok(values):
+    values = values.fillna("").astype(str).str.strip().str.upper()
+    ok = values.str.match(GSTIN_PATTERN).to_numpy()
+    if not ok.any():
+        return pd.Series(ok, index=values.index)
+    well_formed = values[ok]
+    codes = np.frombuffer("".join(well_formed.str[:14]).encode("ascii"), dtype=np.uint8).reshape(-1, 14)
+    digits = np.where(codes >= ord("A"), codes - ord("A") + 10, codes - ord("0")).astype(np.int64)
+    products = digits * np.tile([1, 2], 7)
+    total = (products // 36 + products % 36).sum(axis=1)
+    expected = np.array(list(GSTIN_CHARSET))[(36 - total % 36) % 36]
+    ok[ok] = expected == well_formed.str[14].to_numpy()
+    return pd.Series(ok, index=values.index)
+
+
+def valid_gstin(column, message):
+    return Rule(column, message, lambda frame: ~gstin_checksum_ok(frame[column]))
+
+
+# Arithmetic consistency: target == sum of (sign, column) terms, within a paisa:
+def consistent_sum(column, terms, message):
+    def invalid(frame):
+        expected = sum(sign * _numeric(frame, term) for sign, term in terms)
+        return ~np.isclose(_numeric(frame, column), expected, atol=0.01)
+    return Rule(column, message, invalid)
+
+
+def consistent_product(column, left, right, message):
+    return Rule(column, message,
+                lambda frame: ~np.isclose(_numeric(frame, column), _numeric(frame, left) * _numeric(frame, right),
+                                          atol=0.01))
+
+
+PURCHASE_RULES = [
+    positive_integer("purchase_id", "Please enter the Purchase ID"),
+    positive_integer("supplier_id", "Please enter existing Supplier ID"),
+    non_empty("gstin_number", "Please enter existing GSTIN Number"),
+    valid_gstin("gstin_number", "Please enter a valid GSTIN Number"),
+    positive_integer("product_id", "Please enter existing Product ID"),
+    positive_integer("quantity", "Please enter valid Quantity"),
+    positive("unit_price", "Please enter valid Unit Price"),
+    positive("total_price", "Please enter valid Total Price"),
+    non_negative("discount", "Please enter valid Discount"),
+    non_negative("cgst", "Please enter valid CGST"),
+    non_negative("sgst", "Please enter valid SGST"),
+    non_negative("igst", "Please enter valid IGST"),
+    positive("amount", "Please enter valid Amount"),
+    required("purchase_date", "Please enter the Purchase Date"),
+    non_empty("item_description", "Please enter the Item"),
+    consistent_product("total_price", "quantity", "unit_price", "Total Price must equal Quantity x Unit Price"),
+    consistent_sum("amount", [(1, "total_price"), (-1, "discount"), (1, "cgst"), (1, "sgst"), (1, "igst")],
+                   "Amount must equal Total Price - Discount + CGST + SGST + IGST"),
+]
+
+PURCHASE_ORDER_RULES = [
+    positive_integer("order_id", "Please enter the Order ID"),
+    positive_integer("supplier_id", "Please enter existing Supplier ID"),
+    non_empty("gstin_number", "Please enter existing GSTIN Number"),
+    valid_gstin("gstin_number", "Please enter a valid GSTIN Number"),
+    required("order_date", "Please enter the Order Date"),
+]
+
+PRODUCT_RULES = [
+    positive_integer("product_id", "Please enter the Product ID"),
+    non_empty("product_name", "Please enter the Product Name"),
+    non_empty("description", "Please enter the Description"),
+    non_empty("category", "Please enter the Category"),
+    positive_integer("supplier_id", "Please enter the Supplier ID"),
+    positive("unit_price", "Please enter the Unit Price"),
+]
+
+SUPPLIER_RULES = [
+    positive_integer("supplier_id", "Please enter the Supplier ID"),
+    non_empty("supplier_name", "Please enter the Supplier Name"),
+    matches("email", EMAIL_PATTERN, "Please enter a valid Email Address"),
+    non_empty("country_code", "Please enter the Country Code"),
+    non_empty("mobile_no", "Please enter the Mobile Number"),
+    non_empty("address", "Please enter the Address"),
+    non_empty("city", "Please enter the City"),
+    non_empty("state_province", "Please enter the State/Province"),
+    non_empty("country", "Please enter the Country"),
+    non_empty("postal_code", "Please enter the Postal Code"),
+    non_empty("gstin_number", "Please enter the GSTIN Number"),
+    valid_gstin("gstin_number", "Please enter a valid GSTIN Number"),
+]
+
+
+# Runs every rule over the frame and returns one row per failure: (row, column, message):
+def validate_frame(frame, rules):
+    failures = []
+    for rule in rules:
+        invalid = np.asarray(rule.invalid(frame), dtype=bool)
+        if invalid.any():
+            failures.append(pd.DataFrame({"row": frame.index[invalid], "column": rule.column,
+                                          "message": rule.message}))
+    if not failures:
+        return pd.DataFrame(columns=["row", "column", "message"])
+    return pd.concat(failures, ignore_index=True)
+
+
+# Joins each failing row's messages into one reason string, indexed by row:
+def summarize_errors(report):
+    return report.groupby("row", sort=False)["message"].agg("; ".join)
+
+
+# Single-record form of validate_frame; returns the failure messages in rule order:
+def validate_record(rules, **fields):
+    frame = pd.DataFrame([fields])
+    return validate_frame(frame, rules)["message"].tolist()